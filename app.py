@@ -9,10 +9,29 @@ Struktur:
 - tabs/dashboard.py        : Tab dashboard data
 - tabs/machine_learning.py : Tab penjelasan ML pipeline
 - tabs/model_performance.py: Tab evaluasi model
+
+Profiling: jalankan dengan FRAUD_PROFILING=1 (atau =memory untuk peak memori)
+untuk menampilkan panel timing per span di bawah halaman.
+
+Model: file FRAUD_MODEL_PATH dipantau `core.model_registry`; versi baru di-load,
+di-warmup dan divalidasi di background lalu di-swap tanpa restart.
+
+Shadow: FRAUD_CHALLENGER_PATH=models/<challenger>.pkl menskor ulang setiap
+prediksi dengan model challenger di background (tidak memengaruhi keputusan).
+
+Drift: distribusi fitur transaksi yang diskor dibandingkan dengan profil
+training di artifact model (PSI/KS per fitur, tab Model Performance).
+
+Metrics: endpoint Prometheus di http://127.0.0.1:9108/metrics (port lewat
+FRAUD_METRICS_PORT, `off` untuk mematikan).
+
+Launcher: `python -m core.serving` menjalankan endpoint metrics dan warmup
+model saat proses start, lalu menjalankan app ini di proses yang sama.
 """
+import os
+import pickle
 import streamlit as st
 import pandas as pd
-import pickle
 
 # Import tab modules
 from tabs import about_dataset
@@ -22,6 +41,18 @@ from tabs import machine_learning
 from tabs import model_performance
 from tabs import contact_me
 
+from core.data_service import TransactionDataService
+from core.dataset import DATASET_DIR, FILTER_COLUMNS, TransactionDataset, frame_filter_options, load_csv
+from core.evaluation import load_evaluation_artifacts
+from core.sketches import SKETCH_COLUMNS, DatasetSketches, exact_summary
+from core.history_store import PredictionHistoryStore
+from core import profiling
+from core.shadow import ShadowScorer
+from core.drift import DriftMonitor
+from core.warmup import READINESS
+from core.metrics import ROWS_LOADED, cache_miss, step, track_cache
+from core import serving
+
 # ========================================
 # KONFIGURASI HALAMAN
 # ========================================
@@ -32,25 +63,160 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Span rerun ini (None jika profiling mati; instrumentasi menjadi no-op)
+PROFILING_MODE = profiling.env_mode()
+profiler = profiling.session(track_memory=PROFILING_MODE == 'memory') if PROFILING_MODE else None
+
+# ========================================
+# METRICS ENDPOINT
+# ========================================
+# Sekali per proses (no-op jika sudah dijalankan launcher `python -m core.serving`)
+serving.start_metrics_endpoint()
+
 # ========================================
 # LOAD MODEL
 # ========================================
+MODEL_PATH = serving.MODEL_PATH
+
+def get_model_registry():
+    """Registry model milik proses; load, warmup dan hot-swap di `serving.model_registry`"""
+    return serving.model_registry(MODEL_PATH)
+
+CHALLENGER_PATH = os.environ.get('FRAUD_CHALLENGER_PATH')
+
+@st.cache_resource
+def get_shadow_scorer():
+    """Shadow scorer challenger yang dibagi semua session; None jika FRAUD_CHALLENGER_PATH tidak di-set"""
+    if not CHALLENGER_PATH:
+        return None
+    return ShadowScorer(CHALLENGER_PATH)
+
+@st.cache_resource(max_entries=2)
+def get_drift_monitor(model_version, _reference):
+    """
+    Histogram drift yang dibagi semua session untuk satu versi model
+
+    Di-key dengan versi model: profil referensi ikut artifact, jadi model baru
+    memulai histogram baru. None jika artifact belum punya `drift_reference`.
+    """
+    if _reference is None:
+        return None
+    return DriftMonitor(_reference)
+
+@track_cache('evaluation')
+@st.cache_resource(max_entries=2)
+def load_evaluation(model_version):
+    """
+    Load artefak evaluasi (kurva ROC/PR, confusion matrix, metrik segmen) hasil training
+
+    Di-key dengan versi model agar ikut ter-reload saat model di-swap.
+    """
+    cache_miss()
+    return load_evaluation_artifacts('models/evaluation_artifacts.pkl')
+
 @st.cache_resource
-def load_model():
-    """Load model dan preprocessors dari file pickle"""
-    with open('models/fraud_detection_model.pkl', 'rb') as f:
-        artifacts = pickle.load(f)
-    return artifacts
+def get_history_store():
+    """Store riwayat prediksi (SQLite) yang dipakai bersama semua session"""
+    return PredictionHistoryStore('history/prediction_history.db')
 
+@track_cache('data_service')
+@st.cache_resource(max_entries=2)
+def get_data_service(dataset_hash):
+    """
+    Tabel transaksi Arrow read-only yang dibagi semua session dan tab
+
+    Di-key dengan content hash versi dataset: versi baru membuat service baru,
+    versi lama dilepas dari cache.
+    """
+    cache_miss()
+    return TransactionDataService.open(DATASET_DIR, csv_path='data/credit_card_transactions2.csv')
+
+def load_data(columns=None, start=None, end=None, states=None, categories=None, fraud_only=False):
+    """
+    Load dataset transaksi untuk visualisasi (versi terbaru dataset ber-partisi, fallback CSV)
+
+    Projection (`columns`) dan filter dijalankan di atas tabel Arrow bersama
+    (`get_data_service`); hasilnya DataFrame ber-ArrowDtype yang membungkus
+    buffer tabel tanpa salinan, jadi perlakukan sebagai read-only.
+    """
+    with step('data.load', columns=len(columns) if columns else None) as s:
+        version = TransactionDataset(DATASET_DIR).current_version()
+        service = get_data_service(version['content_hash'] if version else None)
+        frame = service.to_frame(
+            columns=columns, start=start, end=end,
+            states=states, categories=categories, fraud_only=fraud_only
+        )
+        s.rows = len(frame)
+    ROWS_LOADED.inc(len(frame))
+    return frame
+
+@track_cache('filter_options')
 @st.cache_data
-def load_data():
-    """Load dataset transaksi untuk visualisasi"""
-    df = pd.read_csv('data/credit_card_transactions2.csv')
-    return df
+def _filter_options(dataset_hash):
+    """Opsi filter dashboard; cache di-key dengan content hash versi dataset"""
+    cache_miss()
+    if dataset_hash is None:
+        return frame_filter_options(load_csv('data/credit_card_transactions2.csv', columns=FILTER_COLUMNS))
+    return TransactionDataset(DATASET_DIR).filter_options()
+
+def load_filter_options():
+    """Rentang tanggal dan daftar state/kategori dari manifest dataset (fallback CSV, sekali per versi)"""
+    version = TransactionDataset(DATASET_DIR).current_version()
+    return _filter_options(version['content_hash'] if version else None)
+
+@track_cache('sketch_summary')
+@st.cache_data
+def _sketch_summary(dataset_hash):
+    """Ringkasan sketch (approx); cache di-key dengan content hash versi dataset"""
+    cache_miss()
+    if dataset_hash is None:
+        sketches = DatasetSketches()
+        sketches.update(load_csv('data/credit_card_transactions2.csv', columns=SKETCH_COLUMNS))
+    else:
+        sketches = TransactionDataset(DATASET_DIR).sketches()
+    return sketches.summary()
+
+def load_sketch_summary(exact=False):
+    """
+    Ringkasan seluruh dataset: approx dari sketch (instan) atau exact (full scan)
+
+    Mode exact dipanggil dari thread background dashboard sehingga tidak
+    memakai cache Streamlit.
+    """
+    dataset = TransactionDataset(DATASET_DIR)
+    version = dataset.current_version()
+    if not exact:
+        return _sketch_summary(version['content_hash'] if version else None)
+    if version is None:
+        return exact_summary(load_csv('data/credit_card_transactions2.csv', columns=SKETCH_COLUMNS))
+    return exact_summary(dataset.load(columns=SKETCH_COLUMNS))
+
+def get_sql_source(start=None, end=None):
+    """Sumber file untuk backend DuckDB dashboard (partisi Parquet, fallback CSV)"""
+    dataset = TransactionDataset(DATASET_DIR)
+    if dataset.exists():
+        return {'parquet_files': dataset.partition_files(start=start, end=end)}
+    return {'csv_path': 'data/credit_card_transactions2.csv'}
+
+def render_timing_panel(profiler):
+    """Panel collapsible berisi span rerun ini (wall, CPU, peak memori, baris)"""
+    summary = profiler.summary()
+    if summary.empty:
+        return
+    top_level = summary[summary['depth'] == 0]
+    with st.expander(f"⏱️ Timing: {len(summary)} span, {top_level['wall_ms'].sum():,.0f} ms total"):
+        summary['span'] = ['\u2003' * depth + name for depth, name in zip(summary['depth'], summary['name'])]
+        columns = ['span', 'wall_ms', 'thread_cpu_ms', 'peak_mb', 'rows', 'thread']
+        st.dataframe(
+            summary[[col for col in columns if col in summary.columns]].round(2),
+            width='stretch', hide_index=True
+        )
 
-# Load model artifacts
+# Load model artifacts (satu snapshot per rerun; swap model berlaku di rerun berikutnya)
 try:
-    model_artifacts = load_model()
+    with step('app.load_model'):
+        model_registry = get_model_registry()
+    model_artifacts, model_version_info = model_registry.current()
     model = model_artifacts['model']
     scaler = model_artifacts['scaler']
     label_encoders = model_artifacts['label_encoders']
@@ -60,15 +226,38 @@ try:
     # Extract model info if available
     model_info = model_artifacts.get('model_info', {})
     performance = model_artifacts.get('performance', {})
+    decision = model_artifacts.get('decision', {})
+    decision_threshold = decision.get('threshold', 0.5)
 except FileNotFoundError:
     st.error("❌ Model belum di-training! Jalankan `training_model.py` terlebih dahulu.")
     st.stop()
 
 # ========================================
-# INITIALIZE SESSION STATE
+# READINESS & VERSI MODEL
 # ========================================
-if 'prediction_history' not in st.session_state:
-    st.session_state.prediction_history = []
+warmup_report = model_version_info['warmup']
+if READINESS.ready and warmup_report:
+    st.sidebar.caption(
+        f"🟢 Model siap · versi `{model_version_info['version'][:12]}` · warmup {warmup_report['seconds']:.1f}s "
+        f"(prediksi tunggal {warmup_report['cold_single_ms']:.0f} → {warmup_report['warm_single_ms']:.0f} ms)"
+    )
+else:
+    st.sidebar.caption(f"🔴 Warmup model gagal ({READINESS.error}); prediksi pertama bisa lebih lambat")
+
+last_reload = model_registry.events[-1] if model_registry.events else None
+if last_reload and last_reload['result'] == 'rejected':
+    st.sidebar.caption(f"⚠️ Model baru ditolak ({last_reload['time']}): {last_reload['error']}")
+
+# ========================================
+# PREDICTION HISTORY STORE, SHADOW & DRIFT
+# ========================================
+history_store = get_history_store()
+drift_monitor = get_drift_monitor(model_version_info['version'], model_artifacts.get('drift_reference'))
+try:
+    shadow_scorer = get_shadow_scorer()
+except (OSError, KeyError, pickle.UnpicklingError) as e:
+    st.sidebar.caption(f"⚠️ Challenger tidak bisa di-load ({CHALLENGER_PATH}): {e}")
+    shadow_scorer = None
 
 # ========================================
 # MAIN HEADER
@@ -95,39 +284,58 @@ tab_about, tab1, tab2, tab3, tab4, tab_contact = st.tabs([
 # ========================================
 # RENDER TABS
 # ========================================
-with tab_about:
+with tab_about, step('tab.about'):
     about_dataset.render()
 
-with tab1:
-    dashboard.render(load_data_func=load_data)
+with tab1, step('tab.dashboard'):
+    dashboard.render(
+        load_data_func=load_data,
+        sql_source_func=get_sql_source,
+        sketch_func=load_sketch_summary,
+        filter_options_func=load_filter_options
+    )
 
-with tab2:
+with tab2, step('tab.fraud_detection'):
     fraud_detection.render(
         model=model,
         scaler=scaler,
         label_encoders=label_encoders,
         feature_columns=feature_columns,
-        numerical_cols=numerical_cols
+        numerical_cols=numerical_cols,
+        decision_threshold=decision_threshold,
+        history_store=history_store,
+        shadow=shadow_scorer,
+        drift=drift_monitor
     )
 
-with tab3:
+with tab3, step('tab.machine_learning'):
     machine_learning.render(
         model=model,
         feature_columns=feature_columns,
         load_data_func=load_data
     )
 
-with tab4:
+with tab4, step('tab.model_performance'):
     model_performance.render(
         model=model,
         model_info=model_info,
         performance=performance,
-        feature_columns=feature_columns
+        feature_columns=feature_columns,
+        evaluation=load_evaluation(model_version_info['version']),
+        history_store=history_store,
+        shadow=shadow_scorer,
+        drift=drift_monitor
     )
 
-with tab_contact:
+with tab_contact, step('tab.contact'):
     contact_me.render()
 
+# ========================================
+# PROFILING
+# ========================================
+if profiler is not None:
+    render_timing_panel(profiler)
+
 # ========================================
 # FOOTER
 # ========================================
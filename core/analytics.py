@@ -0,0 +1,268 @@
+"""
+Analytics - Agregasi dashboard dengan backend pandas atau DuckDB (SQL)
+
+Kedua backend punya interface yang sama sehingga `tabs/dashboard.py` cukup
+memilih salah satu:
+
+- `PandasAggregator`: agregasi dari DataFrame yang sudah di-load ke memori.
+- `SqlAggregator`: agregasi dijalankan DuckDB (in-process, columnar,
+  multi-thread) langsung di atas file Parquet/CSV; yang kembali ke Python
+  hanya hasil agregasi kecil. Data mentah tidak perlu muat di memori proses
+  Streamlit.
+
+DuckDB opsional: jika tidak ter-install `DUCKDB_AVAILABLE` bernilai False
+dan dashboard tetap memakai pandas.
+"""
+import pandas as pd
+
+from core.dataset import DATE_COLUMN
+from core.timestamps import (DOB_DAYS_COLUMN, TRANS_EPOCH_COLUMN, age_from_days, epoch_to_datetime,
+                             hour_from_epoch, parse_date_days, parse_datetime_epoch, weekday_from_epoch)
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    duckdb = None
+    DUCKDB_AVAILABLE = False
+
+
+AGE_BINS = [0, 25, 40, 60, 100]
+AGE_LABELS = ['Young (18-25)', 'Adult (26-40)', 'Middle (41-60)', 'Senior (60+)']
+
+
+# ========================================
+# PANDAS BACKEND
+# ========================================
+def build_dashboard_frame(df_raw, today=None):
+    """
+    Frame ramping untuk dashboard: hanya kolom yang dipakai, dtype di-downcast
+
+    Kolom dibangun satu per satu dari df_raw (tanpa `copy()` seluruh frame);
+    kolom teks berulang menjadi categorical, angka kecil menjadi int8/int16,
+    amount menjadi float32, dan `dob` tidak disimpan setelah umur dihitung.
+    Waktu diambil dari kolom epoch yang sudah di-cache (`trans_epoch`,
+    `dob_days`) jika ada, selain itu di-parse dengan format tetap.
+
+    Returns:
+        DataFrame dengan kolom trans_date_trans_time, category, amt, gender,
+        state, is_fraud, hour, age, day_of_week, is_weekend
+    """
+    if TRANS_EPOCH_COLUMN in df_raw.columns:
+        trans_epoch = df_raw[TRANS_EPOCH_COLUMN].to_numpy(dtype='int64')
+    else:
+        trans_epoch = parse_datetime_epoch(df_raw[DATE_COLUMN])
+    if DOB_DAYS_COLUMN in df_raw.columns:
+        dob_days = df_raw[DOB_DAYS_COLUMN].to_numpy(dtype='int64')
+    else:
+        dob_days = parse_date_days(df_raw['dob'])
+    day_of_week = weekday_from_epoch(trans_epoch).astype('int8')
+
+    return pd.DataFrame({
+        DATE_COLUMN: epoch_to_datetime(trans_epoch),
+        'category': df_raw['category'].astype('category'),
+        'amt': df_raw['amt'].astype('float32'),
+        'gender': df_raw['gender'].astype('category'),
+        'state': df_raw['state'].astype('category'),
+        'is_fraud': df_raw['is_fraud'].astype('int8'),
+        'hour': hour_from_epoch(trans_epoch).astype('int8'),
+        'age': age_from_days(dob_days, today).astype('int16'),
+        'day_of_week': day_of_week,
+        'is_weekend': (day_of_week >= 5).astype('int8'),
+    }, index=df_raw.index)
+
+
+def memory_footprint(df):
+    """
+    Pemakaian memori per kolom (deep, termasuk isi string)
+
+    Returns:
+        DataFrame [column, dtype, bytes] diurutkan dari terbesar
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[col].dtype) for col in usage.index],
+        'bytes': usage.to_numpy(),
+    }).sort_values('bytes', ascending=False, ignore_index=True)
+
+
+class PandasAggregator:
+    """
+    Agregasi dashboard dari DataFrame (harus sudah punya kolom turunan)
+
+    Args:
+        df: DataFrame hasil `build_dashboard_frame`
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+    def overview(self):
+        """Dict total_trx, total_fraud, avg_amount"""
+        return {
+            'total_trx': int(len(self.df)),
+            'total_fraud': int(self.df['is_fraud'].sum()),
+            'avg_amount': float(self.df['amt'].astype('float64').mean()),
+        }
+
+    def value_counts(self, column):
+        """DataFrame [column, count] terurut dari count terbesar (seri: urut nilai)"""
+        counts = self.df[column].value_counts().reset_index()
+        counts.columns = [column, 'count']
+        counts = counts[counts['count'] > 0]
+        if isinstance(counts[column].dtype, pd.CategoricalDtype):
+            counts[column] = counts[column].astype(str)
+        return counts.sort_values(['count', column], ascending=[False, True], ignore_index=True)
+
+    def hour_counts(self):
+        """DataFrame [hour, count, fraud_count] untuk jam 0-23 yang ada"""
+        grouped = self.df.groupby('hour')['is_fraud'].agg(['size', 'sum']).astype('int64').reset_index()
+        grouped.columns = ['hour', 'count', 'fraud_count']
+        return grouped
+
+    def fraud_by_category(self, limit=10):
+        """DataFrame [category, fraud_count] top `limit`"""
+        fraud = self.df.groupby('category', observed=True)['is_fraud'].sum().astype('int64').reset_index()
+        fraud.columns = ['category', 'fraud_count']
+        fraud['category'] = fraud['category'].astype(str)
+        return fraud.sort_values(['fraud_count', 'category'], ascending=[False, True],
+                                 ignore_index=True).head(limit)
+
+    def fraud_by_age_group(self):
+        """DataFrame [age_group, count, fraud_count, fraud_rate]"""
+        groups = pd.cut(self.df['age'], bins=AGE_BINS, labels=AGE_LABELS)
+        grouped = self.df.groupby(groups, observed=True)['is_fraud'].agg(['size', 'sum']).astype('int64').reset_index()
+        grouped.columns = ['age_group', 'count', 'fraud_count']
+        grouped['age_group'] = grouped['age_group'].astype(str)
+        grouped['fraud_rate'] = grouped['fraud_count'] / grouped['count']
+        return grouped
+
+
+# ========================================
+# DUCKDB BACKEND
+# ========================================
+class SqlAggregator:
+    """
+    Agregasi dashboard sebagai SQL DuckDB di atas file Parquet atau CSV
+
+    Args:
+        parquet_files: List file Parquet (dataset ber-partisi)
+        csv_path: Path CSV (dipakai jika parquet_files kosong)
+        start, end, states, categories, fraud_only: Filter yang sama dengan
+            `core.dataset.filter_expression`
+        threads: Jumlah thread DuckDB (None = semua core)
+    """
+
+    def __init__(self, parquet_files=None, csv_path=None, start=None, end=None, states=None,
+                 categories=None, fraud_only=False, threads=None):
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("duckdb belum ter-install (pip install duckdb)")
+        if not parquet_files and not csv_path:
+            raise ValueError("Butuh parquet_files atau csv_path")
+
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+
+        literal = self._literal
+        if parquet_files:
+            source = f"read_parquet({literal(list(parquet_files))})"
+        else:
+            source = f"read_csv_auto({literal(csv_path)})"
+
+        conditions = []
+        if start:
+            conditions.append(f"{DATE_COLUMN} >= {literal(start)}")
+        if end:
+            conditions.append(f"{DATE_COLUMN} < {literal((pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))}")
+        if states:
+            conditions.append(f"state IN (SELECT unnest({literal(list(states))}))")
+        if categories:
+            conditions.append(f"category IN (SELECT unnest({literal(list(categories))}))")
+        if fraud_only:
+            conditions.append("is_fraud = 1")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # _source: baris mentah terfilter; trx: kolom turunan untuk agregasi.
+        # View tidak menerima parameter prepared statement, jadi nilai filter
+        # di-escape sebagai literal.
+        self.con.execute(f"CREATE TEMP VIEW _source AS SELECT * FROM {source} {where}")
+        self.con.execute(f"""
+            CREATE TEMP VIEW trx AS
+            SELECT
+                category, amt, gender, state, is_fraud,
+                hour(CAST({DATE_COLUMN} AS TIMESTAMP)) AS hour,
+                CAST(isodow(CAST({DATE_COLUMN} AS TIMESTAMP)) IN (6, 7) AS INTEGER) AS is_weekend,
+                CAST(floor(date_diff('day', CAST(dob AS DATE), current_date) / 365.25) AS INTEGER) AS age
+            FROM _source
+        """)
+
+    @staticmethod
+    def _literal(value):
+        """Literal SQL untuk string / list string (quote di-escape)"""
+        if isinstance(value, (list, tuple)):
+            return '[' + ', '.join(SqlAggregator._literal(v) for v in value) + ']'
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def close(self):
+        """Tutup koneksi DuckDB (in-memory) milik aggregator ini"""
+        self.con.close()
+
+    def query(self, sql):
+        """Jalankan SQL atas view `trx`, kembalikan DataFrame"""
+        return self.con.execute(sql).df()
+
+    def overview(self):
+        row = self.con.execute(
+            "SELECT count(*), coalesce(sum(is_fraud), 0), avg(amt) FROM trx"
+        ).fetchone()
+        return {'total_trx': int(row[0]), 'total_fraud': int(row[1]), 'avg_amount': float(row[2] or 0.0)}
+
+    def value_counts(self, column):
+        if column not in ('category', 'gender', 'state', 'is_weekend', 'is_fraud'):
+            raise ValueError(f"Kolom tidak didukung: {column}")
+        return self.query(f"SELECT {column}, count(*) AS count FROM trx GROUP BY 1 ORDER BY 2 DESC, 1")
+
+    def hour_counts(self):
+        return self.query(
+            "SELECT hour, count(*) AS count, sum(is_fraud) AS fraud_count FROM trx GROUP BY 1 ORDER BY 1"
+        )
+
+    def fraud_by_category(self, limit=10):
+        return self.query(
+            f"SELECT category, sum(is_fraud) AS fraud_count FROM trx "
+            f"GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT {int(limit)}"
+        )
+
+    def fraud_by_age_group(self):
+        cases = ' '.join(
+            f"WHEN age > {low} AND age <= {high} THEN '{label}'"
+            for low, high, label in zip(AGE_BINS[:-1], AGE_BINS[1:], AGE_LABELS)
+        )
+        order = ' '.join(f"WHEN '{label}' THEN {i}" for i, label in enumerate(AGE_LABELS))
+        grouped = self.query(f"""
+            SELECT age_group, count(*) AS count, sum(is_fraud) AS fraud_count
+            FROM (SELECT CASE {cases} END AS age_group, is_fraud FROM trx)
+            WHERE age_group IS NOT NULL
+            GROUP BY 1
+            ORDER BY CASE age_group {order} END
+        """)
+        grouped['fraud_rate'] = grouped['fraud_count'] / grouped['count']
+        return grouped
+
+    def sample(self, n_rows, columns, seed=42):
+        """
+        Sampel baris mentah (reservoir) untuk chart distribusi
+
+        Args:
+            n_rows: Jumlah baris maksimum
+            columns: Kolom sumber yang diambil
+        """
+        return self.con.execute(
+            f"SELECT {', '.join(columns)} FROM _source USING SAMPLE reservoir({int(n_rows)} ROWS) "
+            f"REPEATABLE ({int(seed)})"
+        ).df()
+
+    def close(self):
+        self.con.close()
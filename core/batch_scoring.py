@@ -0,0 +1,301 @@
+"""
+Batch Scoring - Scoring file besar paralel per baris dengan shared memory
+
+Feature matrix (float32, C-contiguous) ditaruh di shared memory sekali oleh
+proses utama. Worker di process pool memuat model sekali (n_jobs=1), membaca
+potongan baris langsung dari shared memory tanpa pickling, dan menulis
+probabilitas fraud ke array output bersama pada posisi yang sama sehingga
+hasil otomatis tersusun sesuai urutan input.
+
+Contoh:
+    python -m core.batch_scoring --csv data/credit_card_transactions2.csv --out scored.csv --workers 4
+    python -m core.batch_scoring --csv data/credit_card_transactions2.csv --benchmark 8 --rows 2000000
+    python -m core.batch_scoring --csv data/credit_card_transactions2.csv --challenger models/challenger.pkl
+    python -m core.batch_scoring --csv data/credit_card_transactions2.csv --drift
+    python -m core.batch_scoring --csv data/credit_card_transactions2.csv --binned
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from core.binning import binned_model
+from core.decision import DEFAULT_THRESHOLD, decide
+from core.early_exit import early_exit_predict_proba, resolve_settings
+from core.scoring import encode_features, engineer_features
+
+
+MODEL_PATH = 'models/fraud_detection_model.pkl'
+CHUNKS_PER_WORKER = 4
+
+_WORKER = {}
+
+
+# ========================================
+# WORKER
+# ========================================
+def _init_worker(model_path, x_name, out_name, shape, early_exit=None, threshold=DEFAULT_THRESHOLD,
+                 binned=False):
+    """Load model dan attach shared memory sekali per worker"""
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    with open(model_path, 'rb') as f:
+        artifacts = pickle.load(f)
+    model = artifacts['model']
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    if binned:
+        model = binned_model(model)
+
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    _WORKER.update({
+        'model': model,
+        'x_shm': x_shm,
+        'out_shm': out_shm,
+        'X': np.ndarray(shape, dtype=np.float32, buffer=x_shm.buf),
+        'out': np.ndarray((shape[0],), dtype=np.float64, buffer=out_shm.buf),
+        'early_exit': resolve_settings(artifacts, early_exit),
+        'threshold': threshold,
+    })
+
+
+def _score_range(bounds):
+    """Skor baris [start, stop) dan tulis probabilitas fraud ke output bersama"""
+    start, stop = bounds
+    X = _WORKER['X'][start:stop]
+    if _WORKER['early_exit']:
+        _WORKER['out'][start:stop], _ = early_exit_predict_proba(
+            _WORKER['model'], X, _WORKER['threshold'], **_WORKER['early_exit']
+        )
+    else:
+        _WORKER['out'][start:stop] = _WORKER['model'].predict_proba(X)[:, 1]
+    return stop - start
+
+
+def _partition(n_rows, workers, chunks_per_worker=CHUNKS_PER_WORKER):
+    """Bagi baris menjadi potongan kontigu agar beban worker seimbang"""
+    n_chunks = max(1, min(n_rows, workers * chunks_per_worker))
+    edges = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+# ========================================
+# SCORING
+# ========================================
+def prepare_matrix(raw_df, artifacts, features=None):
+    """
+    Feature engineering + encoding ke matrix float32 C-contiguous
+
+    Args:
+        features: Hasil `engineer_features(raw_df)` jika sudah dihitung (opsional)
+
+    Returns:
+        Tuple (X, valid_mask)
+    """
+    if features is None:
+        features = engineer_features(raw_df)
+    X, valid = encode_features(
+        features,
+        artifacts['label_encoders'],
+        artifacts['scaler'],
+        artifacts['feature_columns'],
+        artifacts['numerical_cols']
+    )
+    return np.ascontiguousarray(X.to_numpy(dtype=np.float32)), valid
+
+
+def score_matrix(X, model_path=MODEL_PATH, workers=None, early_exit=None, threshold=DEFAULT_THRESHOLD,
+                 binned=False):
+    """
+    Hitung probabilitas fraud untuk matrix fitur dengan process pool + shared memory
+
+    Args:
+        X: Matrix fitur float32 (n_rows, n_features)
+        model_path: Path model artifact (di-load oleh tiap worker)
+        workers: Jumlah proses (default: jumlah CPU)
+        early_exit: True (setting terverifikasi di artefak) atau dict override
+            {'chunk_size', 'delta'} untuk early-exit inference
+        threshold: Threshold keputusan yang dijaga oleh early exit
+        binned: True untuk memakai engine BinnedForest di worker
+
+    Returns:
+        Array probabilitas fraud (n_rows,) sesuai urutan input
+    """
+    workers = workers or os.cpu_count() or 1
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n_rows = X.shape[0]
+    if n_rows == 0:
+        return np.empty(0)
+
+    x_shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+    out_shm = shared_memory.SharedMemory(create=True, size=n_rows * np.dtype(np.float64).itemsize)
+    try:
+        np.ndarray(X.shape, dtype=np.float32, buffer=x_shm.buf)[:] = X
+        out = np.ndarray((n_rows,), dtype=np.float64, buffer=out_shm.buf)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model_path, x_shm.name, out_shm.name, X.shape,
+                                           early_exit, threshold, binned)) as executor:
+            scored = sum(executor.map(_score_range, _partition(n_rows, workers)))
+        if scored != n_rows:
+            raise RuntimeError(f"Hanya {scored:,} dari {n_rows:,} baris yang berhasil di-score")
+        return out.copy()
+    finally:
+        for shm in (x_shm, out_shm):
+            shm.close()
+            shm.unlink()
+
+
+def score_frame(raw_df, model_path=MODEL_PATH, workers=None, threshold=None, early_exit=None, shadow=None,
+                drift=None, binned=False):
+    """
+    Skor DataFrame transaksi mentah secara paralel
+
+    Args:
+        shadow: ShadowScorer challenger (opsional); hasil champion dikirim ke sana setelah selesai
+        drift: DriftMonitor (opsional); fitur batch ditambahkan ke histogram drift
+        early_exit: True (setting terverifikasi di artefak) atau dict override {'chunk_size', 'delta'}
+        binned: True untuk memakai engine BinnedForest
+
+    Returns:
+        DataFrame dengan kolom prob_fraud, prediction, valid (index sama dengan raw_df)
+    """
+    start = time.perf_counter()
+    with open(model_path, 'rb') as f:
+        artifacts = pickle.load(f)
+    if threshold is None:
+        threshold = artifacts.get('decision', {}).get('threshold', DEFAULT_THRESHOLD)
+
+    features = engineer_features(raw_df)
+    X, valid = prepare_matrix(raw_df, artifacts, features)
+    prob_fraud = np.full(len(X), np.nan)
+    prob_fraud[valid] = score_matrix(X[valid], model_path=model_path, workers=workers,
+                                     early_exit=early_exit, threshold=threshold, binned=binned)
+
+    scored = pd.DataFrame({
+        'prob_fraud': prob_fraud,
+        'prediction': np.where(valid, decide(np.nan_to_num(prob_fraud), threshold), 0),
+        'valid': valid,
+    }, index=raw_df.index)
+    if shadow is not None:
+        shadow.submit(raw_df, scored, source='batch', champion_seconds=time.perf_counter() - start)
+    if drift is not None:
+        drift.update(features)
+    return scored
+
+
+# ========================================
+# BENCHMARK
+# ========================================
+def benchmark_scaling(X, model_path=MODEL_PATH, max_workers=None, repeats=1):
+    """
+    Ukur waktu scoring untuk 1..max_workers proses
+
+    Worker startup (load model) ikut dihitung karena merupakan biaya nyata per batch job.
+
+    Returns:
+        DataFrame dengan kolom workers, seconds, rows_per_s, speedup, efficiency
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    rows = []
+    reference = None
+    for workers in range(1, max_workers + 1):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = score_matrix(X, model_path=model_path, workers=workers)
+            timings.append(time.perf_counter() - start)
+        if reference is None:
+            reference = result
+        elif not np.allclose(reference, result):
+            raise AssertionError(f"Hasil scoring dengan {workers} worker berbeda dari 1 worker")
+
+        seconds = min(timings)
+        rows.append({'workers': workers, 'seconds': seconds, 'rows_per_s': len(X) / seconds})
+
+    report = pd.DataFrame(rows)
+    report['speedup'] = report['seconds'].iloc[0] / report['seconds']
+    report['efficiency'] = report['speedup'] / report['workers']
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scoring paralel dengan shared memory")
+    parser.add_argument('--csv', required=True, help="CSV transaksi mentah")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', help="Simpan hasil scoring ke CSV")
+    parser.add_argument('--benchmark', type=int, default=None, metavar='N',
+                        help="Jalankan benchmark scaling 1..N worker")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="Benchmark: replikasi data sampai jumlah baris ini")
+    parser.add_argument('--early-exit', action='store_true', help="Evaluasi pohon per chunk dengan early exit")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Pohon per chunk early exit (default: nilai terverifikasi di artefak)")
+    parser.add_argument('--delta', type=float, default=None,
+                        help="Confidence bound early exit (default: nilai terverifikasi di artefak)")
+    parser.add_argument('--binned', action='store_true', help="Pakai engine BinnedForest (traversal bin integer)")
+    parser.add_argument('--challenger', help="Model challenger untuk shadow scoring (dibandingkan, tidak dipakai)")
+    parser.add_argument('--drift', action='store_true', help="Laporkan drift fitur batch vs profil training")
+    args = parser.parse_args()
+    early_exit = {'chunk_size': args.chunk_size, 'delta': args.delta} if args.early_exit else None
+
+    raw_df = pd.read_csv(args.csv)
+
+    if args.benchmark:
+        with open(args.model, 'rb') as f:
+            artifacts = pickle.load(f)
+        X, valid = prepare_matrix(raw_df, artifacts)
+        X = X[valid]
+        if args.rows and args.rows > len(X):
+            X = np.ascontiguousarray(np.resize(X, (args.rows, X.shape[1])))
+        report = benchmark_scaling(X, model_path=args.model, max_workers=args.benchmark)
+        print(f"Rows: {len(X):,}")
+        print(report.to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+        return
+
+    shadow = None
+    if args.challenger:
+        from core.shadow import ShadowScorer
+        shadow = ShadowScorer(args.challenger)
+
+    drift = None
+    if args.drift:
+        from core.drift import DriftMonitor
+        with open(args.model, 'rb') as f:
+            reference = pickle.load(f).get('drift_reference')
+        if reference is None:
+            parser.error("Model belum punya drift_reference; training ulang dengan fraud_detection_rf.py")
+        drift = DriftMonitor(reference)
+
+    start = time.perf_counter()
+    scored = score_frame(raw_df, model_path=args.model, workers=args.workers, early_exit=early_exit,
+                         shadow=shadow, drift=drift, binned=args.binned)
+    elapsed = time.perf_counter() - start
+    if args.out:
+        raw_df.join(scored).to_csv(args.out, index=False)
+    result = {
+        'rows': len(raw_df),
+        'valid': int(scored['valid'].sum()),
+        'flagged': int(scored['prediction'].sum()),
+        'seconds': round(elapsed, 3),
+        'rows_per_s': round(len(raw_df) / elapsed, 1),
+    }
+    if shadow is not None:
+        # Waktu champion di atas tidak termasuk challenger; tunggu challenger hanya untuk laporan
+        shadow.flush()
+        result['shadow'] = shadow.summary()
+    if drift is not None:
+        result['drift'] = json.loads(drift.report().to_json(orient='records'))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Quantized Binning - Traversal forest dengan bin integer (uint8/uint16/uint32)
+
+Setiap fitur dipetakan ke bin berdasarkan threshold split yang benar-benar
+dipakai forest. Untuk fitur f dengan edge terurut e_0 < e_1 < ... (float32):
+
+    bin(x) = jumlah edge yang < x  (searchsorted side='left')
+
+sehingga `x <= e_j` ekuivalen dengan `bin(x) <= j`. Node split cukup menyimpan
+index edge j, dan traversal hanya membandingkan integer kecil di matrix yang
+jauh lebih ringkas dari float64/float32. Karena threshold sudah dibulatkan ke
+float32 dengan aman (lihat `core.compaction._floor_float32`), leaf yang dicapai
+identik dengan traversal float.
+
+Engine ini opt-in di jalur scoring (`score_transactions(..., binned=True)`,
+`--binned` di `core.batch_scoring` dan `core.stream`); BinnedForest dibangun
+saat model di-load dan di-cache per model, bukan disimpan di artifact.
+"""
+import time
+import weakref
+
+import numpy as np
+
+from core.compaction import CompactForest, _flatten, _tree_nodes, traverse
+from core.decision import DEFAULT_THRESHOLD, decide
+
+
+# ========================================
+# BIN EDGES
+# ========================================
+def build_bin_edges(feature, threshold, n_features):
+    """
+    Kumpulkan threshold unik per fitur dari node internal
+
+    Args:
+        feature, threshold: Node array hasil flatten (leaf punya threshold inf)
+        n_features: Jumlah fitur input
+
+    Returns:
+        List array edge float32 terurut, satu per fitur
+    """
+    internal = np.isfinite(threshold)
+    return [np.unique(threshold[internal & (feature == f)]).astype(np.float32) for f in range(n_features)]
+
+
+def bin_dtype(edges):
+    """dtype integer terkecil yang muat semua bin (0..len(edges))"""
+    max_bin = max((len(e) for e in edges), default=0)
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_bin <= np.iinfo(dtype).max:
+            return dtype
+    raise ValueError(f"Terlalu banyak edge per fitur untuk di-bin: {max_bin:,}")
+
+
+def bin_matrix(X, edges, dtype):
+    """
+    Petakan matrix fitur float ke bin integer
+
+    Returns:
+        Matrix (n_rows, n_features) ber-dtype `dtype`, C-contiguous
+    """
+    X = np.asarray(X, dtype=np.float32)
+    binned = np.empty(X.shape, dtype=dtype)
+    for f, feature_edges in enumerate(edges):
+        binned[:, f] = np.searchsorted(feature_edges, X[:, f], side='left')
+    return binned
+
+
+# ========================================
+# BINNED FOREST
+# ========================================
+class BinnedForest:
+    """
+    Forest dengan node threshold berupa index bin, interface ala sklearn
+
+    Args:
+        arrays: Dict node array hasil `_flatten`
+        feature_importances_: Importance fitur dari forest asli
+        n_features_in_: Jumlah fitur input
+    """
+
+    def __init__(self, arrays, feature_importances_, n_features_in_):
+        self.edges = build_bin_edges(arrays['feature'], arrays['threshold'], n_features_in_)
+        self.dtype = bin_dtype(self.edges)
+
+        self.feature = arrays['feature']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        # Node id asli sklearn per node (None jika sumbernya CompactForest)
+        self.source_node = arrays.get('source_node')
+        self.max_depth = int(arrays['depth'])
+        self.feature_importances_ = feature_importances_
+        self.n_features_in_ = n_features_in_
+        self.classes_ = np.array([0, 1])
+
+        # Threshold node -> index edge pada fiturnya; leaf tidak pernah dibandingkan
+        bins = np.zeros(len(self.feature), dtype=self.dtype)
+        internal = np.flatnonzero(np.isfinite(arrays['threshold']))
+        for f, feature_edges in enumerate(self.edges):
+            nodes = internal[self.feature[internal] == f]
+            bins[nodes] = np.searchsorted(feature_edges, arrays['threshold'][nodes])
+        self.threshold = bins
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def transform(self, X):
+        """Matrix fitur float -> matrix bin integer"""
+        return bin_matrix(X, self.edges, self.dtype)
+
+    def apply_binned(self, X_binned, start=0, stop=None):
+        """Index leaf (n_rows, n_trees) untuk matrix yang sudah di-bin"""
+        return traverse(X_binned, self.feature, self.threshold, self.left, self.right,
+                        self.roots[start:stop], self.max_depth)
+
+    def tree_proba_sum(self, X, start=0, stop=None):
+        """Jumlah probabilitas fraud dari pohon [start, stop) untuk tiap baris"""
+        X_binned = X if X.dtype == self.dtype else self.transform(X)
+        return self.value[self.apply_binned(X_binned, start, stop)].sum(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X):
+        prob_fraud = self.tree_proba_sum(np.asarray(X)) / self.n_estimators
+        return np.column_stack([1.0 - prob_fraud, prob_fraud])
+
+    def predict(self, X, threshold=DEFAULT_THRESHOLD):
+        return decide(self.predict_proba(X)[:, 1], threshold)
+
+
+def build_binned_forest(model):
+    """
+    Bangun BinnedForest dari RandomForestClassifier atau CompactForest
+
+    Returns:
+        BinnedForest dengan pohon dan leaf yang sama dengan model asal
+    """
+    if isinstance(model, CompactForest):
+        arrays = {
+            'feature': model.feature, 'threshold': model.threshold, 'left': model.left,
+            'right': model.right, 'value': model.value, 'roots': model.roots, 'depth': model.max_depth,
+        }
+    else:
+        arrays = _flatten([_tree_nodes(estimator) for estimator in model.estimators_])
+    return BinnedForest(arrays, model.feature_importances_, model.n_features_in_)
+
+
+# BinnedForest per model; dibangun sekali per model yang di-load lalu dipakai ulang
+_BINNED_MODELS = weakref.WeakKeyDictionary()
+
+
+def binned_model(model):
+    """BinnedForest untuk `model` (di-cache selama model masih hidup)"""
+    if isinstance(model, BinnedForest):
+        return model
+    binned = _BINNED_MODELS.get(model)
+    if binned is None:
+        binned = _BINNED_MODELS[model] = build_binned_forest(model)
+    return binned
+
+
+# ========================================
+# VERIFIKASI
+# ========================================
+def verify_binned(model, binned, X, threshold=DEFAULT_THRESHOLD):
+    """
+    Pastikan BinnedForest identik dengan model asal
+
+    Leaf yang dicapai dibandingkan dengan traversal float pada node array yang
+    sama; probabilitas dan keputusan dibandingkan dengan `model.predict_proba`.
+
+    Returns:
+        Dict berisi jumlah leaf/keputusan berbeda, selisih probabilitas maksimum,
+        ukuran matrix dan speedup
+    """
+    X32 = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+
+    start = time.perf_counter()
+    reference = model.predict_proba(X)[:, 1]
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X_binned = binned.transform(X32)
+    leaves = binned.apply_binned(X_binned)
+    proba = binned.value[leaves].sum(axis=1, dtype=np.float64) / binned.n_estimators
+    binned_seconds = time.perf_counter() - start
+
+    float_threshold = np.full(binned.n_nodes, np.inf, dtype=np.float32)
+    internal = np.flatnonzero(binned.left != np.arange(binned.n_nodes))
+    for node in internal:
+        float_threshold[node] = binned.edges[binned.feature[node]][binned.threshold[node]]
+    float_leaves = traverse(X32, binned.feature, float_threshold, binned.left, binned.right,
+                            binned.roots, binned.max_depth)
+
+    return {
+        'rows': int(len(X32)),
+        'dtype': np.dtype(binned.dtype).name,
+        'max_bins': int(max(len(e) for e in binned.edges)) + 1,
+        'leaf_mismatches': int((leaves != float_leaves).any(axis=1).sum()),
+        'decision_mismatches': int((decide(reference, threshold) != decide(proba, threshold)).sum()),
+        'max_abs_diff': float(np.abs(reference - proba).max()) if len(proba) else 0.0,
+        'matrix_bytes_float64': int(X32.size * 8),
+        'matrix_bytes_binned': int(X_binned.nbytes),
+        'reference_seconds': reference_seconds,
+        'binned_seconds': binned_seconds,
+        'speedup': reference_seconds / binned_seconds if binned_seconds > 0 else float('inf'),
+    }
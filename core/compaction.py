@@ -0,0 +1,391 @@
+"""
+Model Compaction - Memperkecil RandomForest untuk serving
+
+Tahapan:
+1. Seleksi pohon: greedy forward selection di validation split (bagian dari
+   data training, bukan test set) sampai ROC-AUC dan recall berada dalam
+   toleransi terhadap forest penuh, dengan jumlah pohon maksimum.
+2. Pruning subtree: node yang kedua anaknya leaf dengan probabilitas fraud
+   hampir sama digabung menjadi satu leaf (diulang sampai stabil). Model
+   hasil pruning divalidasi ulang; jika keluar toleransi, pruning dibatalkan.
+3. Penyimpanan node array dengan dtype terkecil: feature id int16,
+   threshold float32, child index int32, nilai leaf float32.
+
+Hasilnya `CompactForest` yang punya interface predict/predict_proba seperti
+estimator sklearn sehingga bisa langsung menggantikan `artifacts['model']`.
+"""
+import io
+import pickle
+import time
+
+import numpy as np
+from scipy.stats import rankdata
+from sklearn.metrics import recall_score, roc_auc_score
+
+from core.decision import DEFAULT_THRESHOLD, decide
+
+
+ROW_BLOCK = 8192
+MAX_SELECTED_TREES = 50
+
+
+# ========================================
+# TRAVERSAL
+# ========================================
+def traverse(X, feature, threshold, left, right, roots, depth, row_block=ROW_BLOCK):
+    """
+    Telusuri banyak pohon sekaligus secara vectorized
+
+    Leaf disimpan dengan left == right == dirinya sendiri sehingga baris yang
+    sudah sampai leaf tetap di tempat; cukup iterasi sebanyak `depth`.
+
+    Args:
+        X: Matrix fitur (n_rows, n_features); dtype harus sebanding dengan threshold
+        feature, threshold, left, right: Node array hasil flatten
+        roots: Index root tiap pohon yang ditelusuri
+        depth: Kedalaman maksimum pohon
+
+    Returns:
+        Matrix index leaf (n_rows, n_trees)
+    """
+    n_rows = X.shape[0]
+    leaves = np.empty((n_rows, len(roots)), dtype=np.int32)
+    for start in range(0, n_rows, row_block):
+        block = X[start:start + row_block]
+        rows = np.arange(block.shape[0])[:, None]
+        node = np.broadcast_to(roots, (block.shape[0], len(roots))).copy()
+        for _ in range(depth):
+            go_left = block[rows, feature[node]] <= threshold[node]
+            node = np.where(go_left, left[node], right[node])
+        leaves[start:start + block.shape[0]] = node
+    return leaves
+
+
+def _floor_float32(values):
+    """Bulatkan ke float32 terbesar yang <= nilai asli (perbandingan x <= t tetap identik)"""
+    rounded = values.astype(np.float32)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def _tree_nodes(estimator):
+    """Ambil node array satu pohon sklearn dengan probabilitas fraud per node"""
+    tree = estimator.tree_
+    value = tree.value[:, 0, :]
+    totals = value.sum(axis=1)
+    prob = np.divide(value[:, 1], totals, out=np.zeros(len(totals)), where=totals > 0)
+    return {
+        'feature': tree.feature.copy(),
+        'threshold': tree.threshold.copy(),
+        'left': tree.children_left.copy(),
+        'right': tree.children_right.copy(),
+        'prob': prob,
+        'weight': tree.weighted_n_node_samples.copy(),
+    }
+
+
+def prune_tree(nodes, tolerance):
+    """
+    Gabungkan split yang kedua anaknya leaf dengan selisih probabilitas < tolerance
+
+    Dilakukan bottom-up sampai tidak ada perubahan; nodes diubah in-place.
+
+    Returns:
+        Jumlah split yang dihapus
+    """
+    left, right, prob, weight = nodes['left'], nodes['right'], nodes['prob'], nodes['weight']
+    removed = 0
+    changed = True
+    while changed:
+        changed = False
+        internal = np.flatnonzero(left >= 0)
+        child_l, child_r = left[internal], right[internal]
+        both_leaves = (left[child_l] < 0) & (left[child_r] < 0)
+        close = np.abs(prob[child_l] - prob[child_r]) < tolerance
+        for node in internal[both_leaves & close]:
+            l, r = left[node], right[node]
+            total = weight[l] + weight[r]
+            prob[node] = (prob[l] * weight[l] + prob[r] * weight[r]) / total if total > 0 else prob[node]
+            left[node] = right[node] = -1
+            removed += 1
+            changed = True
+    return removed
+
+
+def _flatten(trees):
+    """Gabungkan node pohon yang reachable ke array global dengan dtype ringkas"""
+    features, thresholds, lefts, rights, probs, roots, sources = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for nodes in trees:
+        # Renumber node yang masih reachable (pre-order) setelah pruning
+        order, depth_of = [], {}
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            order.append(node)
+            depth_of[node] = depth
+            if nodes['left'][node] >= 0:
+                stack.append((nodes['right'][node], depth + 1))
+                stack.append((nodes['left'][node], depth + 1))
+        new_id = {old: offset + i for i, old in enumerate(order)}
+        max_depth = max(max_depth, max(depth_of.values()))
+
+        order = np.array(order)
+        is_leaf = nodes['left'][order] < 0
+        self_ids = np.arange(offset, offset + len(order))
+        features.append(np.where(is_leaf, 0, nodes['feature'][order]))
+        thresholds.append(np.where(is_leaf, np.inf, nodes['threshold'][order]))
+        lefts.append(np.where(is_leaf, self_ids, [new_id.get(c, -1) for c in nodes['left'][order]]))
+        rights.append(np.where(is_leaf, self_ids, [new_id.get(c, -1) for c in nodes['right'][order]]))
+        probs.append(nodes['prob'][order])
+        sources.append(order)
+        roots.append(offset)
+        offset += len(order)
+
+    return {
+        'feature': np.concatenate(features).astype(np.int16),
+        'threshold': _floor_float32(np.concatenate(thresholds)),
+        'left': np.concatenate(lefts).astype(np.int32),
+        'right': np.concatenate(rights).astype(np.int32),
+        'value': np.concatenate(probs).astype(np.float32),
+        'roots': np.array(roots, dtype=np.int32),
+        'source_node': np.concatenate(sources).astype(np.int32),
+        'depth': max_depth,
+    }
+
+
+# ========================================
+# COMPACT FOREST
+# ========================================
+class CompactForest:
+    """
+    Forest ringkas dengan interface predict/predict_proba ala sklearn
+
+    Args:
+        arrays: Dict node array hasil `_flatten`
+        feature_importances_: Importance fitur dari forest asli (untuk tab UI)
+        n_features_in_: Jumlah fitur input
+    """
+
+    def __init__(self, arrays, feature_importances_, n_features_in_):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['depth'])
+        self.feature_importances_ = feature_importances_
+        self.n_features_in_ = n_features_in_
+        self.classes_ = np.array([0, 1])
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _as_matrix(self, X):
+        return np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+
+    def tree_proba_sum(self, X, start=0, stop=None):
+        """Jumlah probabilitas fraud dari pohon [start, stop) untuk tiap baris"""
+        roots = self.roots[start:stop]
+        leaves = traverse(self._as_matrix(X), self.feature, self.threshold, self.left, self.right,
+                          roots, self.max_depth)
+        return self.value[leaves].sum(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X):
+        prob_fraud = self.tree_proba_sum(X) / self.n_estimators
+        return np.column_stack([1.0 - prob_fraud, prob_fraud])
+
+    def predict(self, X, threshold=DEFAULT_THRESHOLD):
+        return decide(self.predict_proba(X)[:, 1], threshold)
+
+
+def per_tree_probabilities(forest, X):
+    """Matrix probabilitas fraud per pohon (n_rows, n_trees) untuk seleksi pohon"""
+    X = np.asarray(X, dtype=np.float32)
+    return np.column_stack([est.predict_proba(X)[:, 1] for est in forest.estimators_])
+
+
+def auc_columns(y_true, scores):
+    """
+    ROC-AUC setiap kolom `scores` sekaligus (statistik Mann-Whitney)
+
+    Skor yang sama mendapat rank rata-rata, sehingga hasilnya identik dengan
+    `roc_auc_score` per kolom.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    ranks = rankdata(scores, axis=0)
+    return (ranks[y_true].sum(axis=0) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def tolerance_targets(y_true, full_proba, threshold=DEFAULT_THRESHOLD, auc_tolerance=0.002,
+                      recall_tolerance=0.005):
+    """Batas bawah ROC-AUC dan recall relatif terhadap forest penuh"""
+    return {
+        'roc_auc': roc_auc_score(y_true, full_proba) - auc_tolerance,
+        'recall': recall_score(y_true, decide(full_proba, threshold)) - recall_tolerance,
+    }
+
+
+def select_trees(tree_proba, y_true, threshold=DEFAULT_THRESHOLD, auc_tolerance=0.002,
+                 recall_tolerance=0.005, min_trees=10, max_trees=MAX_SELECTED_TREES):
+    """
+    Greedy forward selection: tambah pohon yang paling menaikkan ROC-AUC
+    sampai AUC dan recall berada dalam toleransi forest penuh
+
+    Jumlah probabilitas pohon terpilih disimpan sebagai running sum, jadi
+    setiap langkah hanya menilai `running_sum + kandidat` untuk semua kandidat
+    sekaligus (satu ranking vectorized per langkah). `min_trees` mencegah
+    seleksi terlalu menempel pada validation split; `max_trees` membatasi
+    jumlah langkah.
+
+    Args:
+        tree_proba: Matrix probabilitas fraud per pohon (n_rows, n_trees) di validation split
+        y_true: Label validation split
+
+    Returns:
+        List index pohon terpilih (urut sesuai urutan penambahan)
+    """
+    y_true = np.asarray(y_true)
+    n_trees = tree_proba.shape[1]
+    max_trees = min(max_trees or n_trees, n_trees)
+    targets = tolerance_targets(y_true, tree_proba.mean(axis=1), threshold, auc_tolerance, recall_tolerance)
+
+    selected = []
+    running_sum = np.zeros(len(y_true))
+    remaining = np.arange(n_trees)
+    while len(remaining) and len(selected) < max_trees:
+        # Membagi dengan k tidak mengubah ranking, jadi AUC cukup dihitung dari jumlahnya
+        scores = auc_columns(y_true, running_sum[:, None] + tree_proba[:, remaining])
+        best_index = int(np.argmax(scores))
+        best = int(remaining[best_index])
+        remaining = np.delete(remaining, best_index)
+        selected.append(best)
+        running_sum += tree_proba[:, best]
+
+        k = len(selected)
+        if k >= min_trees and (scores[best_index] >= targets['roc_auc']
+                and recall_score(y_true, decide(running_sum / k, threshold)) >= targets['recall']):
+            break
+    return selected
+
+
+def _validation_metrics(model, X, y_true, threshold):
+    proba = model.predict_proba(X)[:, 1]
+    return {'roc_auc': float(roc_auc_score(y_true, proba)),
+            'recall': float(recall_score(y_true, decide(proba, threshold)))}
+
+
+def compact_forest(forest, X_val, y_val, threshold=DEFAULT_THRESHOLD, auc_tolerance=0.002,
+                   recall_tolerance=0.005, prune_tolerance=0.01, min_trees=10, max_trees=MAX_SELECTED_TREES):
+    """
+    Bangun CompactForest dari RandomForestClassifier terlatih
+
+    Args:
+        forest: RandomForestClassifier
+        X_val, y_val: Validation split untuk seleksi pohon (jangan pakai test set:
+                      metrik test dari model hasil seleksi akan bias optimis)
+        threshold: Threshold keputusan (untuk menjaga recall)
+        auc_tolerance: Penurunan ROC-AUC maksimum yang diizinkan
+        recall_tolerance: Penurunan recall maksimum yang diizinkan
+        prune_tolerance: Selisih probabilitas leaf maksimum untuk menggabungkan split
+        min_trees: Jumlah pohon minimum yang dipertahankan
+        max_trees: Jumlah pohon maksimum hasil seleksi
+
+    Returns:
+        Tuple (CompactForest, info dict); info['validation'] berisi metrik validation
+        model akhir, info['within_tolerance'] apakah metrik itu memenuhi toleransi
+    """
+    tree_proba = per_tree_probabilities(forest, X_val)
+    targets = tolerance_targets(y_val, tree_proba.mean(axis=1), threshold, auc_tolerance, recall_tolerance)
+    selected = select_trees(tree_proba, y_val, threshold, auc_tolerance, recall_tolerance, min_trees, max_trees)
+
+    def build(prune):
+        trees = [_tree_nodes(forest.estimators_[i]) for i in selected]
+        pruned = sum(prune_tree(nodes, prune_tolerance) for nodes in trees) if prune else 0
+        compact = CompactForest(_flatten(trees), forest.feature_importances_, forest.n_features_in_)
+        metrics = _validation_metrics(compact, X_val, y_val, threshold)
+        ok = metrics['roc_auc'] >= targets['roc_auc'] and metrics['recall'] >= targets['recall']
+        return compact, pruned, metrics, ok
+
+    compact, pruned, metrics, ok = build(prune=prune_tolerance > 0)
+    pruning_reverted = False
+    if pruned and not ok:
+        # Pruning membuat model keluar toleransi: pakai pohon terpilih tanpa pruning
+        compact, pruned, metrics, ok = build(prune=False)
+        pruning_reverted = True
+
+    info = {
+        'selected_trees': selected,
+        'n_trees_original': len(forest.estimators_),
+        'n_trees_compact': len(selected),
+        'nodes_original': int(sum(est.tree_.node_count for est in forest.estimators_)),
+        'nodes_compact': compact.n_nodes,
+        'pruned_splits': pruned,
+        'pruning_reverted': pruning_reverted,
+        'targets': targets,
+        'validation': metrics,
+        'within_tolerance': ok,
+    }
+    return compact, info
+
+
+# ========================================
+# REPORT
+# ========================================
+def _pickled_size(obj):
+    buffer = io.BytesIO()
+    pickle.dump(obj, buffer)
+    return buffer.tell()
+
+
+def _latency(model, X, repeats=5):
+    """Waktu predict_proba terbaik (detik) dari beberapa ulangan"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compaction_report(original, compact, X_test, y_test, threshold=DEFAULT_THRESHOLD, auc_tolerance=0.002,
+                      recall_tolerance=0.005):
+    """
+    Bandingkan ukuran, latency dan akurasi forest asli vs compact
+
+    Args:
+        X_test, y_test: Holdout yang tidak dipakai untuk seleksi pohon maupun threshold
+
+    Returns:
+        Dict dengan entri 'original' dan 'compact' plus rasio dan 'within_tolerance'
+        (metrik holdout compact dalam toleransi terhadap forest asli)
+    """
+    single_row = X_test[:1]
+    report = {}
+    for name, model in (('original', original), ('compact', compact)):
+        proba = model.predict_proba(X_test)[:, 1]
+        report[name] = {
+            'size_mb': _pickled_size(model) / 1024 ** 2,
+            'batch_latency_ms': _latency(model, X_test) * 1000,
+            'single_latency_ms': _latency(model, single_row, repeats=20) * 1000,
+            'roc_auc': roc_auc_score(y_test, proba),
+            'recall': recall_score(y_test, decide(proba, threshold)),
+        }
+    report['within_tolerance'] = bool(
+        report['compact']['roc_auc'] >= report['original']['roc_auc'] - auc_tolerance
+        and report['compact']['recall'] >= report['original']['recall'] - recall_tolerance
+    )
+    report['size_ratio'] = report['original']['size_mb'] / report['compact']['size_mb']
+    report['batch_speedup'] = report['original']['batch_latency_ms'] / report['compact']['batch_latency_ms']
+    report['single_speedup'] = report['original']['single_latency_ms'] / report['compact']['single_latency_ms']
+    return report
@@ -0,0 +1,95 @@
+"""
+Data Service - Tabel transaksi read-only yang dibagi semua session dan tab
+
+Dataset di-load sekali menjadi `pyarrow.Table` (immutable) dan disimpan
+sebagai resource Streamlit, bukan `st.cache_data` yang mem-pickle lalu
+mengembalikan salinan DataFrame utuh ke setiap pemanggil. Setiap tab meminta
+"view" berisi kolom dan baris yang dibutuhkan saja:
+
+- projection kolom tidak menyalin data (kolom Arrow dipakai bersama);
+- filter hanya mengalokasikan baris yang lolos;
+- konversi ke pandas memakai `pd.ArrowDtype` sehingga buffer Arrow dibungkus,
+  bukan disalin ke array NumPy baru;
+- kolom waktu di-parse sekali saat load menjadi kolom epoch integer
+  (`trans_epoch`, `dob_days`, lihat `core.timestamps`) sehingga tab tidak
+  mem-parse string tanggal lagi di setiap rerun.
+
+Karena tabel tidak bisa diubah, pemakaian bersama antar thread/session aman.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from core.dataset import DATASET_DIR, TransactionDataset, filter_expression
+from core.timestamps import add_epoch_columns
+
+
+class TransactionDataService:
+    """
+    Sumber data transaksi bersama (read-only)
+
+    Args:
+        table: pyarrow.Table berisi seluruh transaksi (schema CSV dataset + kolom epoch)
+        content_hash: Content hash versi dataset (None untuk fallback CSV)
+    """
+
+    def __init__(self, table, content_hash=None):
+        self.table = table
+        self.content_hash = content_hash
+
+    @classmethod
+    def open(cls, dataset_root=DATASET_DIR, csv_path=None):
+        """
+        Load versi terbaru dataset ber-partisi, fallback ke CSV
+
+        Args:
+            dataset_root: Folder `TransactionDataset`
+            csv_path: CSV yang dipakai jika dataset belum di-ingest
+        """
+        dataset = TransactionDataset(dataset_root)
+        version = dataset.current_version()
+        if version is not None:
+            table = ds.dataset(dataset.partition_files(), format='parquet').to_table()
+            return cls(add_epoch_columns(table.combine_chunks()), version['content_hash'])
+        if csv_path is None:
+            raise FileNotFoundError(f"Dataset belum ada di {dataset_root} dan csv_path tidak diberikan")
+        table = pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False)
+        return cls(add_epoch_columns(table), None)
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    @property
+    def nbytes(self):
+        """Ukuran buffer Arrow yang dibagi semua session"""
+        return self.table.nbytes
+
+    def select(self, columns=None, start=None, end=None, states=None, categories=None, fraud_only=False):
+        """
+        Subset tabel sebagai pyarrow.Table
+
+        Args:
+            columns: Subset kolom (None = semua)
+            start, end, states, categories, fraud_only: Lihat `filter_expression`
+
+        Returns:
+            pyarrow.Table; tanpa filter hasilnya berbagi buffer dengan tabel induk
+        """
+        table = self.table
+        row_filter = filter_expression(start, end, states, categories, fraud_only)
+        if row_filter is not None:
+            table = table.filter(row_filter)
+        if columns is not None:
+            table = table.select(list(columns))
+        return table
+
+    def to_frame(self, columns=None, **filters):
+        """
+        Subset sebagai DataFrame pandas ber-`pd.ArrowDtype` (tanpa salin buffer)
+
+        Perlakukan hasilnya sebagai read-only; turunkan kolom baru ke frame
+        baru (mis. `core.analytics.build_dashboard_frame`) alih-alih menulis
+        ke frame ini.
+        """
+        return self.select(columns, **filters).to_pandas(types_mapper=pd.ArrowDtype)
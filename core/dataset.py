@@ -0,0 +1,396 @@
+"""
+Dataset - Penyimpanan transaksi ber-partisi tanggal dengan versi dan hash konten
+
+Layout di disk (append-only, file lama tidak pernah ditulis ulang):
+
+    data/dataset/
+        manifest.json
+        fingerprints.npy                        # index dedup (core.dedup)
+        sketches.pkl                            # quantile/distinct/top-k sketch (core.sketches)
+        month=2019-01/part-v00001.parquet
+        month=2019-01/part-v00002.parquet       # bulan yang sama, append berikutnya
+        ...
+
+Partisi per bulan (bukan per hari) agar dataset kecil tidak pecah menjadi
+ratusan file mungil; manifest mencatat tanggal min/max tiap file sehingga
+load dengan rentang tanggal tetap hanya membuka file yang overlap, lalu
+memfilter baris di dalamnya. Manifest juga mencatat daftar state/kategori tiap
+file sehingga opsi filter dashboard tidak perlu membaca data sama sekali.
+
+Setiap append membuat satu versi baru di manifest berisi jumlah baris dan
+content hash (sha256 dari hash seluruh file partisi). Cache training dan
+dashboard memakai content hash ini sebagai key.
+
+Contoh:
+    python -m core.dataset ingest data/credit_card_transactions2.csv
+    python -m core.dataset info
+"""
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.dedup import FingerprintIndex, deduplicate
+from core.sketches import SKETCH_COLUMNS, DatasetSketches
+
+
+DATASET_DIR = 'data/dataset'
+MANIFEST_NAME = 'manifest.json'
+INDEX_NAME = 'fingerprints.npy'
+SKETCHES_NAME = 'sketches.pkl'
+DATE_COLUMN = 'trans_date_trans_time'
+FILTER_COLUMNS = [DATE_COLUMN, 'state', 'category']
+ROW_GROUP_SIZE = 50_000
+
+
+# ========================================
+# FILTER (predicate pushdown)
+# ========================================
+def _day_after(date):
+    return (pd.Timestamp(date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def filter_expression(start=None, end=None, states=None, categories=None, fraud_only=False):
+    """
+    Bangun predicate pyarrow untuk filter dashboard
+
+    Kolom tanggal berupa string 'YYYY-MM-DD HH:MM:SS' sehingga perbandingan
+    string sama dengan urutan waktu; batas `end` inklusif satu hari penuh.
+
+    Returns:
+        pyarrow.dataset.Expression atau None jika tanpa filter
+    """
+    conditions = []
+    if start:
+        conditions.append(ds.field(DATE_COLUMN) >= start)
+    if end:
+        conditions.append(ds.field(DATE_COLUMN) < _day_after(end))
+    if states:
+        conditions.append(ds.field('state').isin(list(states)))
+    if categories:
+        conditions.append(ds.field('category').isin(list(categories)))
+    if fraud_only:
+        conditions.append(ds.field('is_fraud') == 1)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def filter_frame(df, start=None, end=None, states=None, categories=None, fraud_only=False):
+    """Padanan `filter_expression` untuk DataFrame pandas (fallback CSV)"""
+    mask = pd.Series(True, index=df.index)
+    dates = df[DATE_COLUMN].astype(str) if (start or end) else None
+    if start:
+        mask &= dates >= start
+    if end:
+        mask &= dates < _day_after(end)
+    if states:
+        mask &= df['state'].isin(states)
+    if categories:
+        mask &= df['category'].isin(categories)
+    if fraud_only:
+        mask &= df['is_fraud'] == 1
+    return df[mask]
+
+
+def load_csv(path, columns=None, **filters):
+    """
+    Load CSV dengan projection + filter yang sama seperti `TransactionDataset.load`
+
+    Kolom yang dibutuhkan filter ikut dibaca lalu dibuang setelah filtering.
+    """
+    filter_columns = {
+        'start': DATE_COLUMN, 'end': DATE_COLUMN, 'states': 'state',
+        'categories': 'category', 'fraud_only': 'is_fraud',
+    }
+    usecols = None
+    if columns is not None:
+        needed = {filter_columns[key] for key, value in filters.items() if value}
+        usecols = list(dict.fromkeys(list(columns) + sorted(needed - set(columns))))
+    df = filter_frame(pd.read_csv(path, usecols=usecols), **filters)
+    return df[list(columns)] if columns is not None else df
+
+
+def frame_filter_options(df):
+    """
+    Opsi filter dashboard dari DataFrame berisi FILTER_COLUMNS
+
+    Returns:
+        Dict min_date, max_date ('YYYY-MM-DD' atau None), states, categories (list terurut)
+    """
+    dates = df[DATE_COLUMN].astype(str).str[:10]
+    return {
+        'min_date': dates.min() if len(dates) else None,
+        'max_date': dates.max() if len(dates) else None,
+        'states': sorted(df['state'].astype(str).unique()),
+        'categories': sorted(df['category'].astype(str).unique()),
+    }
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TransactionDataset:
+    """
+    Dataset transaksi append-only ber-partisi per tanggal transaksi
+
+    Args:
+        root: Folder dataset
+    """
+
+    def __init__(self, root=DATASET_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.manifest = self._read_manifest()
+
+    # ----------------------------------------
+    # MANIFEST
+    # ----------------------------------------
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {'versions': [], 'partitions': {}, 'schema': None}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def exists(self):
+        """True jika dataset sudah punya minimal satu versi"""
+        return bool(self.manifest['versions'])
+
+    def current_version(self):
+        """
+        Info versi terbaru
+
+        Returns:
+            Dict {version, created_at, rows_added, total_rows, content_hash, partitions_added}
+            atau None jika dataset masih kosong
+        """
+        return self.manifest['versions'][-1] if self.manifest['versions'] else None
+
+    def partitions(self):
+        """Daftar partisi bulan (string YYYY-MM) terurut"""
+        return sorted(self.manifest['partitions'])
+
+    def _content_hash(self):
+        digest = hashlib.sha256()
+        for month in self.partitions():
+            for part in self.manifest['partitions'][month]:
+                digest.update(f"{part['file']}:{part['sha256']}\n".encode())
+        return digest.hexdigest()
+
+    # ----------------------------------------
+    # APPEND
+    # ----------------------------------------
+    def append(self, df):
+        """
+        Tambahkan transaksi baru sebagai versi baru
+
+        Baris yang sudah pernah di-ingest (fingerprint trans_num) dibuang, lalu
+        baris baru ditulis ke file parquet baru per bulan transaksi.
+
+        Args:
+            df: DataFrame transaksi dengan schema CSV dataset
+
+        Returns:
+            Dict info versi (versi lama jika tidak ada baris baru)
+        """
+        os.makedirs(self.root, exist_ok=True)
+        index = FingerprintIndex(os.path.join(self.root, INDEX_NAME))
+        new_rows, _ = deduplicate(df, index)
+        if new_rows.empty:
+            return self.current_version()
+        sketches = self.sketches()
+
+        if self.manifest['schema'] is None:
+            self.manifest['schema'] = {col: str(dtype) for col, dtype in new_rows.dtypes.items()}
+        else:
+            new_rows = new_rows[list(self.manifest['schema'])].astype(self.manifest['schema'])
+
+        version = len(self.manifest['versions']) + 1
+        dates = new_rows[DATE_COLUMN].astype(str).str[:10]
+        added = []
+        for month, part_df in new_rows.groupby(dates.str[:7], sort=True):
+            # Urut per waktu agar statistik min/max row group efektif untuk filter tanggal
+            part_df = part_df.sort_values(DATE_COLUMN, kind='stable')
+            part_dates = dates.loc[part_df.index]
+            rel_path = os.path.join(f'month={month}', f'part-v{version:05d}.parquet')
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(part_df, preserve_index=False), path,
+                           row_group_size=ROW_GROUP_SIZE)
+            self.manifest['partitions'].setdefault(month, []).append({
+                'file': rel_path,
+                'rows': int(len(part_df)),
+                'min_date': part_dates.min(),
+                'max_date': part_dates.max(),
+                'states': sorted(part_df['state'].astype(str).unique()),
+                'categories': sorted(part_df['category'].astype(str).unique()),
+                'sha256': _file_sha256(path),
+                'version': version,
+            })
+            added.append(month)
+
+        previous_total = self.current_version()['total_rows'] if self.exists() else 0
+        info = {
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'rows_added': int(len(new_rows)),
+            'total_rows': int(previous_total + len(new_rows)),
+            'content_hash': self._content_hash(),
+            'partitions_added': added,
+        }
+        self.manifest['versions'].append(info)
+        # Manifest ditulis setelah semua file partisi selesai; index dedup dan sketch terakhir
+        self._write_manifest()
+        index.save()
+        sketches.update(new_rows)
+        sketches.save(os.path.join(self.root, SKETCHES_NAME))
+        return info
+
+    def sketches(self):
+        """
+        Sketch ringkasan seluruh dataset (di-update incremental oleh append)
+
+        Dataset lama yang belum punya file sketch dibangun ulang sekali dari partisi.
+        """
+        path = os.path.join(self.root, SKETCHES_NAME)
+        sketches = DatasetSketches.load(path)
+        if sketches is None:
+            sketches = DatasetSketches()
+            if self.exists():
+                sketches.update(self.load(columns=SKETCH_COLUMNS))
+                sketches.save(path)
+        return sketches
+
+    # ----------------------------------------
+    # LOAD
+    # ----------------------------------------
+    def latest_date(self):
+        """Tanggal transaksi terbaru di dataset ('YYYY-MM-DD') atau None"""
+        parts = [part for month in self.partitions() for part in self.manifest['partitions'][month]]
+        return max((part['max_date'] for part in parts), default=None)
+
+    def filter_options(self):
+        """
+        Opsi filter dashboard dari manifest (tanpa membaca data)
+
+        Partisi lama yang belum mencatat state/kategori dibaca kolom tersebut saja.
+
+        Returns:
+            Dict dengan format yang sama seperti `frame_filter_options`
+        """
+        parts = [part for month in self.partitions() for part in self.manifest['partitions'][month]]
+        states, categories = set(), set()
+        for part in parts:
+            if 'states' in part and 'categories' in part:
+                states.update(part['states'])
+                categories.update(part['categories'])
+            else:
+                table = pq.read_table(os.path.join(self.root, part['file']), columns=['state', 'category'])
+                states.update(table.column('state').unique().to_pylist())
+                categories.update(table.column('category').unique().to_pylist())
+        return {
+            'min_date': min((part['min_date'] for part in parts), default=None),
+            'max_date': max((part['max_date'] for part in parts), default=None),
+            'states': sorted(map(str, states)),
+            'categories': sorted(map(str, categories)),
+        }
+
+    def date_range(self, start=None, end=None, last_days=None):
+        """Normalisasi argumen rentang tanggal menjadi (start, end) 'YYYY-MM-DD'"""
+        if last_days is not None:
+            latest = end or self.latest_date()
+            if latest:
+                start = (pd.Timestamp(latest) - pd.Timedelta(days=last_days - 1)).strftime('%Y-%m-%d')
+        return start, end
+
+    def partition_files(self, start=None, end=None, last_days=None, version=None):
+        """
+        File parquet yang overlap dengan rentang tanggal (inklusif) dan versi
+
+        Args:
+            start, end: Tanggal 'YYYY-MM-DD' (None = tanpa batas)
+            last_days: Ambil N hari terakhir relatif ke tanggal terbaru di dataset
+            version: Snapshot versi tertentu (None = terbaru)
+        """
+        start, end = self.date_range(start, end, last_days)
+        files = []
+        for month in self.partitions():
+            if (start and month < start[:7]) or (end and month > end[:7]):
+                continue
+            files.extend(
+                os.path.join(self.root, part['file'])
+                for part in self.manifest['partitions'][month]
+                if (version is None or part['version'] <= version)
+                and not (start and part['max_date'] < start)
+                and not (end and part['min_date'] > end)
+            )
+        return files
+
+    def load(self, start=None, end=None, last_days=None, columns=None, version=None,
+             states=None, categories=None, fraud_only=False):
+        """
+        Load transaksi sebagai DataFrame
+
+        Rentang tanggal memangkas file lewat manifest; semua predicate lalu
+        di-push ke pyarrow sehingga row group yang statistiknya tidak cocok
+        dilewati dan hanya kolom `columns` yang di-decode.
+
+        Args:
+            start, end, last_days, version: Lihat `partition_files`
+            columns: Subset kolom (None = semua)
+            states, categories: Daftar state/kategori yang diambil (None = semua)
+            fraud_only: Hanya transaksi fraud
+
+        Returns:
+            DataFrame dengan schema CSV dataset
+        """
+        files = self.partition_files(start, end, last_days, version)
+        if not files:
+            return pd.DataFrame(columns=columns or list(self.manifest['schema'] or []))
+
+        start, end = self.date_range(start, end, last_days)
+        row_filter = filter_expression(start, end, states, categories, fraud_only)
+        table = ds.dataset(files, format='parquet').to_table(columns=columns, filter=row_filter)
+        return table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset transaksi ber-partisi tanggal")
+    parser.add_argument('command', choices=['ingest', 'info'])
+    parser.add_argument('csv', nargs='?', help="CSV transaksi untuk di-ingest")
+    parser.add_argument('--root', default=DATASET_DIR)
+    args = parser.parse_args()
+
+    dataset = TransactionDataset(args.root)
+    if args.command == 'ingest':
+        if not args.csv:
+            parser.error("ingest membutuhkan path CSV")
+        info = dataset.append(pd.read_csv(args.csv))
+    else:
+        info = dataset.current_version()
+    if info is not None and len(info.get('partitions_added', [])) > 10:
+        info = {**info, 'partitions_added': f"{len(info['partitions_added'])} partitions"}
+    print(json.dumps(info, indent=2))
+
+
+if __name__ == '__main__':
+    main()
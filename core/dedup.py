@@ -0,0 +1,153 @@
+"""
+Deduplication - Fingerprint baris transaksi dan index fingerprint persisten
+
+Fingerprint satu baris adalah hash 64-bit dari `trans_num` (id unik transaksi
+di dataset). Baris tanpa `trans_num` memakai hash 64-bit gabungan KEY_COLUMNS.
+Hashing dilakukan vectorized oleh `pd.util.hash_pandas_object`, jauh lebih
+murah dibanding `df.duplicated()` yang meng-hash semua kolom string.
+
+`FingerprintIndex` menyimpan fingerprint yang sudah pernah di-ingest (array
+uint64 terurut di file .npy) sehingga export yang overlap hanya menyumbang
+baris baru:
+
+    python -m core.dedup export_baru.csv --index data/fingerprints.npy --out baris_baru.csv
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+INDEX_PATH = 'data/fingerprints.npy'
+ID_COLUMN = 'trans_num'
+KEY_COLUMNS = ('cc_num', 'trans_date_trans_time', 'unix_time', 'merchant', 'amt')
+
+
+# ========================================
+# FINGERPRINT
+# ========================================
+def fingerprint_rows(df, id_column=ID_COLUMN, key_columns=KEY_COLUMNS):
+    """
+    Hitung fingerprint uint64 untuk setiap baris
+
+    Args:
+        df: DataFrame transaksi
+        id_column: Kolom id unik (dipakai jika ada dan tidak kosong)
+        key_columns: Kolom fallback untuk baris tanpa id
+
+    Returns:
+        Array uint64 (n_rows,)
+    """
+    fingerprints = np.zeros(len(df), dtype=np.uint64)
+    has_id = df[id_column].notna().to_numpy() if id_column in df.columns else np.zeros(len(df), dtype=bool)
+
+    if has_id.any():
+        ids = df.loc[has_id, id_column].astype(str)
+        fingerprints[has_id] = pd.util.hash_pandas_object(ids, index=False).to_numpy()
+    if not has_id.all():
+        keys = [col for col in key_columns if col in df.columns]
+        if not keys:
+            raise KeyError(f"Tidak ada kolom '{id_column}' maupun kolom kunci {list(key_columns)}")
+        fingerprints[~has_id] = pd.util.hash_pandas_object(df.loc[~has_id, keys], index=False).to_numpy()
+    return fingerprints
+
+
+# ========================================
+# INDEX PERSISTEN
+# ========================================
+class FingerprintIndex:
+    """
+    Himpunan fingerprint terurut (uint64) dengan penyimpanan .npy
+
+    Args:
+        path: File index; None = index hanya di memori
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        if path and os.path.exists(path):
+            self.fingerprints = np.load(path)
+        else:
+            self.fingerprints = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def contains(self, fingerprints):
+        """Mask boolean: fingerprint mana yang sudah ada di index"""
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        if len(self.fingerprints) == 0:
+            return np.zeros(len(fingerprints), dtype=bool)
+        pos = np.searchsorted(self.fingerprints, fingerprints)
+        pos[pos == len(self.fingerprints)] = 0
+        return self.fingerprints[pos] == fingerprints
+
+    def add(self, fingerprints):
+        """Gabungkan fingerprint baru ke index (tetap terurut & unik)"""
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        if len(fingerprints):
+            self.fingerprints = np.union1d(self.fingerprints, fingerprints).astype(np.uint64)
+
+    def save(self):
+        """Tulis index secara atomik (file sementara lalu os.replace)"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp.npy'
+        np.save(tmp_path, self.fingerprints)
+        os.replace(tmp_path, self.path)
+
+
+# ========================================
+# DEDUPLICATION
+# ========================================
+def deduplicate(df, index=None):
+    """
+    Buang duplikat di dalam batch dan baris yang fingerprint-nya sudah ada di index
+
+    Fingerprint baris yang lolos ditambahkan ke index (belum disimpan ke disk;
+    panggil `index.save()` setelah baris baru berhasil disimpan).
+
+    Args:
+        df: DataFrame transaksi baru
+        index: FingerprintIndex; None = hanya dedup di dalam batch
+
+    Returns:
+        Tuple (DataFrame baris baru, dict statistik)
+    """
+    fingerprints = fingerprint_rows(df)
+    in_batch_dup = pd.Series(fingerprints).duplicated().to_numpy()
+    seen = index.contains(fingerprints) if index is not None else np.zeros(len(df), dtype=bool)
+    keep = ~in_batch_dup & ~seen
+
+    if index is not None:
+        index.add(fingerprints[keep])
+
+    stats = {
+        'rows': int(len(df)),
+        'new_rows': int(keep.sum()),
+        'duplicates_in_batch': int((in_batch_dup & ~seen).sum()),
+        'already_indexed': int(seen.sum()),
+    }
+    return df[keep], stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ambil baris baru dari export transaksi (dedup fingerprint)")
+    parser.add_argument('csv', help="Export CSV transaksi")
+    parser.add_argument('--index', default=INDEX_PATH, help="File index fingerprint persisten")
+    parser.add_argument('--out', help="Simpan baris baru ke CSV")
+    args = parser.parse_args()
+
+    index = FingerprintIndex(args.index)
+    new_rows, stats = deduplicate(pd.read_csv(args.csv), index)
+    if args.out:
+        new_rows.to_csv(args.out, index=False)
+    index.save()
+    print(json.dumps({**stats, 'indexed_total': len(index)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
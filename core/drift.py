@@ -0,0 +1,244 @@
+"""
+Drift - Monitor data drift input produksi terhadap distribusi training
+
+Training menyimpan profil referensi ringkas di artifact model
+(`drift_reference`): histogram bin untuk fitur numerik (`amt`, `age`,
+`hour`) dan frekuensi label untuk fitur kategorikal (`category`, `state`).
+Ukurannya hanya puluhan angka per fitur, bukan data training.
+
+`DriftMonitor` memakai bin yang sama untuk menghitung histogram streaming
+dari transaksi yang diskor: setiap `update()` hanya menambah counter per bin
+(memori konstan, tidak menyimpan transaksi), dan `report()` menghitung PSI
+serta statistik KS (selisih maksimum CDF antar bin) per fitur dari counter
+itu, tanpa membaca riwayat prediksi.
+
+    monitor = DriftMonitor(artifacts['drift_reference'])
+    monitor.update(engineer_features(raw_df))
+    monitor.report()       # DataFrame: feature, rows, psi, ks, status
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import REGISTRY
+from core.scoring import engineer_features
+
+
+NUMERICAL_FEATURES = ('amt', 'age', 'hour')
+CATEGORICAL_FEATURES = ('category', 'state')
+DEFAULT_BINS = 10
+# Fitur dengan nilai unik sedikit (mis. hour) diberi satu bin per nilai
+MAX_DISCRETE_VALUES = 30
+OTHER_LABEL = '__other__'
+# Ambang PSI yang umum dipakai: < 0.1 stabil, 0.1 - 0.25 bergeser, > 0.25 drift
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+MIN_ROWS = 100
+EPSILON = 1e-4
+
+DRIFT_ROWS = REGISTRY.counter(
+    'fraud_drift_rows_total', "Transaksi yang masuk histogram drift monitor"
+)
+DRIFT_PSI = REGISTRY.gauge(
+    'fraud_drift_psi', "Population Stability Index per fitur (produksi vs training)", ['feature']
+)
+
+
+# ========================================
+# PROFIL REFERENSI (TRAINING)
+# ========================================
+def _bin_edges(values, bins):
+    """Batas antar bin: kuantil untuk fitur kontinu, titik tengah antar nilai untuk fitur diskret"""
+    unique = np.unique(values)
+    if len(unique) <= MAX_DISCRETE_VALUES:
+        return (unique[:-1] + unique[1:]) / 2
+    quantiles = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+    return np.unique(quantiles)
+
+
+def _bin_counts(values, edges):
+    return np.bincount(np.searchsorted(edges, values, side='left'), minlength=len(edges) + 1)
+
+
+def reference_profile(features, bins=DEFAULT_BINS):
+    """
+    Bangun profil distribusi referensi dari fitur training
+
+    Args:
+        features: DataFrame fitur sebelum encoding/scaling (output feature engineering)
+        bins: Jumlah bin kuantil untuk fitur numerik kontinu
+
+    Returns:
+        Dict plain (aman di-pickle) {'created_at', 'rows', 'features': {nama: profil}}
+    """
+    profile = {'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'rows': len(features), 'features': {}}
+    for col in NUMERICAL_FEATURES:
+        values = features[col].to_numpy(dtype=float)
+        edges = _bin_edges(values, bins)
+        profile['features'][col] = {
+            'kind': 'numerical',
+            'edges': edges.tolist(),
+            'counts': _bin_counts(values, edges).tolist(),
+        }
+    for col in CATEGORICAL_FEATURES:
+        counts = features[col].astype(str).value_counts()
+        profile['features'][col] = {
+            'kind': 'categorical',
+            'labels': counts.index.tolist(),
+            'counts': counts.tolist() + [0],  # slot terakhir: label yang tidak ada di training
+        }
+    return profile
+
+
+# ========================================
+# STATISTIK DRIFT
+# ========================================
+def psi(expected, actual, epsilon=EPSILON):
+    """
+    Population Stability Index antara dua histogram dengan bin yang sama
+
+    Args:
+        expected: Counter per bin referensi
+        actual: Counter per bin produksi
+        epsilon: Batas bawah proporsi (bin kosong tidak membuat log tak hingga)
+
+    Returns:
+        PSI (float, >= 0)
+    """
+    p = np.maximum(np.asarray(expected, dtype=float) / max(np.sum(expected), 1), epsilon)
+    q = np.maximum(np.asarray(actual, dtype=float) / max(np.sum(actual), 1), epsilon)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_binned(expected, actual):
+    """Statistik KS dari histogram ber-bin: selisih maksimum CDF (batas bawah KS dua sampel)"""
+    p = np.cumsum(expected) / max(np.sum(expected), 1)
+    q = np.cumsum(actual) / max(np.sum(actual), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+def drift_status(value, rows, min_rows=MIN_ROWS):
+    if rows < min_rows:
+        return 'kurang data'
+    if value >= PSI_ALERT:
+        return 'drift'
+    if value >= PSI_WARNING:
+        return 'bergeser'
+    return 'stabil'
+
+
+# ========================================
+# MONITOR STREAMING
+# ========================================
+class DriftMonitor:
+    """
+    Histogram streaming per fitur dengan bin profil referensi (thread-safe)
+
+    Args:
+        reference: Profil dari `reference_profile` (key `drift_reference` di artifact)
+        min_rows: Jumlah transaksi minimal sebelum status drift dinilai
+    """
+
+    def __init__(self, reference, min_rows=MIN_ROWS):
+        self.reference = reference
+        self.min_rows = min_rows
+        self._edges = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        for name, spec in reference['features'].items():
+            if spec['kind'] == 'numerical':
+                self._edges[name] = np.asarray(spec['edges'], dtype=float)
+            else:
+                self._labels[name] = pd.Index(spec['labels'])
+        self.reset()
+
+    def reset(self):
+        """Kosongkan histogram produksi (mis. setelah drift ditindaklanjuti)"""
+        with self._lock:
+            self.rows = 0
+            self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._counts = {name: np.zeros(len(spec['counts']), dtype=np.int64)
+                            for name, spec in self.reference['features'].items()}
+
+    def update(self, frame):
+        """
+        Tambahkan transaksi ke histogram
+
+        Args:
+            frame: DataFrame fitur (output `engineer_features`) atau transaksi mentah;
+                   fitur dihitung dulu jika kolom age/hour belum ada
+        """
+        if len(frame) == 0:
+            return
+        needed = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+        if not all(col in frame.columns for col in needed):
+            frame = engineer_features(frame)
+
+        increments = {}
+        for name, edges in self._edges.items():
+            increments[name] = _bin_counts(frame[name].to_numpy(dtype=float), edges)
+        for name, labels in self._labels.items():
+            # Label yang tidak dikenal (-1) masuk slot terakhir
+            codes = labels.get_indexer(frame[name].astype(str))
+            increments[name] = np.bincount(np.where(codes < 0, len(labels), codes), minlength=len(labels) + 1)
+
+        with self._lock:
+            for name, counts in increments.items():
+                self._counts[name] += counts
+            self.rows += len(frame)
+            rows = self.rows
+            snapshot = {name: counts.copy() for name, counts in self._counts.items()}
+        DRIFT_ROWS.inc(len(frame))
+        if rows < self.min_rows:
+            # PSI sampel kecil tidak stabil; gauge baru diisi setelah cukup data
+            return
+        for name, counts in snapshot.items():
+            DRIFT_PSI.set(psi(self.reference['features'][name]['counts'], counts), feature=name)
+
+    def report(self):
+        """
+        PSI dan KS per fitur dari state histogram saat ini
+
+        Returns:
+            DataFrame kolom feature, kind, rows, psi, ks, status (ks kosong untuk fitur kategorikal)
+        """
+        with self._lock:
+            rows = self.rows
+            snapshot = {name: counts.copy() for name, counts in self._counts.items()}
+        records = []
+        for name, counts in snapshot.items():
+            spec = self.reference['features'][name]
+            value = psi(spec['counts'], counts)
+            records.append({
+                'feature': name,
+                'kind': spec['kind'],
+                'rows': rows,
+                'psi': value,
+                'ks': ks_binned(spec['counts'], counts) if spec['kind'] == 'numerical' else None,
+                'status': drift_status(value, rows, self.min_rows),
+            })
+        return pd.DataFrame(records)
+
+    def distribution(self, name):
+        """
+        Proporsi per bin referensi vs produksi untuk satu fitur (untuk chart)
+
+        Returns:
+            DataFrame kolom bin, reference, production
+        """
+        spec = self.reference['features'][name]
+        with self._lock:
+            counts = self._counts[name].copy()
+        if spec['kind'] == 'numerical':
+            bounds = ['-inf'] + [f"{edge:g}" for edge in spec['edges']] + ['inf']
+            bins = [f"({low}, {high}]" for low, high in zip(bounds[:-1], bounds[1:])]
+        else:
+            bins = list(spec['labels']) + [OTHER_LABEL]
+        reference = np.asarray(spec['counts'], dtype=float)
+        return pd.DataFrame({
+            'bin': bins,
+            'reference': reference / max(reference.sum(), 1),
+            'production': counts / max(counts.sum(), 1),
+        })
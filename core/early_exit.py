@@ -0,0 +1,159 @@
+"""
+Early-Exit Inference - Evaluasi forest per chunk pohon dengan berhenti lebih awal
+
+Sebagian besar transaksi jelas legitimate; setelah sebagian pohon dievaluasi,
+rata-rata vote sudah cukup untuk memastikan keputusan akhir. Setelah k dari
+T pohon, rata-rata pohon sisanya dibatasi dengan Hoeffding bound
+(eps = sqrt(ln(2/delta) / 2k)), sehingga probabilitas akhir forest berada di
+
+    [(S + (T-k) * max(0, m - eps)) / T,  (S + (T-k) * min(1, m + eps)) / T]
+
+dengan S jumlah probabilitas k pohon pertama dan m = S / k. Baris yang
+intervalnya sudah seluruhnya di bawah (SAFE) atau di atas (FRAUD) threshold
+berhenti dievaluasi. Probabilitas yang dikembalikan adalah rata-rata pohon
+yang sudah dievaluasi; keputusan threshold atas nilai tersebut selalu sama
+dengan keputusan yang dijamin oleh interval.
+
+Training (stage `early_exit_check`) memverifikasi setting ini pada holdout
+dan menyimpannya di artefak model sebagai `'early_exit'`; scoring memakai
+nilai tersebut kecuali di-override (lihat `resolve_settings`).
+"""
+import time
+
+import numpy as np
+
+from core.decision import DEFAULT_THRESHOLD, decide
+
+
+DEFAULT_CHUNK_SIZE = 10
+DEFAULT_DELTA = 1e-4
+
+
+def resolve_settings(artifacts, early_exit):
+    """
+    Setting early exit efektif untuk sebuah artefak model
+
+    Args:
+        artifacts: Dict model artifact (boleh punya 'early_exit' hasil verifikasi training)
+        early_exit: None/False (mati), True (pakai setting artefak) atau dict
+            override {'chunk_size', 'delta'}; nilai None di dict diabaikan
+
+    Returns:
+        Dict {'chunk_size', 'delta'} atau None jika early exit mati
+    """
+    if not early_exit:
+        return None
+    settings = {'chunk_size': DEFAULT_CHUNK_SIZE, 'delta': DEFAULT_DELTA}
+    settings.update(artifacts.get('early_exit') or {})
+    if isinstance(early_exit, dict):
+        settings.update({key: value for key, value in early_exit.items() if value is not None})
+    return settings
+
+
+def _tree_sum_fn(model):
+    """Fungsi (X, start, stop) -> jumlah probabilitas fraud pohon [start, stop)"""
+    if hasattr(model, 'tree_proba_sum'):
+        return model.tree_proba_sum, model.n_estimators
+
+    estimators = model.estimators_
+    fraud_col = int(np.flatnonzero(model.classes_ == 1)[0])
+
+    def tree_sum(X, start, stop):
+        total = np.zeros(X.shape[0])
+        for estimator in estimators[start:stop]:
+            total += estimator.predict_proba(X, check_input=False)[:, fraud_col]
+        return total
+
+    return tree_sum, len(estimators)
+
+
+def early_exit_predict_proba(model, X, threshold=DEFAULT_THRESHOLD, chunk_size=DEFAULT_CHUNK_SIZE,
+                             delta=DEFAULT_DELTA):
+    """
+    Probabilitas fraud dengan early exit per baris
+
+    Args:
+        model: RandomForestClassifier atau CompactForest
+        X: Matrix fitur (sudah di-encode & di-scale)
+        threshold: Threshold keputusan yang dijaga
+        chunk_size: Jumlah pohon yang dievaluasi per langkah
+        delta: Probabilitas kegagalan Hoeffding bound per baris (lebih kecil = lebih konservatif;
+            0 = tanpa early exit, semua pohon dievaluasi)
+
+    Returns:
+        Tuple (prob_fraud, trees_used) berukuran (n_rows,)
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    tree_sum, n_trees = _tree_sum_fn(model)
+    n_rows = X.shape[0]
+
+    sums = np.zeros(n_rows)
+    trees_used = np.zeros(n_rows, dtype=np.int32)
+    prob_fraud = np.zeros(n_rows)
+    active = np.arange(n_rows)
+    log_term = np.log(2.0 / delta) if delta > 0 else np.inf
+
+    evaluated = 0
+    while active.size and evaluated < n_trees:
+        stop = min(evaluated + chunk_size, n_trees)
+        sums[active] += tree_sum(X[active], evaluated, stop)
+        evaluated = stop
+        trees_used[active] = evaluated
+
+        mean = sums[active] / evaluated
+        if evaluated == n_trees:
+            prob_fraud[active] = mean
+            break
+
+        eps = np.sqrt(log_term / (2 * evaluated))
+        if not np.isfinite(eps):
+            continue
+        remaining = n_trees - evaluated
+        upper = (sums[active] + remaining * np.minimum(1.0, mean + eps)) / n_trees
+        lower = (sums[active] + remaining * np.maximum(0.0, mean - eps)) / n_trees
+        settled = (upper < threshold) | (lower >= threshold)
+
+        prob_fraud[active[settled]] = mean[settled]
+        active = active[~settled]
+
+    return prob_fraud, trees_used
+
+
+def early_exit_predict(model, X, threshold=DEFAULT_THRESHOLD, chunk_size=DEFAULT_CHUNK_SIZE,
+                       delta=DEFAULT_DELTA):
+    """Label 0/1 dengan early exit (lihat early_exit_predict_proba)"""
+    prob_fraud, _ = early_exit_predict_proba(model, X, threshold, chunk_size, delta)
+    return decide(prob_fraud, threshold)
+
+
+def verify_early_exit(model, X, threshold=DEFAULT_THRESHOLD, chunk_size=DEFAULT_CHUNK_SIZE,
+                      delta=DEFAULT_DELTA):
+    """
+    Bandingkan keputusan dan waktu early exit vs evaluasi semua pohon
+
+    Returns:
+        Dict berisi jumlah keputusan berbeda, rata-rata pohon terpakai dan speedup
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    tree_sum, n_trees = _tree_sum_fn(model)
+
+    start = time.perf_counter()
+    full_decisions = decide(tree_sum(X, 0, n_trees) / n_trees, threshold)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prob_fraud, trees_used = early_exit_predict_proba(model, X, threshold, chunk_size, delta)
+    early_seconds = time.perf_counter() - start
+    early_decisions = decide(prob_fraud, threshold)
+
+    return {
+        'rows': int(len(X)),
+        'mismatches': int((full_decisions != early_decisions).sum()),
+        'flagged_full': int(full_decisions.sum()),
+        'flagged_early': int(early_decisions.sum()),
+        'mean_trees_used': float(trees_used.mean()),
+        'n_trees': int(n_trees),
+        'full_seconds': full_seconds,
+        'early_seconds': early_seconds,
+        'speedup': full_seconds / early_seconds if early_seconds > 0 else float('inf'),
+    }
@@ -0,0 +1,160 @@
+"""
+Evaluation Artifacts - Ringkasan evaluasi model yang disimpan saat training
+
+Training menyimpan hasil evaluasi holdout dalam bentuk ringkas (titik kurva
+ROC/PR yang sudah di-downsample, confusion matrix di beberapa threshold,
+metrik per kategori dan per state) sehingga tab Model Performance cukup
+membaca file ini tanpa menghitung ulang prediksi test set.
+"""
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import precision_recall_curve, roc_auc_score, roc_curve
+
+
+EVALUATION_PATH = 'models/evaluation_artifacts.pkl'
+DEFAULT_THRESHOLDS = (0.3, 0.5, 0.7)
+MAX_CURVE_POINTS = 200
+
+
+def _downsample(points, max_points):
+    """Ambil maksimal `max_points` baris secara merata (titik ujung selalu ikut)"""
+    if len(points) <= max_points:
+        return points.reset_index(drop=True)
+    idx = np.unique(np.linspace(0, len(points) - 1, max_points).round().astype(int))
+    return points.iloc[idx].reset_index(drop=True)
+
+
+def _confusion(y_true, y_pred):
+    """Confusion matrix 2x2 sebagai dict (tn, fp, fn, tp)"""
+    tp = int(np.sum((y_pred == 1) & (y_true == 1)))
+    fp = int(np.sum((y_pred == 1) & (y_true == 0)))
+    fn = int(np.sum((y_pred == 0) & (y_true == 1)))
+    tn = int(np.sum((y_pred == 0) & (y_true == 0)))
+    return {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp}
+
+
+def _rates(cm):
+    """Accuracy, precision, recall dan F1 dari confusion matrix"""
+    total = cm['tn'] + cm['fp'] + cm['fn'] + cm['tp']
+    precision = cm['tp'] / (cm['tp'] + cm['fp']) if (cm['tp'] + cm['fp']) else 0.0
+    recall = cm['tp'] / (cm['tp'] + cm['fn']) if (cm['tp'] + cm['fn']) else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
+    accuracy = (cm['tp'] + cm['tn']) / total if total else 0.0
+    return {'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1_score': f1}
+
+
+def segment_metrics(y_true, y_pred, segment_values):
+    """
+    Hitung metrik per segmen (mis. per kategori atau per state) secara vectorized
+
+    Args:
+        y_true: Array label asli (0/1)
+        y_pred: Array label prediksi (0/1)
+        segment_values: Array nilai segmen dengan panjang yang sama
+
+    Returns:
+        DataFrame dengan kolom segment, n, fraud, tp, fp, fn, tn,
+        accuracy, precision, recall, f1_score
+    """
+    frame = pd.DataFrame({
+        'segment': np.asarray(segment_values),
+        'tp': (y_pred == 1) & (y_true == 1),
+        'fp': (y_pred == 1) & (y_true == 0),
+        'fn': (y_pred == 0) & (y_true == 1),
+        'tn': (y_pred == 0) & (y_true == 0),
+    })
+    grouped = frame.groupby('segment', observed=True)[['tp', 'fp', 'fn', 'tn']].sum().astype(int)
+    grouped['n'] = grouped[['tp', 'fp', 'fn', 'tn']].sum(axis=1)
+    grouped['fraud'] = grouped['tp'] + grouped['fn']
+
+    predicted_pos = grouped['tp'] + grouped['fp']
+    actual_pos = grouped['fraud']
+    grouped['accuracy'] = (grouped['tp'] + grouped['tn']) / grouped['n']
+    grouped['precision'] = (grouped['tp'] / predicted_pos.where(predicted_pos > 0)).fillna(0.0)
+    grouped['recall'] = (grouped['tp'] / actual_pos.where(actual_pos > 0)).fillna(0.0)
+    pr_sum = grouped['precision'] + grouped['recall']
+    grouped['f1_score'] = (2 * grouped['precision'] * grouped['recall'] / pr_sum.where(pr_sum > 0)).fillna(0.0)
+
+    columns = ['n', 'fraud', 'tp', 'fp', 'fn', 'tn', 'accuracy', 'precision', 'recall', 'f1_score']
+    return grouped[columns].reset_index().sort_values('n', ascending=False, ignore_index=True)
+
+
+def build_evaluation_artifacts(y_true, y_proba, segments=None, feature_importance=None,
+                               thresholds=DEFAULT_THRESHOLDS, max_curve_points=MAX_CURVE_POINTS,
+                               decision_threshold=0.5):
+    """
+    Bangun artefak evaluasi ringkas dari skor holdout
+
+    Args:
+        y_true: Label asli test set (0/1)
+        y_proba: Probabilitas fraud dari model untuk test set
+        segments: Dict nama segmen -> array nilai segmen (mis. {'category': [...], 'state': [...]})
+        feature_importance: DataFrame dengan kolom feature dan importance (opsional)
+        thresholds: Threshold untuk confusion matrix
+        max_curve_points: Jumlah maksimal titik yang disimpan per kurva
+        decision_threshold: Threshold yang dipakai untuk metrik per segmen
+
+    Returns:
+        Dict berisi kurva ROC/PR, confusion matrix dan metrik per segmen
+    """
+    y_true = np.asarray(y_true).astype(int)
+    y_proba = np.asarray(y_proba, dtype=float)
+
+    fpr, tpr, roc_thr = roc_curve(y_true, y_proba)
+    roc_points = _downsample(pd.DataFrame({'fpr': fpr, 'tpr': tpr, 'threshold': roc_thr}),
+                             max_curve_points)
+
+    precision, recall, pr_thr = precision_recall_curve(y_true, y_proba)
+    # precision_recall_curve mengembalikan satu titik lebih banyak daripada threshold
+    pr_points = _downsample(pd.DataFrame({
+        'recall': recall,
+        'precision': precision,
+        'threshold': np.append(pr_thr, np.nan)
+    }), max_curve_points)
+
+    all_thresholds = sorted(set(float(t) for t in thresholds) | {float(decision_threshold)})
+    confusion = {}
+    for thr in all_thresholds:
+        cm = _confusion(y_true, (y_proba >= thr).astype(int))
+        confusion[thr] = {**cm, **_rates(cm)}
+
+    y_pred = (y_proba >= decision_threshold).astype(int)
+    segment_tables = {
+        name: segment_metrics(y_true, y_pred, values)
+        for name, values in (segments or {}).items()
+    }
+
+    return {
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'n_samples': int(len(y_true)),
+        'n_fraud': int(y_true.sum()),
+        'roc_auc': float(roc_auc_score(y_true, y_proba)),
+        'roc_curve': roc_points,
+        'pr_curve': pr_points,
+        'decision_threshold': float(decision_threshold),
+        'confusion_matrices': confusion,
+        'segments': segment_tables,
+        'feature_importance': feature_importance,
+    }
+
+
+def save_evaluation_artifacts(artifacts, path=EVALUATION_PATH):
+    """Simpan artefak evaluasi ke file pickle (atomik: app bisa membaca kapan saja)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(artifacts, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_evaluation_artifacts(path=EVALUATION_PATH):
+    """Load artefak evaluasi; None jika file belum ada"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
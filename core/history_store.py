@@ -0,0 +1,237 @@
+"""
+Prediction History Store - Riwayat prediksi append-only berbasis SQLite
+
+Menggantikan list `st.session_state.prediction_history` yang tumbuh tanpa
+batas di memori session. Riwayat disimpan di disk, bisa di-query per waktu,
+prediksi dan kategori (dengan index), ditampilkan per halaman, dan
+diekspor ke CSV secara inkremental.
+
+Store ini satu database per proses: riwayat berisi prediksi dari semua
+session/analis (dan job batch/stream), bukan hanya session yang membukanya.
+"""
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+
+HISTORY_PATH = 'history/prediction_history.db'
+DEFAULT_MAX_ROWS = 1_000_000
+
+# Database lama masih punya kolom `confidence` (nullable, tidak dibaca lagi)
+COLUMNS = ['timestamp', 'amount', 'category', 'state', 'hour',
+           'prediction', 'prob_safe', 'prob_fraud', 'source']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    amount REAL,
+    category TEXT,
+    state TEXT,
+    hour INTEGER,
+    prediction TEXT,
+    prob_safe REAL,
+    prob_fraud REAL,
+    source TEXT DEFAULT 'ui'
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_prediction ON predictions (prediction, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_category ON predictions (category, timestamp);
+CREATE TABLE IF NOT EXISTS export_state (
+    path TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+"""
+
+
+# Satu lock per file CSV tujuan, dibagi semua instance store di proses ini
+_EXPORT_LOCKS = {}
+_EXPORT_LOCKS_GUARD = threading.Lock()
+
+
+def _export_lock(path):
+    key = os.path.abspath(path)
+    with _EXPORT_LOCKS_GUARD:
+        return _EXPORT_LOCKS.setdefault(key, threading.Lock())
+
+
+def _to_sql(value):
+    """Konversi numpy scalar (np.int64, np.float32, ...) ke tipe Python agar bisa di-bind SQLite"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _csv_header(path):
+    """Nama kolom di baris pertama CSV ekspor"""
+    with open(path, encoding='utf-8') as f:
+        return f.readline().rstrip('\r\n').split(',')
+
+
+class PredictionHistoryStore:
+    """
+    Store riwayat prediksi yang aman dipakai bersama oleh banyak session Streamlit
+
+    Args:
+        path: Lokasi file SQLite
+        max_rows: Batas jumlah baris; baris tertua dibuang saat terlampaui (None = tanpa batas)
+    """
+
+    def __init__(self, path=HISTORY_PATH, max_rows=DEFAULT_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ========================================
+    # WRITE
+    # ========================================
+    def append(self, record, source='ui'):
+        """Tambahkan satu record prediksi (dict dengan key sesuai COLUMNS)"""
+        self.append_many([record], source=source)
+
+    def append_many(self, records, source='batch'):
+        """Tambahkan banyak record sekaligus dalam satu transaksi"""
+        rows = [
+            tuple(_to_sql(record.get(col, source) if col == 'source' else record.get(col)) for col in COLUMNS)
+            for record in records
+        ]
+        if not rows:
+            return
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO predictions ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            self._enforce_retention()
+
+    def _enforce_retention(self):
+        """Buang baris tertua jika jumlah baris melebihi max_rows"""
+        if not self.max_rows:
+            return
+        max_id = self._conn.execute("SELECT MAX(id) FROM predictions").fetchone()[0] or 0
+        cutoff = max_id - self.max_rows
+        if cutoff > 0:
+            self._conn.execute("DELETE FROM predictions WHERE id <= ?", (cutoff,))
+
+    # ========================================
+    # READ
+    # ========================================
+    @staticmethod
+    def _where(prediction=None, category=None, since=None, until=None):
+        """Bangun klausa WHERE dari filter opsional"""
+        clauses, params = [], []
+        if prediction:
+            clauses.append("prediction = ?")
+            params.append(prediction)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(str(since))
+        if until:
+            clauses.append("timestamp <= ?")
+            params.append(str(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters):
+        """Jumlah record yang cocok dengan filter"""
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM predictions{where}", params).fetchone()[0]
+
+    def query(self, page=0, page_size=50, **filters):
+        """
+        Ambil satu halaman riwayat (terbaru lebih dulu)
+
+        Args:
+            page: Nomor halaman (mulai dari 0)
+            page_size: Jumlah baris per halaman
+            **filters: prediction, category, since, until
+
+        Returns:
+            DataFrame berisi kolom COLUMNS
+        """
+        where, params = self._where(**filters)
+        sql = (f"SELECT {', '.join(COLUMNS)} FROM predictions{where} "
+               f"ORDER BY id DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params + [page_size, page * page_size])
+
+    def latest(self, n=5):
+        """n prediksi terakhir"""
+        return self.query(page=0, page_size=n)
+
+    def categories(self):
+        """Daftar kategori yang pernah diprediksi (untuk filter UI)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT category FROM predictions WHERE category IS NOT NULL ORDER BY category"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # ========================================
+    # EXPORT
+    # ========================================
+    def export_csv(self, path, chunk_size=10_000):
+        """
+        Ekspor CSV secara inkremental: hanya baris baru sejak ekspor terakhir ke `path`
+        yang ditambahkan ke file, dibaca per chunk agar memori tetap kecil
+
+        Ekspor ke path yang sama diserialkan dengan lock per path selama seluruh
+        ekspor. Cursor `export_state` baru dimajukan setelah file selesai ditulis
+        dan di-fsync; jika penulisan gagal, file dipotong kembali ke ukuran semula
+        sehingga ekspor berikutnya tidak menduplikasi baris.
+
+        Returns:
+            Jumlah baris baru yang ditulis
+        """
+        with _export_lock(path):
+            with self._lock:
+                row = self._conn.execute("SELECT last_id FROM export_state WHERE path = ?", (path,)).fetchone()
+            last_id = row[0] if row and os.path.exists(path) else 0
+            if last_id and _csv_header(path) != COLUMNS:
+                last_id = 0  # File lama dengan kolom berbeda: tulis ulang dari awal
+            write_header = last_id == 0
+
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            written = 0
+            with open(path, 'w' if write_header else 'a', newline='', encoding='utf-8') as f:
+                start_size = f.tell()
+                try:
+                    while True:
+                        with self._lock:
+                            chunk = pd.read_sql_query(
+                                f"SELECT id, {', '.join(COLUMNS)} FROM predictions WHERE id > ? ORDER BY id LIMIT ?",
+                                self._conn, params=[last_id, chunk_size]
+                            )
+                        if chunk.empty:
+                            break
+                        chunk[COLUMNS].to_csv(f, index=False, header=write_header)
+                        write_header = False
+                        last_id = int(chunk['id'].iloc[-1])
+                        written += len(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    f.truncate(start_size)
+                    raise
+
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO export_state (path, last_id) VALUES (?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET last_id = excluded.last_id",
+                    (path, last_id)
+                )
+        return written
+
+    def close(self):
+        """Tutup koneksi SQLite"""
+        with self._lock:
+            self._conn.close()
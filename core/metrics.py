@@ -0,0 +1,322 @@
+"""
+Metrics - Registry metrik operasional in-process (counter, gauge, histogram)
+
+Metrik dikumpulkan di memori proses Streamlit (dibagi semua session) dan
+diekspor dalam format teks Prometheus lewat HTTP server kecil di thread
+daemon:
+
+    from core.metrics import REGISTRY, start_http_server, step
+
+    with step('predict.model'):          # histogram latency + span profiling
+        ...
+
+    start_http_server(9108)              # GET http://127.0.0.1:9108/metrics (+ /ready)
+
+Hit ratio cache Streamlit dihitung dari `fraud_cache_lookups_total`:
+decorator `track_cache` menghitung setiap lookup, dan `cache_miss()` yang
+dipanggil di dalam body function ber-cache menandai lookup itu sebagai miss
+(body hanya dijalankan Streamlit saat miss).
+"""
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import profiling
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_PORT = 9108
+# Bucket latency (detik): 1 ms sampai 30 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+# ========================================
+# METRIC TYPES
+# ========================================
+class _Metric:
+    """Basis metrik berlabel; nilai per kombinasi label disimpan di dict"""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metrik '{self.name}' butuh label {self.labelnames}, bukan {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Nilai yang hanya bertambah (mis. jumlah prediksi)"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counter hanya boleh bertambah")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Nilai yang bisa naik turun (mis. jumlah baris tabel, status ready)"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribusi nilai dalam bucket kumulatif (mis. latency per step)"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            state['counts'][index] += 1
+            state['sum'] += value
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return sum(state['counts']) if state else 0
+
+    def _samples(self):
+        lines = []
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), state['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {state['sum']!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Kumpulan metrik; `counter`/`gauge`/`histogram` mengembalikan metrik yang sudah ada jika nama sama"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metrik '{name}' sudah terdaftar sebagai {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus (exposition format 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# ========================================
+# METRIK APLIKASI
+# ========================================
+REGISTRY = MetricsRegistry()
+
+STEP_SECONDS = REGISTRY.histogram(
+    'fraud_step_duration_seconds', "Latency per step (load model/data, section dashboard, prediksi)", ['step']
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    'fraud_cache_lookups_total', "Lookup cache Streamlit per cache dan hasil (hit/miss)", ['cache', 'result']
+)
+PREDICTIONS = REGISTRY.counter(
+    'fraud_predictions_total', "Jumlah transaksi yang diskor per sumber dan keputusan", ['source', 'decision']
+)
+ROWS_LOADED = REGISTRY.counter(
+    'fraud_rows_loaded_total', "Baris transaksi yang dikembalikan data service ke tab"
+)
+DASHBOARD_RENDERS = REGISTRY.counter(
+    'fraud_dashboard_renders_total', "Render dashboard per backend agregasi", ['backend']
+)
+READY = REGISTRY.gauge(
+    'fraud_app_ready', "1 jika model sudah di-load dan di-warmup (siap melayani prediksi)"
+)
+
+
+def observe_step(name, seconds):
+    """Catat durasi satu step ke histogram latency"""
+    STEP_SECONDS.observe(seconds, step=name)
+
+
+class step:
+    """
+    Context manager: histogram latency `fraud_step_duration_seconds{step=name}`
+    sekaligus span profiling dengan nama yang sama (no-op jika profiling mati)
+
+    Span yang dikembalikan `__enter__` bisa diisi `rows` seperti `profiling.span`.
+    """
+
+    def __init__(self, name, rows=None, **attrs):
+        self.name = name
+        self._span = profiling.span(name, rows, **attrs)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self._span.__enter__()
+
+    def __exit__(self, *exc):
+        self._span.__exit__(*exc)
+        observe_step(self.name, time.perf_counter() - self._start)
+        return False
+
+
+# ========================================
+# CACHE HIT / MISS
+# ========================================
+_lookups = threading.local()
+
+
+def track_cache(cache):
+    """
+    Decorator (di luar `st.cache_*`): hitung lookup sebagai hit, kecuali body
+    function ber-cache memanggil `cache_miss()` selama lookup berlangsung
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(_lookups, 'stack', None)
+            if stack is None:
+                stack = _lookups.stack = []
+            stack.append(False)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                missed = stack.pop()
+                CACHE_LOOKUPS.inc(cache=cache, result='miss' if missed else 'hit')
+        # Tetap expose API cache Streamlit (mis. load_model.clear())
+        if hasattr(func, 'clear'):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorate
+
+
+def cache_miss():
+    """Tandai lookup `track_cache` yang sedang berjalan (thread ini) sebagai miss"""
+    stack = getattr(_lookups, 'stack', None)
+    if stack:
+        stack[-1] = True
+
+
+# ========================================
+# HTTP ENDPOINT
+# ========================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/ready':
+            # Readiness probe untuk load balancer: 503 sampai warmup selesai
+            ready = READY.value() == 1
+            body = b'ready\n' if ready else b'warming up\n'
+            status = 200 if ready else 503
+        elif path in ('/metrics', '/'):
+            body = self.registry.render().encode('utf-8')
+            status = 200
+        else:
+            self.send_error(404)
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrape berkala tidak perlu memenuhi log Streamlit
+        pass
+
+
+def start_http_server(port=DEFAULT_PORT, host='127.0.0.1', registry=REGISTRY):
+    """
+    Jalankan endpoint /metrics di thread daemon
+
+    Returns:
+        ThreadingHTTPServer yang berjalan, atau None jika port sudah dipakai
+        (mis. instance app lain di host yang sama)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        print(f"⚠️ Metrics endpoint tidak aktif ({host}:{port}): {e}")
+        return None
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,226 @@
+"""
+Model Registry - Hot reload model artifact tanpa restart Streamlit
+
+`ModelRegistry` memegang model yang sedang melayani prediksi dan sebuah
+thread watcher yang memantau file artifact:
+
+1. stat file (mtime + ukuran) dicek setiap `check_interval` detik; hanya
+   jika berubah file dibaca dan di-hash (sha256 = versi model);
+2. versi baru di-load, di-warmup (`core.warmup`) dan divalidasi pada batch
+   canary kecil, semuanya di thread watcher, bukan di jalur request;
+3. jika lolos, snapshot `(artifacts, info)` diganti dengan satu assignment
+   di bawah lock dan status readiness (jika diberikan) ikut ditandai ready.
+   Rerun berikutnya memakai model baru; rerun yang sedang berjalan tetap
+   memakai snapshot yang sudah diambilnya.
+
+Versi yang gagal validasi ditolak dan model lama tetap dipakai. Training
+menulis artifact secara atomik (file sementara + os.replace) sehingga
+watcher tidak pernah membaca file setengah jadi.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from core.metrics import REGISTRY
+from core.scoring import score_transactions
+from core.warmup import synthetic_transactions, warmup
+
+
+REQUIRED_KEYS = ('model', 'scaler', 'label_encoders', 'feature_columns', 'numerical_cols')
+CANARY_SIZE = 200
+CHECK_INTERVAL = 5.0
+
+MODEL_RELOADS = REGISTRY.counter(
+    'fraud_model_reloads_total', "Load model per hasil (loaded/swapped/rejected/failed)", ['result']
+)
+MODEL_LOADED_AT = REGISTRY.gauge(
+    'fraud_model_loaded_timestamp_seconds', "Unix time saat model yang sedang dipakai di-swap masuk"
+)
+
+
+def validate_artifacts(artifacts, canary, reference=None, min_agreement=None):
+    """
+    Validasi artifact pada batch canary
+
+    Args:
+        artifacts: Dict model artifact kandidat
+        canary: DataFrame transaksi canary (kolom input form UI)
+        reference: Artifact yang sedang dipakai (opsional) untuk menghitung agreement
+        min_agreement: Jika di-set, tolak kandidat dengan agreement keputusan di bawah nilai ini
+
+    Returns:
+        Dict {'fraud_rate', 'agreement'}
+
+    Raises:
+        ValueError: Jika artifact tidak lengkap, ada baris invalid, atau probabilitas tidak valid
+    """
+    missing = [key for key in REQUIRED_KEYS if key not in artifacts]
+    if missing:
+        raise ValueError(f"Artifact tidak lengkap, key hilang: {missing}")
+
+    scored = score_transactions(canary, artifacts)
+    if not scored['valid'].all():
+        raise ValueError(f"{int((~scored['valid']).sum())} baris canary ditolak encoder")
+    prob = scored['prob_fraud'].to_numpy()
+    if not np.all(np.isfinite(prob)) or prob.min() < 0 or prob.max() > 1:
+        raise ValueError("Probabilitas canary tidak valid (NaN atau di luar [0, 1])")
+
+    agreement = None
+    if reference is not None:
+        reference_scored = score_transactions(canary, reference)
+        agreement = float((reference_scored['prediction'] == scored['prediction']).mean())
+        if min_agreement is not None and agreement < min_agreement:
+            raise ValueError(f"Agreement keputusan dengan model aktif {agreement:.1%} < {min_agreement:.1%}")
+    return {'fraud_rate': float(scored['prediction'].mean()), 'agreement': agreement}
+
+
+class ModelRegistry:
+    """
+    Model aktif + watcher hot reload
+
+    Args:
+        path: Path file model artifact (pickle)
+        check_interval: Interval polling file (detik)
+        min_agreement: Batas bawah agreement keputusan kandidat vs model aktif (None = tidak dicek)
+        canary_size: Jumlah baris batch canary
+        readiness: `core.warmup.Readiness` opsional; ditandai ready setiap swap berhasil
+    """
+
+    def __init__(self, path, check_interval=CHECK_INTERVAL, min_agreement=None, canary_size=CANARY_SIZE,
+                 readiness=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.min_agreement = min_agreement
+        self.canary_size = canary_size
+        self.readiness = readiness
+        self.events = []
+        self._snapshot = (None, None)
+        self._stat = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ========================================
+    # SNAPSHOT
+    # ========================================
+    def current(self):
+        """Tuple (artifacts, info) model aktif; ambil sekali per request dan pakai konsisten"""
+        return self._snapshot
+
+    @property
+    def version(self):
+        info = self._snapshot[1]
+        return info['version'] if info else None
+
+    def _read(self):
+        """Baca file -> (artifacts, version, stat)"""
+        stat = os.stat(self.path)
+        with open(self.path, 'rb') as f:
+            payload = f.read()
+        return pickle.loads(payload), hashlib.sha256(payload).hexdigest(), (stat.st_mtime_ns, stat.st_size)
+
+    def _swap(self, artifacts, info):
+        with self._lock:
+            self._snapshot = (artifacts, info)
+        MODEL_LOADED_AT.set(time.time())
+
+    def _log(self, version, result, **details):
+        event = {'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'version': version, 'result': result, **details}
+        with self._lock:
+            self.events = (self.events + [event])[-20:]
+        MODEL_RELOADS.inc(result=result)
+        return event
+
+    # ========================================
+    # LOAD & RELOAD
+    # ========================================
+    def load_initial(self, warm=None):
+        """
+        Load model pertama secara sinkron (tanpa canary; belum ada model pembanding)
+
+        Warmup yang gagal tidak menggagalkan load (model tetap dipakai, hanya
+        prediksi pertama lebih lambat); error-nya dicatat di event.
+
+        Args:
+            warm: Callable(artifacts) -> report warmup (default `core.warmup.warmup`)
+
+        Raises:
+            FileNotFoundError: Jika file model belum ada
+        """
+        artifacts, version, stat = self._read()
+        try:
+            report, error = (warm or warmup)(artifacts), None
+        except Exception as e:
+            report, error = None, str(e)
+        self._stat = stat
+        self._swap(artifacts, {'version': version, 'loaded_at': time.time(), 'warmup': report})
+        self._log(version, 'loaded', **({'error': error} if error else {}))
+        return artifacts
+
+    def check(self):
+        """
+        Cek file sekali; load, warmup, validasi dan swap jika ada versi baru
+
+        Returns:
+            Event dict jika ada percobaan reload, None jika file tidak berubah
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) == self._stat:
+            return None
+
+        try:
+            artifacts, version, stat_key = self._read()
+        except Exception as e:
+            # File korup / ditulis non-atomik: dicoba lagi hanya jika file berubah lagi
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+            return self._log(None, 'failed', error=str(e))
+        self._stat = stat_key
+        if version == self.version:
+            return None
+
+        reference = self._snapshot[0]
+        try:
+            report = warmup(artifacts)
+            canary = synthetic_transactions(artifacts, self.canary_size, seed=1)
+            validation = validate_artifacts(artifacts, canary, reference, self.min_agreement)
+        except Exception as e:
+            return self._log(version, 'rejected', error=str(e))
+
+        self._swap(artifacts, {'version': version, 'loaded_at': time.time(), 'warmup': report,
+                               'validation': validation})
+        # Warmup model baru sudah lolos: status 'failed' dari model sebelumnya tidak berlaku lagi
+        if self.readiness is not None:
+            self.readiness.mark_ready(report)
+        return self._log(version, 'swapped', **validation)
+
+    # ========================================
+    # WATCHER THREAD
+    # ========================================
+    def start(self):
+        """Jalankan watcher di thread daemon (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='model-registry-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.check_interval + 1)
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                self._log(None, 'failed', error=str(e))
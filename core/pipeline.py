@@ -0,0 +1,285 @@
+"""
+Pipeline - Stage graph dengan cache output per stage di disk
+
+Setiap stage adalah function biasa; dependensi dideklarasikan lewat nama
+stage, dan output stage dependensi diberikan sebagai keyword argument dengan
+nama yang sama. Argument lain (dengan default) adalah parameter stage.
+
+Key cache sebuah stage = sha256 dari nama, source code function, parameter,
+fingerprint input eksternal (mis. content hash dataset), versi kode bersama
+(hash source modul `code_modules` + `code_version` opsional) dan key semua
+stage dependensinya. Akibatnya:
+
+- stage yang key-nya sudah ada di cache tidak dijalankan ulang; outputnya
+  hanya di-load (pickle) jika dibutuhkan stage lain;
+- mengubah parameter satu stage hanya meng-invalidasi stage itu dan
+  turunannya;
+- mengubah modul yang dipakai stage (mis. core.scoring) meng-invalidasi cache
+  walau source function stage sendiri tidak berubah;
+- dengan `max_workers` > 1, stage yang tidak saling bergantung dijalankan
+  bersamaan di thread pool (output print stage-stage tersebut bisa
+  bercampur; default 1 = berurutan).
+
+Contoh:
+    graph = StageGraph('models/.pipeline_cache', code_modules=['core.scoring'])
+
+    @graph.stage(fingerprint=lambda: file_sha256('data.csv'))
+    def load(path='data.csv'):
+        return pd.read_csv(path)
+
+    @graph.stage(deps=['load'])
+    def fit(load, n_estimators=200):
+        ...
+
+    outputs, report = graph.run(targets=['fit'], params={'fit': {'n_estimators': 100}})
+"""
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core.profiling import span
+
+
+def module_sources_hash(modules):
+    """sha256 dari file source modul (dicari lewat import system tanpa meng-import modulnya)"""
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        spec = importlib.util.find_spec(name)
+        if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+            raise ValueError(f"Source modul '{name}' tidak ditemukan")
+        digest.update(name.encode())
+        with open(spec.origin, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class Stage:
+    """
+    Satu node di stage graph
+
+    Args:
+        name: Nama stage (unik)
+        func: Function stage
+        deps: Nama stage dependensi
+        cache: False untuk stage dengan side effect (mis. menulis model) yang selalu dijalankan
+        fingerprint: Callable tanpa argument -> string untuk input di luar graph
+    """
+
+    def __init__(self, name, func, deps=(), cache=True, fingerprint=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.cache = cache
+        self.fingerprint = fingerprint
+        signature = inspect.signature(func)
+        missing = [dep for dep in self.deps if dep not in signature.parameters]
+        if missing:
+            raise ValueError(f"Stage '{name}' tidak punya argument untuk dependensi {missing}")
+        self.defaults = {
+            param: value.default for param, value in signature.parameters.items()
+            if param not in self.deps and value.default is not inspect.Parameter.empty
+        }
+        self.source = inspect.getsource(func)
+
+
+class StageGraph:
+    """
+    Kumpulan stage + runner dengan cache di disk
+
+    Args:
+        cache_dir: Folder file cache `<stage>-<key>.pkl`
+        max_workers: Jumlah stage yang boleh berjalan bersamaan (default 1: berurutan,
+            print tiap stage tidak bercampur)
+        code_modules: Nama modul yang dipakai stage; hash source-nya masuk ke semua key
+        code_version: String versi kode eksplisit (opsional), juga masuk ke semua key
+    """
+
+    def __init__(self, cache_dir, max_workers=1, code_modules=(), code_version=None):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.code_modules = list(code_modules)
+        self.code_version = code_version
+        self.stages = {}
+
+    def stage(self, name=None, deps=(), cache=True, fingerprint=None):
+        """Decorator untuk mendaftarkan function sebagai stage"""
+        def register(func):
+            stage_name = name or func.__name__
+            unknown = [dep for dep in deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Dependensi {unknown} harus didaftarkan sebelum '{stage_name}'")
+            self.stages[stage_name] = Stage(stage_name, func, deps, cache, fingerprint)
+            return func
+        return register
+
+    # ========================================
+    # KEY & CACHE
+    # ========================================
+    def resolve_params(self, params=None):
+        """Parameter efektif per stage: default function + override"""
+        params = params or {}
+        unknown = set(params) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Stage tidak dikenal: {sorted(unknown)}")
+        resolved = {}
+        for name, stage in self.stages.items():
+            overrides = params.get(name, {})
+            bad = set(overrides) - set(stage.defaults)
+            if bad:
+                raise ValueError(f"Parameter tidak dikenal untuk stage '{name}': {sorted(bad)}")
+            resolved[name] = {**stage.defaults, **overrides}
+        return resolved
+
+    def code_fingerprint(self):
+        """Versi kode bersama semua stage: `code_version` + hash source `code_modules`"""
+        return {
+            'version': self.code_version,
+            'modules': module_sources_hash(self.code_modules) if self.code_modules else None,
+        }
+
+    def keys(self, params=None):
+        """Key cache semua stage (urutan pendaftaran = urutan topologis)"""
+        resolved = self.resolve_params(params)
+        code = self.code_fingerprint()
+        keys = {}
+        for name, stage in self.stages.items():
+            payload = {
+                'name': name,
+                'source': stage.source,
+                'code': code,
+                'params': resolved[name],
+                'fingerprint': stage.fingerprint() if stage.fingerprint else None,
+                'deps': {dep: keys[dep] for dep in stage.deps},
+            }
+            encoded = json.dumps(payload, sort_keys=True, default=repr).encode()
+            keys[name] = hashlib.sha256(encoded).hexdigest()
+        return keys
+
+    def _cache_path(self, name, key):
+        return os.path.join(self.cache_dir, f"{name}-{key[:20]}.pkl")
+
+    def is_cached(self, name, key):
+        return self.stages[name].cache and os.path.exists(self._cache_path(name, key))
+
+    def _load(self, name, key):
+        with open(self._cache_path(name, key), 'rb') as f:
+            return pickle.load(f)
+
+    def _store(self, name, key, output):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(name, key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    # ========================================
+    # PLANNING & EKSEKUSI
+    # ========================================
+    def plan(self, targets=None, force=(), params=None):
+        """
+        Tentukan aksi tiap stage tanpa menjalankan apa pun
+
+        Args:
+            targets: Stage yang diminta (None = semua)
+            force: Stage yang dijalankan ulang walau ada di cache
+            params: Override parameter {stage: {param: value}}
+
+        Returns:
+            Tuple (actions {stage: 'run' | 'load'}, keys)
+        """
+        targets = list(targets or self.stages)
+        unknown = (set(targets) | set(force)) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Stage tidak dikenal: {sorted(unknown)}")
+        keys = self.keys(params)
+        force = self._downstream(force)
+
+        actions = {}
+
+        def need(name):
+            # Output stage dibutuhkan: load dari cache jika bisa, selain itu run
+            if name in actions:
+                return
+            if name not in force and self.is_cached(name, keys[name]):
+                actions[name] = 'load'
+                return
+            actions[name] = 'run'
+            for dep in self.stages[name].deps:
+                need(dep)
+
+        for target in targets:
+            need(target)
+        # Urutkan sesuai urutan pendaftaran agar laporan mudah dibaca
+        return {name: actions[name] for name in self.stages if name in actions}, keys
+
+    def _downstream(self, names):
+        """Stage `names` beserta semua turunannya"""
+        result = set(names)
+        for name, stage in self.stages.items():
+            if any(dep in result for dep in stage.deps):
+                result.add(name)
+        return result
+
+    def run(self, targets=None, force=(), params=None, log=print):
+        """
+        Jalankan graph: stage yang cache-nya valid di-load, sisanya dijalankan
+
+        Stage yang semua dependensinya sudah tersedia langsung dikirim ke
+        thread pool, jadi dengan `max_workers` > 1 cabang independen (mis.
+        plot EDA vs training model) berjalan bersamaan.
+
+        Returns:
+            Tuple (outputs {stage: output}, report [{stage, action, seconds}])
+        """
+        actions, keys = self.plan(targets, force, params)
+        resolved = self.resolve_params(params)
+        outputs = {}
+        report = []
+        started = {}
+
+        def execute(name):
+            start = time.perf_counter()
+            with span(f"stage.{name}", action=actions[name]):
+                if actions[name] == 'load':
+                    output = self._load(name, keys[name])
+                else:
+                    stage = self.stages[name]
+                    output = stage.func(**{dep: outputs[dep] for dep in stage.deps}, **resolved[name])
+                    if stage.cache:
+                        self._store(name, keys[name], output)
+            return output, time.perf_counter() - start
+
+        pending = dict(actions)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for name in list(pending):
+                    # Stage 'load' tidak menunggu dependensi; stage 'run' butuh output dependensi
+                    deps = self.stages[name].deps if pending[name] == 'run' else []
+                    if all(dep in outputs for dep in deps):
+                        del pending[name]
+                        started[name] = time.perf_counter()
+                        running[executor.submit(execute, name)] = name
+                if not running:
+                    raise RuntimeError(f"Stage tidak bisa dijadwalkan: {sorted(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        output, seconds = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    outputs[name] = output
+                    report.append({'stage': name, 'action': actions[name], 'seconds': seconds})
+                    if log:
+                        label = 'cached' if actions[name] == 'load' else 'run'
+                        log(f"   [{label:>6}] {name:<18} {seconds:7.2f}s")
+        return outputs, report
@@ -0,0 +1,343 @@
+"""
+Profiling - Span timing ringan (wall, CPU, peak memori, jumlah baris)
+
+    from core.profiling import span, timed
+
+    with span('features.engineer', rows=len(df)) as s:
+        ...
+        s.rows = len(result)          # boleh di-set di dalam blok
+
+    @timed('scoring.encode')
+    def encode(...): ...
+
+Span dikumpulkan oleh `Profiler` yang aktif:
+
+- training memanggil `enable(...)` sekali; profiler global dipakai semua
+  thread (termasuk thread stage graph) dan tiap span ditulis sebagai satu
+  baris JSON;
+- Streamlit memanggil `session()` di awal tiap rerun sehingga span tiap
+  session terpisah (context thread script runner) dan bisa ditampilkan di
+  panel timing. Aktif jika env FRAUD_PROFILING=1 (atau `memory` untuk ikut
+  mengukur peak memori).
+
+Kolom CPU: `cpu_ms` adalah CPU seluruh proses (semua thread, mis. worker
+sklearn `n_jobs`, ditambah child process yang sudah selesai) selama span,
+sedangkan `thread_cpu_ms` hanya CPU thread pemilik span. `cpu_ms` span yang
+berjalan bersamaan ikut menghitung kerja satu sama lain.
+
+Peak memori (tracemalloc) bersifat global untuk proses: jika span di thread
+lain terbuka pada saat yang sama, `peak_mb` kedua span dilaporkan None karena
+reset peak oleh satu span menghapus peak milik span lain.
+
+Jika tidak ada profiler aktif, `span()` mengembalikan context manager no-op
+yang sama setiap kali dan `timed` hanya menambah satu pengecekan flag per
+pemanggilan, jadi instrumentasi boleh dibiarkan di kode.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+ENV_FLAG = 'FRAUD_PROFILING'
+
+
+class _NullSpan:
+    """Span no-op saat profiling mati"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _process_cpu():
+    """CPU time proses ini + child process yang sudah di-wait (detik)"""
+    cpu = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += children.ru_utime + children.ru_stime
+    return cpu
+
+
+class Span:
+    """Satu pengukuran; dibuat lewat `Profiler.span`"""
+
+    def __init__(self, profiler, name, rows=None, attrs=None):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs or {}
+        self.child_peak = 0
+        self.peak_unreliable = False
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        if self.profiler.track_memory:
+            # Peak tracemalloc bersifat global: simpan peak milik span luar,
+            # reset untuk span ini, lalu kembalikan ke parent saat keluar.
+            # Span terbuka di thread lain kehilangan peak-nya karena reset ini.
+            self.profiler._open_memory_span(self)
+            current, self._outer_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            self._mem_start = current
+        self._thread_cpu_start = time.thread_time()
+        self._cpu_start = _process_cpu()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall_start
+        cpu = _process_cpu() - self._cpu_start
+        thread_cpu = time.thread_time() - self._thread_cpu_start
+        peak_mb = None
+        if self.profiler.track_memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            if not self.profiler._close_memory_span(self):
+                peak_mb = (peak - self._mem_start) / 1024**2
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, peak, self._outer_peak)
+        self.profiler._stack().pop()
+        self.profiler.record({
+            'name': self.name,
+            'parent': self.parent.name if self.parent else None,
+            'depth': len(self.profiler._stack()),
+            'thread': threading.current_thread().name,
+            'start': self._wall_start - self.profiler.started,
+            'wall_ms': wall * 1000,
+            'cpu_ms': cpu * 1000,
+            'thread_cpu_ms': thread_cpu * 1000,
+            'peak_mb': peak_mb,
+            'rows': self.rows,
+            'error': exc_type.__name__ if exc_type else None,
+            **self.attrs,
+        })
+        return False
+
+
+class Profiler:
+    """
+    Pengumpul span
+
+    Args:
+        track_memory: Ukur peak memori per span via tracemalloc (overhead lebih besar)
+        sink: Callable(record) yang dipanggil untuk setiap span selesai (mis. JSON log)
+    """
+
+    def __init__(self, track_memory=False, sink=None):
+        self.track_memory = track_memory
+        self.sink = sink
+        self.records = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._memory_spans = set()
+
+    def _open_memory_span(self, span):
+        """Daftarkan span ber-tracemalloc; tandai semua span yang tumpang tindih lintas thread"""
+        span.thread_id = threading.get_ident()
+        with self._lock:
+            others = [other for other in self._memory_spans if other.thread_id != span.thread_id]
+            if others:
+                span.peak_unreliable = True
+                for other in others:
+                    other.peak_unreliable = True
+            self._memory_spans.add(span)
+
+    def _close_memory_span(self, span):
+        """Lepas span; True jika peak-nya tidak bisa dipercaya (overlap dengan thread lain)"""
+        with self._lock:
+            self._memory_spans.discard(span)
+            return span.peak_unreliable
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, rows=None, **attrs):
+        return Span(self, name, rows, attrs)
+
+    def record(self, record):
+        """Tambahkan record span (juga dipakai untuk pengukuran dari luar, mis. fold CV)"""
+        with self._lock:
+            self.records.append(record)
+        if self.sink is not None:
+            self.sink(record)
+
+    def summary(self):
+        """DataFrame record span berurutan waktu mulai"""
+        import pandas as pd
+
+        with self._lock:
+            frame = pd.DataFrame(self.records)
+        return frame.sort_values('start', ignore_index=True) if not frame.empty else frame
+
+
+_GLOBAL = None
+_ACTIVE = contextvars.ContextVar('fraud_profiler', default=None)
+
+
+def active():
+    """Profiler aktif (per-context dulu, lalu global); None jika profiling mati"""
+    return _ACTIVE.get() or _GLOBAL
+
+
+def span(name, rows=None, **attrs):
+    """Context manager span; no-op jika tidak ada profiler aktif"""
+    profiler = _ACTIVE.get() or _GLOBAL
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, rows, **attrs)
+
+
+def timed(name=None):
+    """Decorator: bungkus function dalam span bernama `name` (default: module.qualname)"""
+    def decorate(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE.get() or _GLOBAL
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class json_sink:
+    """
+    Sink yang menulis tiap span sebagai satu baris JSON (append, thread-safe)
+
+    Tutup lewat `close()` (atau pakai sebagai context manager) setelah
+    pipeline selesai; record yang datang setelah ditutup diabaikan.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._handle = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if self._handle is not None:
+                self._handle.write(line + '\n')
+                self._handle.flush()
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def enable(track_memory=True, sink=None):
+    """Aktifkan profiler global (semua thread); kembalikan profiler-nya"""
+    global _GLOBAL
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _GLOBAL = Profiler(track_memory=track_memory, sink=sink)
+    return _GLOBAL
+
+
+def disable():
+    global _GLOBAL
+    _GLOBAL = None
+
+
+def session(track_memory=False):
+    """
+    Profiler baru untuk context saat ini saja (mis. satu rerun Streamlit)
+
+    Menggantikan profiler session sebelumnya di context yang sama; thread
+    lain dan profiler global tidak terpengaruh.
+    """
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    profiler = Profiler(track_memory=track_memory)
+    _ACTIVE.set(profiler)
+    return profiler
+
+
+class sections:
+    """
+    Span berurutan untuk fungsi panjang (mis. section dashboard)
+
+        timeline = sections('dashboard')
+        timeline.start('overview')
+        ...
+        timeline.start('outliers')    # menutup 'overview'
+        ...
+        timeline.close()
+
+    Profiler diambil sekali saat dibuat; jika profiling mati span tidak
+    dibuat. `observer(name, seconds)` (opsional, mis. histogram metrik)
+    tetap dipanggil untuk setiap section yang ditutup.
+    """
+
+    def __init__(self, prefix, observer=None):
+        self.prefix = prefix
+        self.observer = observer
+        self.profiler = active()
+        self._current = None
+        self._name = None
+
+    def start(self, name, rows=None):
+        self.close()
+        self._name = f"{self.prefix}.{name}"
+        self._start = time.perf_counter()
+        if self.profiler is not None:
+            self._current = self.profiler.span(self._name, rows)
+            self._current.__enter__()
+
+    def close(self):
+        if self._current is not None:
+            current, self._current = self._current, None
+            current.__exit__(None, None, None)
+        if self._name is not None:
+            name, self._name = self._name, None
+            if self.observer is not None:
+                self.observer(name, time.perf_counter() - self._start)
+
+
+def env_mode():
+    """
+    Mode profiling dari env FRAUD_PROFILING
+
+    Returns:
+        None (mati), 'time' (1/true/on) atau 'memory' (time + peak memori)
+    """
+    value = os.environ.get(ENV_FLAG, '').strip().lower()
+    if value == 'memory':
+        return 'memory'
+    return 'time' if value in ('1', 'true', 'yes', 'on', 'time') else None
@@ -0,0 +1,324 @@
+"""
+Replay Harness - Memutar ulang CSV historis sebagai event feed berwaktu
+
+Membaca `credit_card_transactions2.csv` (atau file hasil `generate_larger_file`),
+mengurutkan berdasarkan `unix_time`, lalu mengirim event ke target dengan
+kecepatan real-time (speed=1), dipercepat (speed=N) atau secepat mungkin
+(speed=0). Latency end-to-end tiap event (dari jadwal kirim sampai respons
+diterima) dicatat dan diringkas menjadi throughput serta persentil.
+
+Target:
+    function            : score_transactions lokal dengan model artifact
+    http://host:port/.. : POST JSON satu transaksi per request
+    socket://host:port  : NDJSON ke `python -m core.stream --socket host:port`
+
+Contoh:
+    python -m core.replay --csv data/credit_card_transactions2.csv --speed 0 --target function
+    python -m core.replay --csv big.csv --speed 86400 --target socket://127.0.0.1:9099
+    python -m core.replay --generate 10 --csv data/credit_card_transactions2.csv --out big.csv
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import pickle
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+
+DATA_PATH = 'data/credit_card_transactions2.csv'
+MODEL_PATH = 'models/fraud_detection_model.pkl'
+
+
+# ========================================
+# WORKLOAD
+# ========================================
+def load_events(path=DATA_PATH):
+    """
+    Load seluruh CSV dan urutkan berdasarkan unix_time (stabil)
+
+    File tidak terurut waktu, jadi pembatasan jumlah event (`replay(limit=...)`)
+    harus dilakukan setelah sorting agar jadwal inter-arrival tetap kontinu.
+    """
+    df = pd.read_csv(path)
+    return df.sort_values('unix_time', kind='stable').reset_index(drop=True)
+
+
+def generate_larger_file(src_path, dst_path, multiplier, chunk_rows=100_000):
+    """
+    Buat file workload lebih besar dengan mengulang dataset `multiplier` kali
+
+    Setiap salinan digeser waktunya sepanjang rentang dataset asli dan diberi
+    `trans_num` baru sehingga urutan waktu tetap kontinu dan tidak ada duplikat.
+
+    Returns:
+        Jumlah baris yang ditulis
+    """
+    base = load_events(src_path)
+    span = int(base['unix_time'].max() - base['unix_time'].min()) + 1
+    base_time = pd.to_datetime(base['trans_date_trans_time'], format='%Y-%m-%d %H:%M:%S')
+
+    written = 0
+    for copy in range(multiplier):
+        shifted = base.copy()
+        shifted['unix_time'] = base['unix_time'] + copy * span
+        shifted['trans_date_trans_time'] = (base_time + pd.to_timedelta(copy * span, unit='s')).dt.strftime(
+            '%Y-%m-%d %H:%M:%S')
+        if copy > 0:
+            shifted['trans_num'] = [
+                hashlib.md5(f"{trans_num}-{copy}".encode()).hexdigest() for trans_num in base['trans_num']
+            ]
+        for start in range(0, len(shifted), chunk_rows):
+            shifted.iloc[start:start + chunk_rows].to_csv(
+                dst_path, mode='w' if written == 0 else 'a', header=written == 0, index=False
+            )
+            written += min(chunk_rows, len(shifted) - start)
+    return written
+
+
+# ========================================
+# TARGETS
+# ========================================
+class FunctionTarget:
+    """Panggil fungsi Python (default: score_transactions lokal) untuk tiap event"""
+
+    def __init__(self, func=None, model_path=MODEL_PATH):
+        if func is None:
+            from core.scoring import score_transactions
+            with open(model_path, 'rb') as f:
+                artifacts = pickle.load(f)
+            if hasattr(artifacts['model'], 'n_jobs'):
+                artifacts['model'].n_jobs = 1
+
+            def func(record):
+                return score_transactions(pd.DataFrame([record]), artifacts)
+
+        self.func = func
+
+    async def open(self):
+        pass
+
+    async def send(self, record):
+        await asyncio.to_thread(self.func, record)
+
+    async def close(self):
+        pass
+
+
+class HttpTarget:
+    """POST JSON satu transaksi per request"""
+
+    def __init__(self, url, timeout=10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def open(self):
+        pass
+
+    def _post(self, record):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(record, default=str).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, record):
+        await asyncio.to_thread(self._post, record)
+
+    async def close(self):
+        pass
+
+
+class SocketTarget:
+    """
+    Kirim NDJSON ke server socket `core.stream` dan cocokkan balasan per trans_num
+
+    Pengiriman dan penerimaan berjalan pipelined dalam satu koneksi.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._pending = {}
+        self._reader_task = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read_replies())
+
+    async def _read_replies(self):
+        try:
+            async for line in self.reader:
+                reply = json.loads(line)
+                waiters = self._pending.get(reply.get('trans_num'))
+                if waiters:
+                    waiters.pop(0).set_result(reply)
+        finally:
+            # Koneksi putus: gagalkan semua event yang masih menunggu balasan
+            for waiters in self._pending.values():
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(ConnectionError("socket closed before reply"))
+            self._pending.clear()
+
+    async def send(self, record):
+        if self.writer.is_closing() or self._reader_task.done():
+            raise ConnectionError("socket closed")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(record.get('trans_num'), []).append(future)
+        self.writer.write((json.dumps(record, default=str) + '\n').encode('utf-8'))
+        await self.writer.drain()
+        await future
+
+    async def close(self):
+        self.writer.write_eof()
+        if self._reader_task is not None:
+            await self._reader_task
+        self.writer.close()
+
+
+def make_target(spec, model_path=MODEL_PATH):
+    """Buat target dari string: 'function', 'http://...', 'socket://host:port'"""
+    if spec == 'function':
+        return FunctionTarget(model_path=model_path)
+    if spec.startswith('http://') or spec.startswith('https://'):
+        return HttpTarget(spec)
+    if spec.startswith('socket://'):
+        host, port = spec[len('socket://'):].rsplit(':', 1)
+        return SocketTarget(host, int(port))
+    raise ValueError(f"Target tidak dikenal: {spec}")
+
+
+# ========================================
+# REPLAY
+# ========================================
+def summarize(latencies_s, lags_s, duration_s, errors=0):
+    """Ringkas latency (ms) dan throughput"""
+    latencies_ms = np.asarray(latencies_s) * 1000
+    n = len(latencies_ms)
+    summary = {
+        'events': n,
+        'errors': errors,
+        'duration_s': round(duration_s, 3),
+        'throughput_per_s': round(n / duration_s, 1) if duration_s > 0 else 0.0,
+    }
+    if n:
+        p50, p90, p95, p99 = np.percentile(latencies_ms, [50, 90, 95, 99])
+        summary.update({
+            'latency_ms_mean': round(float(latencies_ms.mean()), 3),
+            'latency_ms_p50': round(float(p50), 3),
+            'latency_ms_p90': round(float(p90), 3),
+            'latency_ms_p95': round(float(p95), 3),
+            'latency_ms_p99': round(float(p99), 3),
+            'latency_ms_max': round(float(latencies_ms.max()), 3),
+            'schedule_lag_ms_p99': round(float(np.percentile(np.asarray(lags_s) * 1000, 99)), 3),
+        })
+    return summary
+
+
+async def replay(events, target, speed=0.0, max_in_flight=64, limit=None):
+    """
+    Kirim event ke target sesuai jadwal unix_time
+
+    Args:
+        events: DataFrame terurut unix_time (hasil load_events)
+        target: Objek target dengan open/send/close
+        speed: 1 = real-time, N = N kali lebih cepat, 0 = secepat mungkin
+        max_in_flight: Batas request yang sedang berjalan bersamaan
+        limit: Jumlah maksimal event yang dikirim
+
+    Returns:
+        Tuple (summary dict, DataFrame latency per event)
+    """
+    if limit is not None:
+        events = events.iloc[:limit]
+    records = events.to_dict('records')
+    offsets = (events['unix_time'] - events['unix_time'].iloc[0]).to_numpy(dtype=float) if len(events) else []
+
+    scheduled = np.zeros(len(records))
+    sent = np.zeros(len(records))
+    finished = np.full(len(records), np.nan)
+    errors = 0
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def dispatch(i, record):
+        nonlocal errors
+        try:
+            await target.send(record)
+            finished[i] = time.perf_counter()
+        except Exception:
+            errors += 1
+        finally:
+            semaphore.release()
+
+    await target.open()
+    start = time.perf_counter()
+    in_flight = set()
+    for i, record in enumerate(records):
+        due = start + (offsets[i] / speed if speed else 0.0)
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await semaphore.acquire()
+        scheduled[i] = due if speed else time.perf_counter()
+        sent[i] = time.perf_counter()
+        task = asyncio.create_task(dispatch(i, record))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    await target.close()
+    duration = time.perf_counter() - start
+
+    done = ~np.isnan(finished)
+    latencies = pd.DataFrame({
+        'trans_num': events['trans_num'].to_numpy()[done] if 'trans_num' in events else np.arange(done.sum()),
+        'unix_time': events['unix_time'].to_numpy()[done],
+        'latency_s': finished[done] - scheduled[done],
+        'schedule_lag_s': sent[done] - scheduled[done],
+    })
+    summary = summarize(latencies['latency_s'], latencies['schedule_lag_s'], duration, errors)
+    summary['speed'] = speed
+    return summary, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay CSV transaksi sebagai event feed berwaktu")
+    parser.add_argument('--csv', default=DATA_PATH, help="CSV sumber event")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="1 = real-time, N = dipercepat N kali, 0 = secepat mungkin")
+    parser.add_argument('--target', default='function', help="function | http://... | socket://host:port")
+    parser.add_argument('--model', default=MODEL_PATH, help="Model artifact untuk target function")
+    parser.add_argument('--max-in-flight', type=int, default=64)
+    parser.add_argument('--limit', type=int, default=None, help="Jumlah maksimal event")
+    parser.add_argument('--latency-out', help="Simpan latency per event ke CSV")
+    parser.add_argument('--generate', type=int, default=None,
+                        help="Buat file workload N kali lebih besar dari --csv ke --out lalu keluar")
+    parser.add_argument('--out', help="Output file untuk --generate")
+    args = parser.parse_args()
+
+    if args.generate:
+        if not args.out:
+            parser.error("--generate membutuhkan --out")
+        rows = generate_larger_file(args.csv, args.out, args.generate)
+        print(f"✓ {rows:,} rows written to {args.out}")
+        return
+
+    events = load_events(args.csv)
+    target = make_target(args.target, model_path=args.model)
+    summary, latencies = asyncio.run(
+        replay(events, target, speed=args.speed, max_in_flight=args.max_in_flight, limit=args.limit)
+    )
+    if args.latency_out:
+        latencies.to_csv(args.latency_out, index=False)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Scoring - Feature engineering, encoding dan scoring transaksi mentah
+
+Dipakai bersama oleh semua jalur scoring di luar UI (pipeline streaming,
+batch scoring, replay) sehingga transformasi fitur identik dengan training
+di `fraud_detection_rf.py`.
+"""
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.binning import binned_model
+from core.decision import DEFAULT_THRESHOLD, decide
+from core.early_exit import early_exit_predict_proba, resolve_settings
+from core.profiling import span
+from core.timestamps import (hour_from_epoch, parse_date_days, parse_datetime_epoch,
+                             weekday_from_epoch, year_from_days)
+
+
+def engineer_features(raw_df, reference_year=None):
+    """
+    Bentuk kolom fitur model dari transaksi mentah (schema CSV dataset)
+
+    Kolom `age`, `hour` dan `is_weekend` yang sudah ada (mis. dari form UI)
+    dipakai apa adanya; jika belum ada, dihitung dari `dob` dan
+    `trans_date_trans_time` dengan aturan yang sama seperti training.
+
+    Args:
+        raw_df: DataFrame transaksi
+        reference_year: Tahun acuan untuk menghitung umur (default: tahun sekarang)
+
+    Returns:
+        DataFrame dengan kolom category, amt, gender, state, age, hour,
+        is_weekend, amt_per_hour_ratio
+    """
+    features = pd.DataFrame(index=raw_df.index)
+    features['category'] = raw_df['category'].astype(str)
+    features['amt'] = raw_df['amt'].astype(float)
+    features['gender'] = raw_df['gender'].astype(str)
+    features['state'] = raw_df['state'].astype(str)
+
+    if 'age' in raw_df.columns:
+        features['age'] = raw_df['age'].astype(int)
+    else:
+        reference_year = reference_year or datetime.now().year
+        features['age'] = reference_year - year_from_days(parse_date_days(raw_df['dob']))
+
+    if 'hour' in raw_df.columns and 'is_weekend' in raw_df.columns:
+        features['hour'] = raw_df['hour'].astype(int)
+        features['is_weekend'] = raw_df['is_weekend'].astype(int)
+    else:
+        trans_epoch = parse_datetime_epoch(raw_df['trans_date_trans_time'])
+        features['hour'] = hour_from_epoch(trans_epoch)
+        features['is_weekend'] = (weekday_from_epoch(trans_epoch) >= 5).astype(int)
+
+    features['amt_per_hour_ratio'] = features['amt'] / (features['hour'] + 1)
+    return features
+
+
+# Lookup label -> kode per encoder; dibangun sekali per encoder (mis. saat warmup)
+# lalu dipakai ulang, bukan dibangun ulang di setiap prediksi
+_ENCODER_MAPPINGS = weakref.WeakKeyDictionary()
+
+
+def encoder_mapping(encoder):
+    """Dict label -> kode untuk LabelEncoder (di-cache selama encoder masih hidup)"""
+    mapping = _ENCODER_MAPPINGS.get(encoder)
+    if mapping is None:
+        mapping = _ENCODER_MAPPINGS[encoder] = {label: code for code, label in enumerate(encoder.classes_)}
+    return mapping
+
+
+def encode_features(features_df, label_encoders, scaler, feature_columns, numerical_cols):
+    """
+    Encode kategorikal + scaling numerik, urutkan sesuai feature_columns
+
+    Label yang tidak dikenal encoder tidak membuat error; barisnya ditandai
+    invalid agar bisa dipisahkan oleh pemanggil.
+
+    Returns:
+        Tuple (X, valid_mask) dengan X DataFrame siap untuk model
+    """
+    X = features_df.copy()
+    valid = np.ones(len(X), dtype=bool)
+    for col, encoder in label_encoders.items():
+        if col not in X.columns:
+            continue
+        codes = X[col].map(encoder_mapping(encoder))
+        valid &= codes.notna().to_numpy()
+        X[col] = codes.fillna(0).astype(int)
+
+    X = X[feature_columns]
+    X[numerical_cols] = scaler.transform(X[numerical_cols])
+    return X, valid
+
+
+def score_transactions(raw_df, artifacts, threshold=None, early_exit=None, binned=False):
+    """
+    Skor transaksi mentah dengan model artifact
+
+    Args:
+        raw_df: DataFrame transaksi (schema CSV atau kolom fitur siap pakai)
+        artifacts: Dict model artifact (model, scaler, label_encoders, ...)
+        threshold: Override threshold; default dari artifacts['decision']
+        early_exit: True (setting terverifikasi di artefak) atau dict override
+            {'chunk_size', 'delta'} untuk evaluasi pohon dengan early exit
+        binned: True untuk memakai engine BinnedForest (leaf identik, traversal integer)
+
+    Returns:
+        DataFrame dengan kolom prob_fraud, prediction (0/1) dan valid,
+        index sama dengan raw_df. Baris invalid mendapat prob_fraud NaN.
+    """
+    if threshold is None:
+        threshold = artifacts.get('decision', {}).get('threshold', DEFAULT_THRESHOLD)
+    early_exit = resolve_settings(artifacts, early_exit)
+
+    with span('scoring.features', rows=len(raw_df)):
+        features = engineer_features(raw_df)
+    with span('scoring.encode', rows=len(features)):
+        X, valid = encode_features(
+            features,
+            artifacts['label_encoders'],
+            artifacts['scaler'],
+            artifacts['feature_columns'],
+            artifacts['numerical_cols']
+        )
+
+    model = binned_model(artifacts['model']) if binned else artifacts['model']
+    prob_fraud = np.full(len(X), np.nan)
+    with span('scoring.predict', rows=int(valid.sum())):
+        if valid.any():
+            if early_exit:
+                prob_fraud[valid], _ = early_exit_predict_proba(model, X[valid], threshold, **early_exit)
+            else:
+                prob_fraud[valid] = model.predict_proba(X[valid])[:, 1]
+
+    return pd.DataFrame({
+        'prob_fraud': prob_fraud,
+        'prediction': np.where(valid, decide(np.nan_to_num(prob_fraud), threshold), 0),
+        'valid': valid,
+    }, index=raw_df.index)
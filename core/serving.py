@@ -0,0 +1,89 @@
+"""
+Serving - Resource per proses app: endpoint metrics dan model registry ter-warmup
+
+Streamlit mengeksekusi ulang app.py di setiap rerun, sedangkan modul yang
+diimport hanya dieksekusi sekali per proses. Resource di sini dibuat sekali
+per proses (dijaga lock) sehingga bisa dimulai sebelum session pertama:
+
+    python -m core.serving                   # start metrics + load & warmup model, lalu streamlit run app.py
+    python -m core.serving -- --server.port 8502
+
+Launcher menjalankan Streamlit di proses yang sama setelah model siap, jadi
+request pertama tidak menunggu warmup. Dengan `streamlit run app.py` biasa,
+resource yang sama dibuat saat script run pertama (perilaku lama).
+"""
+import argparse
+import os
+import sys
+import threading
+
+from core.metrics import DEFAULT_PORT, start_http_server
+from core.model_registry import ModelRegistry
+from core.warmup import READINESS
+
+
+# Set FRAUD_MODEL_PATH=models/fraud_detection_model_compact.pkl untuk serving model ringkas
+MODEL_PATH = os.environ.get('FRAUD_MODEL_PATH', 'models/fraud_detection_model.pkl')
+METRICS_PORT = os.environ.get('FRAUD_METRICS_PORT', str(DEFAULT_PORT))
+
+_LOCK = threading.Lock()
+_RESOURCES = {}
+
+
+def start_metrics_endpoint(port=METRICS_PORT):
+    """Endpoint /metrics (format Prometheus) sekali per proses; None jika dimatikan (`off`)"""
+    with _LOCK:
+        if 'metrics' not in _RESOURCES:
+            disabled = str(port).strip().lower() in ('', '0', 'off')
+            _RESOURCES['metrics'] = None if disabled else start_http_server(int(port))
+        return _RESOURCES['metrics']
+
+
+def model_registry(path=MODEL_PATH):
+    """
+    Registry model aktif sekali per proses
+
+    Model pertama di-load dan di-warmup (batch sintetis lewat engineer ->
+    encode/scale -> predict_proba) secara sinkron; setelah itu watcher
+    background memuat versi baru file model dan men-swap-nya tanpa restart.
+    Status warmup (termasuk setelah swap) dicatat di `READINESS`.
+
+    Raises:
+        FileNotFoundError: Jika file model belum ada (dicoba lagi di panggilan berikutnya)
+    """
+    with _LOCK:
+        if 'registry' not in _RESOURCES:
+            registry = ModelRegistry(path, readiness=READINESS)
+            registry.load_initial(warm=READINESS.run)
+            _RESOURCES['registry'] = registry.start()
+        return _RESOURCES['registry']
+
+
+def start(model_path=MODEL_PATH):
+    """Start endpoint metrics lalu load & warmup model (dipanggil launcher sebelum Streamlit)"""
+    start_metrics_endpoint()
+    return model_registry(model_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start metrics + warmup model, lalu jalankan Streamlit")
+    parser.add_argument('--app', default='app.py', help="Script Streamlit")
+    parser.add_argument('streamlit_args', nargs=argparse.REMAINDER,
+                        help="Argument tambahan untuk `streamlit run` (setelah --)")
+    args = parser.parse_args()
+    extra = args.streamlit_args[1:] if args.streamlit_args[:1] == ['--'] else args.streamlit_args
+
+    # `python -m core.serving` mengeksekusi file ini sebagai __main__; resource harus
+    # dibuat di modul `core.serving` yang nanti diimport app.py agar tidak dibuat dua kali
+    from core import serving
+
+    registry = serving.start()
+    print(f"✅ Model siap (versi {registry.version[:12]}, status {READINESS.state}); menjalankan Streamlit...")
+
+    from streamlit.web import cli as streamlit_cli
+    sys.argv = ['streamlit', 'run', args.app, *extra]
+    sys.exit(streamlit_cli.main())
+
+
+if __name__ == '__main__':
+    main()
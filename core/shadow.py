@@ -0,0 +1,229 @@
+"""
+Shadow Scoring - Evaluasi model challenger pada traffic nyata (champion/challenger)
+
+Champion tetap satu-satunya model yang menentukan keputusan. Setiap kali
+champion selesai menskor, transaksi yang sama beserta hasil champion
+dikirim ke `ShadowScorer.submit()`, yang hanya memasukkannya ke queue
+berukuran terbatas (non-blocking). Thread worker di background menskor
+ulang dengan challenger lalu mencatat:
+
+- disagreement rate keputusan champion vs challenger dan selisih probabilitas;
+- fraud rate masing-masing model;
+- latency champion (diukur pemanggil) vs challenger per transaksi, serta
+  overhead `submit()` di jalur request.
+
+Jika worker tertinggal dan queue penuh, batch di-drop (dicatat) alih-alih
+menahan jalur champion. Challenger dipaksa n_jobs=1 agar tidak berebut CPU
+dengan champion (pada salinan model jika artifact diberikan sebagai dict, agar
+objek milik pemanggil tidak ikut berubah). Batch yang gagal diskor dihitung di
+`errors`; error pertama di-log lengkap dengan traceback, pesan terakhir ada di
+`summary()['last_error']`.
+
+    python -m core.batch_scoring --csv data.csv --challenger models/challenger.pkl
+    FRAUD_CHALLENGER_PATH=models/challenger.pkl streamlit run app.py
+"""
+import copy
+import logging
+import pickle
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import REGISTRY
+from core.scoring import score_transactions
+
+
+MAX_QUEUE = 256
+RECENT_DISAGREEMENTS = 50
+
+logger = logging.getLogger(__name__)
+
+SHADOW_ROWS = REGISTRY.counter(
+    'fraud_shadow_rows_total', "Transaksi yang diskor challenger per sumber dan hasil (agree/disagree)",
+    ['source', 'result']
+)
+SHADOW_DROPPED = REGISTRY.counter(
+    'fraud_shadow_dropped_total', "Batch shadow yang di-drop karena queue penuh", ['source']
+)
+SHADOW_SECONDS = REGISTRY.histogram(
+    'fraud_shadow_seconds', "Latency per batch: champion, challenger, dan overhead submit di jalur request",
+    ['model']
+)
+
+
+class ShadowScorer:
+    """
+    Skor challenger secara asinkron di thread background
+
+    Args:
+        challenger: Dict model artifact challenger atau path pickle-nya
+        max_queue: Kapasitas queue batch (batch di-drop jika penuh)
+        name: Label challenger untuk tampilan
+    """
+
+    def __init__(self, challenger, max_queue=MAX_QUEUE, name=None):
+        if isinstance(challenger, str):
+            name = name or challenger
+            with open(challenger, 'rb') as f:
+                challenger = pickle.load(f)
+        else:
+            # Dict milik pemanggil (bisa jadi model yang sama dengan champion): ubah salinannya saja
+            challenger = {**challenger, 'model': copy.deepcopy(challenger['model'])}
+        model = challenger['model']
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = 1
+        self.challenger = challenger
+        self.name = name or 'challenger'
+        self.recent = deque(maxlen=RECENT_DISAGREEMENTS)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._totals = {
+            'submitted': 0, 'dropped': 0, 'rows': 0, 'disagreements': 0, 'errors': 0,
+            'champion_flagged': 0, 'challenger_flagged': 0, 'abs_prob_diff': 0.0,
+            'champion_seconds': 0.0, 'champion_rows': 0, 'challenger_seconds': 0.0, 'challenger_rows': 0,
+            'submit_seconds': 0.0, 'last_error': None,
+        }
+        self._thread = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+        self._thread.start()
+
+    # ========================================
+    # JALUR REQUEST
+    # ========================================
+    def submit(self, raw, champion, source='ui', champion_seconds=None):
+        """
+        Antrikan transaksi yang sudah diskor champion (tidak pernah menunggu)
+
+        Args:
+            raw: DataFrame transaksi atau list record dict (jangan diubah setelah submit)
+            champion: DataFrame/dict dengan prob_fraud dan prediction (urutan sama dengan raw),
+                      atau list tuple (prob_fraud, prediction, valid) seperti output worker stream
+            source: Label jalur (ui / batch / stream)
+            champion_seconds: Waktu scoring champion untuk batch ini (untuk perbandingan latency)
+
+        Returns:
+            True jika masuk queue, False jika di-drop
+        """
+        start = time.perf_counter()
+        try:
+            self._queue.put_nowait((raw, champion, source, champion_seconds))
+            accepted = True
+        except queue.Full:
+            accepted = False
+            SHADOW_DROPPED.inc(source=source)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._totals['submitted' if accepted else 'dropped'] += 1
+            self._totals['submit_seconds'] += elapsed
+        SHADOW_SECONDS.observe(elapsed, model='submit_overhead')
+        return accepted
+
+    # ========================================
+    # WORKER
+    # ========================================
+    @staticmethod
+    def _champion_frame(champion):
+        if isinstance(champion, list):
+            return pd.DataFrame(champion, columns=['prob_fraud', 'prediction', 'valid'])
+        frame = pd.DataFrame(champion)
+        if 'valid' not in frame.columns:
+            frame['valid'] = True
+        return frame.reset_index(drop=True)
+
+    def _compare(self, raw, champion, source, champion_seconds):
+        frame = raw if isinstance(raw, pd.DataFrame) else pd.DataFrame.from_records(raw)
+        frame = frame.reset_index(drop=True)
+        champion = self._champion_frame(champion)
+
+        start = time.perf_counter()
+        challenger = score_transactions(frame, self.challenger)
+        challenger_seconds = time.perf_counter() - start
+
+        both = (champion['valid'].to_numpy(dtype=bool) & challenger['valid'].to_numpy(dtype=bool))
+        champ_pred = champion['prediction'].to_numpy()[both].astype(int)
+        chall_pred = challenger['prediction'].to_numpy()[both].astype(int)
+        champ_prob = champion['prob_fraud'].to_numpy(dtype=float)[both]
+        chall_prob = challenger['prob_fraud'].to_numpy(dtype=float)[both]
+        disagree = champ_pred != chall_pred
+
+        n_disagree = int(disagree.sum())
+        SHADOW_ROWS.inc(len(champ_pred) - n_disagree, source=source, result='agree')
+        SHADOW_ROWS.inc(n_disagree, source=source, result='disagree')
+        SHADOW_SECONDS.observe(challenger_seconds, model='challenger')
+        if champion_seconds is not None:
+            SHADOW_SECONDS.observe(champion_seconds, model='champion')
+
+        with self._lock:
+            totals = self._totals
+            totals['rows'] += len(champ_pred)
+            totals['challenger_rows'] += len(frame)
+            totals['disagreements'] += n_disagree
+            totals['champion_flagged'] += int(champ_pred.sum())
+            totals['challenger_flagged'] += int(chall_pred.sum())
+            totals['abs_prob_diff'] += float(np.abs(champ_prob - chall_prob).sum())
+            totals['challenger_seconds'] += challenger_seconds
+            if champion_seconds is not None:
+                totals['champion_seconds'] += champion_seconds
+                totals['champion_rows'] += len(frame)
+            positions = np.flatnonzero(both)
+            for index in np.flatnonzero(disagree)[:RECENT_DISAGREEMENTS]:
+                row = positions[index]
+                self.recent.append({
+                    'source': source,
+                    'category': frame['category'].iloc[row],
+                    'amt': float(frame['amt'].iloc[row]),
+                    'champion_prob': float(champ_prob[index]),
+                    'challenger_prob': float(chall_prob[index]),
+                })
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._compare(*item)
+            except Exception as e:
+                # Record rusak (kolom hilang dsb.) tidak boleh menghentikan worker
+                with self._lock:
+                    self._totals['errors'] += 1
+                    first = self._totals['errors'] == 1
+                    self._totals['last_error'] = f"{type(e).__name__}: {e}"
+                if first:
+                    logger.exception("Shadow scoring %s gagal (error berikutnya hanya dihitung)", self.name)
+            finally:
+                self._queue.task_done()
+
+    # ========================================
+    # HASIL
+    # ========================================
+    def flush(self):
+        """Tunggu sampai semua batch di queue selesai diskor (untuk job batch sebelum exit)"""
+        self._queue.join()
+
+    def summary(self):
+        """Ringkasan kumulatif champion vs challenger"""
+        with self._lock:
+            totals = dict(self._totals)
+        rows = totals['rows']
+        batches = totals['submitted'] + totals['dropped']
+        return {
+            'challenger': self.name,
+            'batches': batches,
+            'dropped': totals['dropped'],
+            'errors': totals['errors'],
+            'last_error': totals['last_error'],
+            'pending': self._queue.qsize(),
+            'rows': rows,
+            'disagreements': totals['disagreements'],
+            'disagreement_rate': totals['disagreements'] / rows if rows else None,
+            'champion_fraud_rate': totals['champion_flagged'] / rows if rows else None,
+            'challenger_fraud_rate': totals['challenger_flagged'] / rows if rows else None,
+            'mean_abs_prob_diff': totals['abs_prob_diff'] / rows if rows else None,
+            'champion_ms_per_row': (totals['champion_seconds'] * 1000 / totals['champion_rows']
+                                    if totals['champion_rows'] else None),
+            'challenger_ms_per_row': (totals['challenger_seconds'] * 1000 / totals['challenger_rows']
+                                      if totals['challenger_rows'] else None),
+            'submit_overhead_ms': totals['submit_seconds'] * 1000 / batches if batches else None,
+        }
@@ -0,0 +1,292 @@
+"""
+Sketches - Ringkasan aproksimasi yang di-update incremental saat data di-append
+
+- `KLLSketch`      : quantile (amt, tanggal lahir -> umur) dengan memori O(k log n)
+- `HyperLogLog`    : jumlah distinct (kartu, merchant) dengan 2^p register uint8
+- `CountMinSketch` : jumlah fraud per merchant (kardinalitas tinggi) + kandidat top-k
+
+`DatasetSketches` menggabungkan semuanya untuk dashboard; `exact_summary`
+menghitung nilai exact dengan format yang sama untuk pembanding.
+"""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from core.timestamps import age_from_days, parse_date_days
+
+
+# Kolom sumber yang dibutuhkan DatasetSketches.update / exact_summary
+SKETCH_COLUMNS = ['amt', 'dob', 'cc_num', 'merchant', 'is_fraud']
+
+
+def _hash64(values, hash_key=None):
+    """Hash 64-bit vectorized untuk Series/array nilai apa pun"""
+    series = pd.Series(values).astype(str)
+    if hash_key is None:
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+    return pd.util.hash_pandas_object(series, index=False, hash_key=hash_key).to_numpy()
+
+
+# ========================================
+# QUANTILE: KLL
+# ========================================
+class KLLSketch:
+    """
+    KLL quantile sketch (compactor bertingkat, item level h berbobot 2^h)
+
+    Args:
+        k: Kapasitas level teratas; error rank kira-kira 1.7 / k
+        seed: Seed offset compaction
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        # Compact level terendah yang penuh sampai semua level muat; tiap
+        # compaction membuang separuh item sehingga loop pasti berhenti
+        while True:
+            full = [h for h in range(len(self.levels)) if len(self.levels[h]) > self._capacity(h)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            items = items[:len(items) - len(keep)]
+            promoted = items[int(self.rng.integers(2))::2]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            self.levels[level] = keep
+
+    def update(self, values):
+        """Tambahkan batch nilai (NaN diabaikan)"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Gabungkan sketch lain (mis. dari partisi berbeda)"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Perkiraan quantile q (skalar atau array) dalam [0, 1]"""
+        if self.n == 0:
+            return np.nan if np.isscalar(q) else np.full(len(q), np.nan)
+        items, cum = self._weighted()
+        pos = np.searchsorted(cum, np.asarray(q) * cum[-1], side='left')
+        return items[np.minimum(pos, len(items) - 1)]
+
+    def cdf(self, x):
+        """Perkiraan proporsi nilai <= x"""
+        if self.n == 0:
+            return np.nan
+        items, cum = self._weighted()
+        pos = np.searchsorted(items, x, side='right')
+        return np.where(pos > 0, cum[np.maximum(pos - 1, 0)], 0.0) / cum[-1]
+
+
+# ========================================
+# DISTINCT COUNT: HYPERLOGLOG
+# ========================================
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter (error standar ~1.04 / sqrt(2^p))
+
+    Args:
+        p: Jumlah bit index register (2^p register)
+    """
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values):
+        """Tambahkan batch nilai (di-hash 64-bit)"""
+        if len(values) == 0:
+            return
+        hashes = _hash64(values)
+        rest_bits = 64 - self.p
+        index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = (hashes & np.uint64((1 << rest_bits) - 1)).astype(np.float64)
+        # bit_length(rest) via eksponen float (exact untuk rest < 2^53)
+        bit_length = np.frexp(rest)[1]
+        rank = (rest_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Perkiraan jumlah nilai distinct"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting untuk kardinalitas kecil
+        return int(round(estimate))
+
+
+# ========================================
+# FREQUENCY: COUNT-MIN
+# ========================================
+class CountMinSketch:
+    """
+    Count-min sketch dengan daftar kandidat heavy hitter
+
+    Args:
+        width, depth: Ukuran tabel counter (error <= total * e / width, prob. 1 - e^-depth)
+        top_k: Jumlah kandidat key terbesar yang disimpan untuk query top-k
+    """
+
+    def __init__(self, width=2048, depth=4, top_k=50):
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.hash_keys = [f'cms-row-{row:08d}' for row in range(depth)]
+        self.candidates = set()
+
+    def _columns(self, keys):
+        return [(_hash64(keys, hash_key) % np.uint64(self.width)).astype(np.int64) for hash_key in self.hash_keys]
+
+    def update(self, keys, weights=None):
+        """Tambahkan bobot per key (default 1)"""
+        keys = pd.Series(keys).astype(str).reset_index(drop=True)
+        if len(keys) == 0:
+            return
+        weights = np.ones(len(keys), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        for row, columns in enumerate(self._columns(keys)):
+            np.add.at(self.table[row], columns, weights)
+
+        touched = set(keys[weights > 0].unique())
+        pool = sorted(self.candidates | touched)
+        if pool:
+            estimates = self.estimate(pool)
+            top = np.argsort(-estimates, kind='stable')[:self.top_k]
+            self.candidates = {pool[i] for i in top if estimates[i] > 0}
+
+    def estimate(self, keys):
+        """Perkiraan (batas atas) bobot untuk tiap key"""
+        keys = pd.Series(keys).astype(str).reset_index(drop=True)
+        if len(keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.min([self.table[row, columns] for row, columns in enumerate(self._columns(keys))], axis=0)
+
+    def top(self, n=10):
+        """DataFrame [key, estimate] untuk n kandidat terbesar"""
+        keys = sorted(self.candidates)
+        estimates = self.estimate(keys)
+        frame = pd.DataFrame({'key': keys, 'estimate': estimates})
+        return frame.sort_values(['estimate', 'key'], ascending=[False, True], ignore_index=True).head(n)
+
+
+# ========================================
+# DATASET SKETCHES
+# ========================================
+def _dob_days(dob):
+    return parse_date_days(dob).astype(float)
+
+
+class DatasetSketches:
+    """Kumpulan sketch untuk ringkasan dashboard, di-update per batch append"""
+
+    def __init__(self, k=400, hll_p=14):
+        self.rows = 0
+        self.fraud = 0
+        self.amt = KLLSketch(k, seed=1)
+        self.dob = KLLSketch(k, seed=2)
+        self.cards = HyperLogLog(hll_p)
+        self.merchants = HyperLogLog(hll_p)
+        self.merchant_fraud = CountMinSketch()
+
+    def update(self, df):
+        """Update semua sketch dengan batch transaksi (schema CSV dataset)"""
+        self.rows += len(df)
+        self.fraud += int(df['is_fraud'].sum())
+        self.amt.update(df['amt'].to_numpy(dtype=float))
+        self.dob.update(_dob_days(df['dob']))
+        self.cards.update(df['cc_num'])
+        self.merchants.update(df['merchant'])
+        self.merchant_fraud.update(df['merchant'], df['is_fraud'].to_numpy())
+
+    def summary(self, today=None, top_n=10):
+        """
+        Ringkasan aproksimasi
+
+        Returns:
+            Dict rows, fraud, distinct_cards, distinct_merchants,
+            amt {q1, median, q3}, age {q1, median, q3}, top_merchant_fraud DataFrame
+        """
+        today = today or pd.Timestamp.today()
+        amt_q = self.amt.quantile([0.25, 0.5, 0.75])
+        # Umur menurun terhadap tanggal lahir: quantile q umur = quantile (1 - q) tanggal lahir
+        dob_q = self.dob.quantile([0.75, 0.5, 0.25])
+        top = self.merchant_fraud.top(top_n).rename(columns={'key': 'merchant', 'estimate': 'fraud_count'})
+        return {
+            'rows': self.rows,
+            'fraud': self.fraud,
+            'distinct_cards': self.cards.count(),
+            'distinct_merchants': self.merchants.count(),
+            'amt': dict(zip(('q1', 'median', 'q3'), map(float, amt_q))),
+            'age': dict(zip(('q1', 'median', 'q3'), (int(age) for age in age_from_days(dob_q, today)))),
+            'top_merchant_fraud': top,
+        }
+
+    def save(self, path):
+        """Simpan sketch secara atomik"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        """Load sketch; None jika file belum ada"""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def exact_summary(df, today=None, top_n=10):
+    """Nilai exact dengan format yang sama seperti `DatasetSketches.summary`"""
+    today = today or pd.Timestamp.today()
+    age = pd.Series(age_from_days(parse_date_days(df['dob']), today).astype(int))
+    top = df.groupby('merchant')['is_fraud'].sum().reset_index()
+    top.columns = ['merchant', 'fraud_count']
+    top = top.sort_values(['fraud_count', 'merchant'], ascending=[False, True], ignore_index=True).head(top_n)
+    return {
+        'rows': int(len(df)),
+        'fraud': int(df['is_fraud'].sum()),
+        'distinct_cards': int(df['cc_num'].nunique()),
+        'distinct_merchants': int(df['merchant'].nunique()),
+        'amt': dict(zip(('q1', 'median', 'q3'), map(float, df['amt'].quantile([0.25, 0.5, 0.75])))),
+        'age': dict(zip(('q1', 'median', 'q3'), map(float, age.quantile([0.25, 0.5, 0.75])))),
+        'top_merchant_fraud': top,
+    }
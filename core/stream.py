@@ -0,0 +1,471 @@
+"""
+Streaming Pipeline - Scoring transaksi kontinu berbasis asyncio
+
+Alur:
+    source (spool directory / socket NDJSON)
+        -> batcher (batch_size / max_wait)
+        -> scorer workers (process pool, model di-load sekali per worker)
+        -> sink (scored.jsonl, alerts.jsonl, rejected.jsonl, balasan socket)
+
+Setiap tahap dihubungkan dengan asyncio.Queue berukuran terbatas sehingga
+source otomatis melambat (backpressure) ketika scoring atau sink tertinggal.
+
+Contoh:
+    # Replay file rekaman secepat mungkin lalu berhenti
+    python -m core.stream --spool spool/ --once --out stream_output/
+
+    # Terima NDJSON lewat socket lokal
+    python -m core.stream --socket 127.0.0.1:9099 --out stream_output/
+
+    # Shadow scoring: challenger menskor batch yang sama di thread background
+    python -m core.stream --spool spool/ --once --challenger models/challenger.pkl
+
+    # Engine BinnedForest (traversal bin integer, leaf identik dengan model)
+    python -m core.stream --spool spool/ --once --binned
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from core.scoring import score_transactions
+
+
+MODEL_PATH = 'models/fraud_detection_model.pkl'
+SPOOL_PATTERNS = ('*.jsonl', '*.ndjson', '*.csv')
+READ_CHUNK_SIZE = 1_000
+
+_ARTIFACTS = None
+_EARLY_EXIT = None
+_BINNED = False
+
+
+# ========================================
+# WORKER (dijalankan di process/thread pool)
+# ========================================
+def _init_worker(model_path, early_exit=None, binned=False):
+    """Load model artifact sekali per worker"""
+    global _ARTIFACTS, _EARLY_EXIT, _BINNED
+    _EARLY_EXIT = early_exit
+    _BINNED = binned
+    with open(model_path, 'rb') as f:
+        _ARTIFACTS = pickle.load(f)
+    model = _ARTIFACTS['model']
+    # Paralelisme diatur oleh pool; hindari thread joblib per panggilan
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+
+
+def _score_records(records):
+    """Skor list record dict, kembalikan list (prob_fraud, prediction, valid)"""
+    frame = pd.DataFrame.from_records(records)
+    try:
+        scored = score_transactions(frame, _ARTIFACTS, early_exit=_EARLY_EXIT, binned=_BINNED)
+    except (KeyError, ValueError, TypeError):
+        # Batch berisi record rusak: skor satu per satu agar record valid tetap lolos
+        results = []
+        for record in records:
+            try:
+                row = score_transactions(pd.DataFrame.from_records([record]), _ARTIFACTS,
+                                         early_exit=_EARLY_EXIT, binned=_BINNED).iloc[0]
+                results.append((float(row['prob_fraud']), int(row['prediction']), bool(row['valid'])))
+            except (KeyError, ValueError, TypeError):
+                results.append((float('nan'), 0, False))
+        return results
+    return list(zip(scored['prob_fraud'].astype(float), scored['prediction'].astype(int),
+                    scored['valid'].astype(bool)))
+
+
+# ========================================
+# STATISTIK
+# ========================================
+class PipelineStats:
+    """Counter throughput pipeline"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.received = 0
+        self.scored = 0
+        self.alerts = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def summary(self):
+        """Ringkasan throughput sejak pipeline mulai"""
+        elapsed = time.perf_counter() - self.started
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'received': self.received,
+            'scored': self.scored,
+            'alerts': self.alerts,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'throughput_per_s': round(self.scored / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class _Connection:
+    """State satu koneksi socket: writer dan jumlah record yang belum dibalas"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = 0
+        self.eof = False
+        self.done = asyncio.Event()
+
+    def settle(self, n):
+        self.pending -= n
+        if self.eof and self.pending <= 0:
+            self.done.set()
+
+
+# ========================================
+# SOURCES
+# ========================================
+async def spool_source(directory, queue, stats, once=False, poll_interval=1.0):
+    """
+    Pantau spool directory; file *.jsonl/*.ndjson/*.csv dibaca per chunk lalu
+    dipindahkan ke `<directory>/processed/`
+
+    Args:
+        directory: Folder spool
+        queue: Queue keluaran berisi (records, connection)
+        stats: PipelineStats
+        once: Berhenti setelah semua file yang ada diproses
+        poll_interval: Jeda antar pemindaian folder (detik)
+    """
+    processed_dir = os.path.join(directory, 'processed')
+    os.makedirs(processed_dir, exist_ok=True)
+
+    while True:
+        paths = sorted(p for pattern in SPOOL_PATTERNS for p in glob.glob(os.path.join(directory, pattern)))
+        for path in paths:
+            if path.endswith('.csv'):
+                chunks = pd.read_csv(path, chunksize=READ_CHUNK_SIZE)
+            else:
+                chunks = pd.read_json(path, lines=True, chunksize=READ_CHUNK_SIZE)
+            with chunks:
+                while True:
+                    chunk = await asyncio.to_thread(next, chunks, None)
+                    if chunk is None:
+                        break
+                    records = chunk.to_dict('records')
+                    stats.received += len(records)
+                    await queue.put((records, None))
+            shutil.move(path, os.path.join(processed_dir, os.path.basename(path)))
+
+        if once:
+            return
+        await asyncio.sleep(poll_interval)
+
+
+async def socket_source(host, port, queue, stats, ready=None):
+    """
+    Server TCP lokal yang menerima NDJSON (satu transaksi per baris) dan
+    membalas satu baris JSON hasil scoring untuk setiap transaksi; baris yang
+    bukan JSON object dibalas `{"error": ...}`
+
+    Args:
+        host: Host bind (mis. 127.0.0.1)
+        port: Port
+        queue: Queue keluaran berisi (records, connection)
+        stats: PipelineStats
+        ready: asyncio.Event opsional yang di-set saat server siap
+    """
+    async def handle(reader, writer):
+        connection = _Connection(writer)
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                error = None if isinstance(record, dict) else 'expected a JSON object'
+            except json.JSONDecodeError:
+                error = 'invalid json'
+            if error is not None:
+                # Tetap satu balasan per baris: client pipelined menunggu balasan setiap baris
+                stats.rejected += 1
+                writer.write((json.dumps({'error': error}) + '\n').encode('utf-8'))
+                await writer.drain()
+                continue
+            stats.received += 1
+            connection.pending += 1
+            await queue.put(([record], connection))
+        connection.eof = True
+        if connection.pending <= 0:
+            connection.done.set()
+        await connection.done.wait()
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+# ========================================
+# BATCHER, SCORER, SINK
+# ========================================
+async def batcher(in_queue, out_queue, batch_size, max_wait):
+    """Gabungkan record menjadi batch berukuran batch_size atau setelah max_wait detik"""
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await in_queue.get()
+        if item is None:
+            await out_queue.put(None)
+            return
+
+        records, owners = [], []
+        deadline = loop.time() + max_wait
+        finished = False
+        while True:
+            chunk, connection = item
+            records.extend(chunk)
+            owners.extend([connection] * len(chunk))
+            if len(records) >= batch_size:
+                break
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(in_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                finished = True
+                break
+
+        for start in range(0, len(records), batch_size):
+            await out_queue.put((records[start:start + batch_size], owners[start:start + batch_size]))
+        if finished:
+            await out_queue.put(None)
+            return
+
+
+async def scorer(batch_queue, result_queue, executor, stats, shadow=None):
+    """Kirim batch ke pool worker dan teruskan hasilnya ke sink (dan ke shadow challenger jika ada)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await batch_queue.get()
+        if batch is None:
+            # Teruskan sentinel ke scorer lain dan sink
+            await batch_queue.put(None)
+            await result_queue.put(None)
+            return
+        records, owners = batch
+        start = time.perf_counter()
+        results = await loop.run_in_executor(executor, _score_records, records)
+        stats.batches += 1
+        if shadow is not None:
+            shadow.submit(records, results, source='stream', champion_seconds=time.perf_counter() - start)
+        await result_queue.put((records, owners, results))
+
+
+async def sink(result_queue, output_dir, stats, n_scorers, history_store=None):
+    """
+    Tulis hasil ke NDJSON (scored/alerts/rejected), balas koneksi socket dan
+    opsional simpan ke PredictionHistoryStore
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    finished_scorers = 0
+    with open(os.path.join(output_dir, 'scored.jsonl'), 'a', encoding='utf-8') as scored_f, \
+            open(os.path.join(output_dir, 'alerts.jsonl'), 'a', encoding='utf-8') as alerts_f, \
+            open(os.path.join(output_dir, 'rejected.jsonl'), 'a', encoding='utf-8') as rejected_f:
+        while True:
+            item = await result_queue.get()
+            if item is None:
+                finished_scorers += 1
+                if finished_scorers >= n_scorers:
+                    return
+                continue
+
+            records, owners, results = item
+            history_rows = []
+            replies = {}
+            for record, connection, (prob_fraud, prediction, valid) in zip(records, owners, results):
+                if not valid:
+                    stats.rejected += 1
+                    rejected_f.write(json.dumps(record, default=str) + '\n')
+                    reply = {'trans_num': record.get('trans_num'), 'error': 'invalid record'}
+                else:
+                    stats.scored += 1
+                    scored = {**record, 'prob_fraud': prob_fraud, 'prediction': prediction}
+                    line = json.dumps(scored, default=str) + '\n'
+                    scored_f.write(line)
+                    if prediction == 1:
+                        stats.alerts += 1
+                        alerts_f.write(line)
+                    reply = {'trans_num': record.get('trans_num'), 'prob_fraud': prob_fraud,
+                             'prediction': 'FRAUD' if prediction == 1 else 'SAFE'}
+                    history_rows.append({
+                        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+                        'amount': record.get('amt'),
+                        'category': record.get('category'),
+                        'state': record.get('state'),
+                        'hour': record.get('hour'),
+                        'prediction': reply['prediction'],
+                        'prob_safe': (1 - prob_fraud) * 100,
+                        'prob_fraud': prob_fraud * 100,
+                    })
+                if connection is not None:
+                    replies.setdefault(connection, []).append(json.dumps(reply) + '\n')
+
+            for connection, lines in replies.items():
+                try:
+                    connection.writer.write(''.join(lines).encode('utf-8'))
+                    await connection.writer.drain()
+                except ConnectionError:
+                    pass
+                connection.settle(len(lines))
+
+            if history_store is not None and history_rows:
+                await asyncio.to_thread(history_store.append_many, history_rows, 'stream')
+
+
+async def _report(stats, interval):
+    """Cetak throughput secara periodik"""
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(stats.summary()), flush=True)
+
+
+# ========================================
+# PIPELINE
+# ========================================
+async def run_pipeline(model_path=MODEL_PATH, spool_dir=None, socket_addr=None, output_dir='stream_output',
+                       batch_size=512, max_wait=0.05, workers=None, queue_size=64, once=False,
+                       executor_kind='process', history_store=None, report_interval=None, early_exit=None,
+                       shadow=None, binned=False):
+    """
+    Jalankan pipeline streaming sampai source selesai (spool --once) atau dibatalkan
+
+    Args:
+        model_path: Path model artifact
+        spool_dir: Folder spool (pilih salah satu dengan socket_addr)
+        socket_addr: Tuple (host, port) untuk source socket NDJSON
+        output_dir: Folder output sink
+        batch_size: Jumlah maksimal record per batch scoring
+        max_wait: Waktu tunggu maksimal untuk melengkapi batch (detik)
+        workers: Jumlah worker scoring (default: jumlah CPU)
+        queue_size: Kapasitas tiap queue antar tahap (backpressure)
+        once: Untuk spool, berhenti setelah file yang ada selesai
+        executor_kind: 'process' atau 'thread'
+        history_store: PredictionHistoryStore opsional
+        report_interval: Interval cetak throughput (detik), None = tidak dicetak
+        early_exit: True (setting terverifikasi di artefak) atau dict override
+            {'chunk_size', 'delta'} untuk early-exit inference
+        shadow: ShadowScorer challenger opsional (diskor di thread background)
+        binned: True untuk memakai engine BinnedForest di worker
+
+    Returns:
+        Dict ringkasan PipelineStats
+    """
+    if (spool_dir is None) == (socket_addr is None):
+        raise ValueError("Pilih tepat satu source: spool_dir atau socket_addr")
+
+    workers = workers or os.cpu_count() or 1
+    pool_cls = ProcessPoolExecutor if executor_kind == 'process' else ThreadPoolExecutor
+    stats = PipelineStats()
+
+    raw_queue = asyncio.Queue(maxsize=queue_size)
+    batch_queue = asyncio.Queue(maxsize=queue_size)
+    result_queue = asyncio.Queue(maxsize=queue_size)
+
+    with pool_cls(max_workers=workers, initializer=_init_worker,
+                  initargs=(model_path, early_exit, binned)) as executor:
+        tasks = [asyncio.create_task(batcher(raw_queue, batch_queue, batch_size, max_wait))]
+        tasks += [asyncio.create_task(scorer(batch_queue, result_queue, executor, stats, shadow))
+                  for _ in range(workers)]
+        sink_task = asyncio.create_task(sink(result_queue, output_dir, stats, workers, history_store))
+        reporter = asyncio.create_task(_report(stats, report_interval)) if report_interval else None
+
+        try:
+            if spool_dir is not None:
+                await spool_source(spool_dir, raw_queue, stats, once=once)
+            else:
+                await socket_source(socket_addr[0], socket_addr[1], raw_queue, stats)
+            await raw_queue.put(None)
+            await asyncio.gather(*tasks, sink_task)
+        finally:
+            for task in tasks + [sink_task] + ([reporter] if reporter else []):
+                task.cancel()
+
+    return stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming fraud scoring pipeline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--spool', help="Folder spool berisi file .jsonl/.ndjson/.csv")
+    source.add_argument('--socket', help="host:port untuk menerima NDJSON")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path model artifact")
+    parser.add_argument('--out', default='stream_output', help="Folder output")
+    parser.add_argument('--batch-size', type=int, default=512)
+    parser.add_argument('--max-wait', type=float, default=0.05, help="Detik maksimal menunggu batch penuh")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process')
+    parser.add_argument('--once', action='store_true', help="Spool: proses file yang ada lalu berhenti")
+    parser.add_argument('--history', help="Path SQLite PredictionHistoryStore (opsional)")
+    parser.add_argument('--report-interval', type=float, default=5.0)
+    parser.add_argument('--early-exit', action='store_true', help="Evaluasi pohon per chunk dengan early exit")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Pohon per chunk early exit (default: nilai terverifikasi di artefak)")
+    parser.add_argument('--delta', type=float, default=None,
+                        help="Confidence bound early exit (default: nilai terverifikasi di artefak)")
+    parser.add_argument('--binned', action='store_true', help="Pakai engine BinnedForest (traversal bin integer)")
+    parser.add_argument('--challenger', help="Model challenger untuk shadow scoring (dibandingkan, tidak dipakai)")
+    args = parser.parse_args()
+
+    socket_addr = None
+    if args.socket:
+        host, port = args.socket.rsplit(':', 1)
+        socket_addr = (host, int(port))
+
+    history_store = None
+    if args.history:
+        from core.history_store import PredictionHistoryStore
+        history_store = PredictionHistoryStore(args.history)
+
+    shadow = None
+    if args.challenger:
+        from core.shadow import ShadowScorer
+        shadow = ShadowScorer(args.challenger)
+
+    summary = asyncio.run(run_pipeline(
+        model_path=args.model,
+        spool_dir=args.spool,
+        socket_addr=socket_addr,
+        output_dir=args.out,
+        batch_size=args.batch_size,
+        max_wait=args.max_wait,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        once=args.once,
+        executor_kind=args.executor,
+        history_store=history_store,
+        report_interval=args.report_interval,
+        early_exit={'chunk_size': args.chunk_size, 'delta': args.delta} if args.early_exit else None,
+        shadow=shadow,
+        binned=args.binned
+    ))
+    if shadow is not None:
+        shadow.flush()
+        summary['shadow'] = shadow.summary()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
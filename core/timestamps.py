@@ -0,0 +1,221 @@
+"""
+Timestamps - Parsing tanggal format tetap dan fitur waktu dari epoch integer
+
+Kolom waktu dataset selalu berformat tetap:
+
+- `trans_date_trans_time`: 'YYYY-MM-DD HH:MM:SS'
+- `dob`                  : 'YYYY-MM-DD'
+
+`pd.to_datetime` tanpa format harus menebak format setiap kali dipanggil.
+Di sini string dibaca langsung sebagai matriks byte lebar tetap (buffer
+Arrow, tanpa salinan per string), digit dihitung secara aritmetika menjadi
+epoch integer (detik / hari sejak 1970-01-01), lalu jam, hari dalam minggu,
+tahun dan umur diturunkan dari integer tersebut tanpa objek datetime.
+Input yang tidak cocok dengan layout (null, panjang berbeda, digit tidak
+valid, tanggal yang tidak ada seperti 2019-02-30) jatuh ke `pd.to_datetime`
+dengan format eksplisit, yang me-raise untuk nilai tersebut.
+
+Catatan: `unix_time` di dataset ini tidak dipakai karena bergeser beberapa
+tahun dari `trans_date_trans_time` (jam sama, hari dalam minggu berbeda).
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+# Kolom epoch hasil parsing yang di-cache di tabel bersama (core.data_service)
+TRANS_EPOCH_COLUMN = 'trans_epoch'
+DOB_DAYS_COLUMN = 'dob_days'
+
+SECONDS_PER_DAY = 86_400
+DAYS_PER_YEAR = 365.25
+
+
+# ========================================
+# KALENDER (aritmetika integer, proleptic Gregorian)
+# ========================================
+def days_from_civil(year, month, day):
+    """Jumlah hari sejak 1970-01-01 untuk array year/month/day"""
+    year = np.asarray(year, dtype=np.int64) - (np.asarray(month) <= 2)
+    month = np.asarray(month, dtype=np.int64)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + np.asarray(day, dtype=np.int64) - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146_097 + day_of_era - 719_468
+
+
+def is_leap_year(year):
+    """True untuk tahun kabisat (Gregorian)"""
+    year = np.asarray(year, dtype=np.int64)
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def days_in_month(year, month):
+    """Jumlah hari dalam bulan untuk array year/month (month 1-12)"""
+    month = np.asarray(month, dtype=np.int64)
+    days = np.where(month == 2, 28, 30 + ((month + (month >= 8)) % 2))
+    return days + ((month == 2) & is_leap_year(year))
+
+
+def year_from_days(days):
+    """Tahun kalender dari hari sejak epoch"""
+    z = np.asarray(days, dtype=np.int64) + 719_468
+    era = z // 146_097
+    day_of_era = z - era * 146_097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36_524 - day_of_era // 146_096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_index = (5 * day_of_year + 2) // 153
+    return year_of_era + era * 400 + (month_index >= 10)
+
+
+def hour_from_epoch(seconds):
+    """Jam (0-23) dari detik sejak epoch"""
+    return (np.asarray(seconds, dtype=np.int64) // 3600) % 24
+
+
+def weekday_from_epoch(seconds):
+    """Hari dalam minggu (Senin=0 ... Minggu=6) dari detik sejak epoch"""
+    # 1970-01-01 adalah hari Kamis (3)
+    return (np.asarray(seconds, dtype=np.int64) // SECONDS_PER_DAY + 3) % 7
+
+
+def age_from_days(dob_days, today=None):
+    """
+    Umur dalam tahun (pecahan) seperti dashboard: selisih hari / 365.25
+
+    Args:
+        dob_days: Tanggal lahir dalam hari sejak epoch
+        today: Tanggal acuan (default: hari ini)
+    """
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.today()
+    today_days = days_from_civil(today.year, today.month, today.day)
+    return (today_days - np.asarray(dob_days, dtype=np.int64)) / DAYS_PER_YEAR
+
+
+def epoch_to_datetime(seconds):
+    """Array datetime64[s] dari detik sejak epoch (tanpa parsing ulang)"""
+    return np.asarray(seconds, dtype=np.int64).astype('datetime64[s]')
+
+
+# ========================================
+# PARSING FORMAT TETAP
+# ========================================
+def _fixed_width_bytes(values, width):
+    """
+    Matriks uint8 (n, width) dari kolom string yang semua panjangnya `width`
+
+    Memakai buffer data Arrow langsung; None jika ada null atau panjang berbeda.
+    """
+    try:
+        array = values if isinstance(values, (pa.Array, pa.ChunkedArray)) else pa.array(values, from_pandas=True)
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        array = array.cast(pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    if array.null_count or len(array) == 0:
+        return None
+
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int32)[array.offset:array.offset + len(array) + 1]
+    if not np.all(np.diff(offsets) == width):
+        return None
+    data = np.frombuffer(array.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+    return data.reshape(len(array), width)
+
+
+def _parse_fields(values, width, separators, fields):
+    """Parse layout lebar tetap menjadi dict field integer; None jika tidak cocok"""
+    raw = _fixed_width_bytes(values, width)
+    if raw is None:
+        return None
+    for col, char in separators.items():
+        if not np.all(raw[:, col] == ord(char)):
+            return None
+
+    parsed = {}
+    invalid = np.zeros(len(raw), dtype=bool)
+    for name, (start, length) in fields.items():
+        value = np.zeros(len(raw), dtype=np.int32)
+        for col in range(start, start + length):
+            digit = raw[:, col] - np.uint8(ord('0'))  # byte non-digit wrap menjadi > 9
+            invalid |= digit > 9
+            value = value * 10 + digit
+        parsed[name] = value
+
+    invalid |= (parsed['month'] < 1) | (parsed['month'] > 12) | (parsed['day'] < 1)
+    # Hari dibandingkan dengan panjang bulan sebenarnya (termasuk 29 Februari di tahun kabisat)
+    invalid |= parsed['day'] > days_in_month(parsed['year'], np.clip(parsed['month'], 1, 12))
+    if 'hour' in parsed:
+        invalid |= (parsed['hour'] > 23) | (parsed['minute'] > 59) | (parsed['second'] > 59)
+    return None if invalid.any() else parsed
+
+
+def _parse_fallback(values, fmt, unit):
+    """Jalur lambat `pd.to_datetime` dengan format eksplisit (tetap tanpa inferensi)"""
+    parsed = pd.to_datetime(pd.Series(np.asarray(values, dtype=object)), format=fmt)
+    if parsed.isna().any():
+        raise ValueError("Kolom tanggal berisi nilai kosong")
+    return parsed.to_numpy(dtype=unit).astype(np.int64)
+
+
+def parse_datetime_epoch(values):
+    """
+    Parse 'YYYY-MM-DD HH:MM:SS' menjadi detik sejak epoch (int64)
+
+    Args:
+        values: Series/array string, pyarrow array, atau Series datetime64
+
+    Returns:
+        np.ndarray int64
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+    parsed = _parse_fields(
+        values, 19, {4: '-', 7: '-', 10: ' ', 13: ':', 16: ':'},
+        {'year': (0, 4), 'month': (5, 2), 'day': (8, 2), 'hour': (11, 2), 'minute': (14, 2), 'second': (17, 2)}
+    )
+    if parsed is None:
+        return _parse_fallback(values, DATETIME_FORMAT, 'datetime64[s]')
+
+    days = days_from_civil(parsed['year'], parsed['month'], parsed['day'])
+    return days * SECONDS_PER_DAY + parsed['hour'] * 3600 + parsed['minute'] * 60 + parsed['second']
+
+
+def parse_date_days(values):
+    """
+    Parse 'YYYY-MM-DD' menjadi hari sejak epoch (int64)
+
+    Args:
+        values: Series/array string, pyarrow array, atau Series datetime64
+
+    Returns:
+        np.ndarray int64
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+    parsed = _parse_fields(values, 10, {4: '-', 7: '-'}, {'year': (0, 4), 'month': (5, 2), 'day': (8, 2)})
+    if parsed is None:
+        return _parse_fallback(values, DATE_FORMAT, 'datetime64[D]')
+    return days_from_civil(parsed['year'], parsed['month'], parsed['day'])
+
+
+def add_epoch_columns(table):
+    """
+    Tambahkan kolom epoch hasil parsing ke pyarrow.Table (cache parsing)
+
+    Returns:
+        Table dengan kolom tambahan `trans_epoch` (int64, detik) dan
+        `dob_days` (int32, hari) jika kolom sumbernya ada
+    """
+    if 'trans_date_trans_time' in table.column_names and TRANS_EPOCH_COLUMN not in table.column_names:
+        epochs = parse_datetime_epoch(table.column('trans_date_trans_time'))
+        table = table.append_column(TRANS_EPOCH_COLUMN, pa.array(epochs, type=pa.int64()))
+    if 'dob' in table.column_names and DOB_DAYS_COLUMN not in table.column_names:
+        days = parse_date_days(table.column('dob'))
+        table = table.append_column(DOB_DAYS_COLUMN, pa.array(days.astype(np.int32), type=pa.int32()))
+    return table
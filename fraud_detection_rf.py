@@ -8,14 +8,36 @@ Original file is located at
 
 # FRAUD DETECTION MODEL TRAINING with Random Forest
 
+Pipeline training disusun sebagai stage graph (`core.pipeline`): setiap
+stage di-cache di disk dengan key dari hash input dan parameternya, jadi
+mengubah parameter fit tidak mengulang load maupun encoding. Perubahan di
+modul core yang dipakai stage (CODE_MODULES) juga meng-invalidasi cache. Chart
+EDA tidak dirender di sini: stage `eda` hanya mencetak ringkasan teks, lalu
+stage `eda_report` (tanpa cache, setelah `save`) menjalankan `core.eda_report`
+sebagai proses background dengan artefak evaluasi yang baru disimpan (HTML di
+reports/eda_report.html, termasuk confusion matrix dan feature importance).
+
+    python fraud_detection_rf.py                            # semua stage (cache dipakai)
+    python fraud_detection_rf.py --stages fit evaluate      # stage tertentu + dependensinya
+    python fraud_detection_rf.py --set fit.n_estimators=300 # override parameter stage
+    python fraud_detection_rf.py --force load               # jalankan ulang stage + turunannya
+    python fraud_detection_rf.py --plan                     # tampilkan rencana tanpa menjalankan
+    python fraud_detection_rf.py --profile                  # span timing sebagai JSON lines (reports/)
+
 # Import Libraries
 """
 
 # Commented out IPython magic to ensure Python compatibility.
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
+from sklearn.model_selection import train_test_split, StratifiedKFold, cross_validate
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (accuracy_score, precision_score, recall_score,
@@ -24,566 +46,783 @@ import pickle
 import warnings
 warnings.filterwarnings('ignore')
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-sns.set_style('whitegrid')
-
-# Set matplotlib to display plots inline
-# %matplotlib inline
+from core import profiling
+from core.pipeline import StageGraph
+from core.profiling import span
 
 print("✅ All libraries imported successfully!")
 
-"""# Load Dataset"""
-
-print("📂 Loading dataset...")
-
-# Pastikan file credit_card_transactions2.csv ada di folder yang sama
-# Atau sesuaikan path-nya
-df = pd.read_csv('../data/credit_card_transactions2.csv')
-print("✓ Dataset loaded from '../data/credit_card_transactions2.csv'")
-
-print(f"Total data: {len(df):,} rows")
-print(f"Columns: {len(df.columns)} columns")
-print(f"\nDataset Info:")
-df.info()
-
-"""# EXPLORATORY DATA ANALYSIS (EDA)
-
-## 1. Dataset Overview
-"""
-
-print("\n" + "="*70)
-print("EXPLORATORY DATA ANALYSIS (EDA)")
-print("="*70)
-
-print("\n DATASET OVERVIEW:")
-print(f"   Total Rows: {len(df):,}")
-print(f"   Total Columns: {len(df.columns)}")
-print(f"   Memory Usage: {df.memory_usage().sum() / 1024**2:.2f} MB")
-
-"""## 2. Missing Values Check"""
-
-print("\nMISSING VALUES CHECK:")
-missing = df.isnull().sum()
-if missing.sum() == 0:
-    print("\nNo missing values detected!")
-else:
-    print("\nMissing values found:")
-    print(missing[missing > 0])
-
-"""## 3. Duplicate Check"""
-
-duplicates = df.duplicated().sum()
-print(f"\nDUPLICATE ROWS: {duplicates:,}")
-if duplicates > 0:
-    print(f"   Removing {duplicates:,} duplicates...")
-    df = df.drop_duplicates()
-
-"""## 4. Target Distribution"""
-
-print("\nTARGET DISTRIBUTION (is_fraud):")
-fraud_counts = df['is_fraud'].value_counts()
-print(fraud_counts)
-print(f"\n   Not Fraud: {fraud_counts[0]:,} ({fraud_counts[0]/len(df)*100:.2f}%)")
-print(f"   Fraud:     {fraud_counts[1]:,} ({fraud_counts[1]/len(df)*100:.2f}%)")
-print(f"   Balance Ratio: {fraud_counts[0]/fraud_counts[1]:.2f}:1")
-
-"""## 5. Statistical Summary"""
-
-print("\nSTATISTICAL SUMMARY (Numerical Features):")
-print(df[['amt']].describe())
-
-"""# EDA VISUALIZATIONS
-
-## Target Distribution
-"""
-
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Setup Style
-sns.set_style('whitegrid')
-colors = ['#2ecc71', '#e74c3c']  # Hijau (Aman) & Merah (Fraud)
-
-# Persiapan Data Awal (agar cell bawah tidak error)
-fraud_counts = df['is_fraud'].value_counts()
-print("Setup Visualisasi Selesai. Lanjut ke cell berikutnya.")
-
-print("\n Generating EDA Visualizations...")
-
-plt.figure(figsize=(8, 6)) # Ukuran disesuaikan untuk single plot
-
-ax = fraud_counts.plot(kind='bar', color=colors, edgecolor='black')
-
-plt.title('Distribution: Fraud vs Not Fraud', fontsize=14, fontweight='bold')
-plt.xlabel('Transaction Type', fontsize=12)
-plt.ylabel('Count', fontsize=12)
-plt.xticks([0, 1], ['Not Fraud', 'Fraud'], rotation=0)
-
-# Menambahkan label angka di atas batang
-for i, v in enumerate(fraud_counts):
-    plt.text(i, v + 100, f'{v:,}', ha='center', fontsize=11, fontweight='bold')
-
-plt.tight_layout()
-plt.show()
-
-"""## Amount Distribution by Fraud"""
-
-plt.figure(figsize=(10, 6))
-
-sns.histplot(data=df, x='amt', hue='is_fraud', bins=50, kde=True, palette=colors)
-
-plt.title('Transaction Amount Distribution', fontsize=14, fontweight='bold')
-plt.xlabel('Amount ($)', fontsize=12)
-plt.ylabel('Frequency', fontsize=12)
-plt.xlim(0, 500) # Fokus ke transaksi di bawah $500 biar grafik terbaca
-
-plt.legend(title='Status', labels=['Fraud', 'Not Fraud'])
-plt.tight_layout()
-plt.show()
-
-"""## Boxplot - Amount by Fraud"""
-
-plt.figure(figsize=(8, 6))
+DATASET_DIR = '../data/dataset'
+CSV_PATH = '../data/credit_card_transactions2.csv'
+OUTPUT_DIR = os.path.join(os.getcwd(), '..', 'models')
+REPORT_PATH = os.path.join(os.getcwd(), '..', 'reports', 'eda_report.html')
+CACHE_DIR = os.path.join(OUTPUT_DIR, '.pipeline_cache')
+PROFILE_PATH = os.path.join(os.getcwd(), '..', 'reports', 'training_profile.jsonl')
+
+# Modul core yang diimport stage; source-nya ikut menentukan key cache
+CODE_MODULES = [
+    'core.dataset', 'core.dedup', 'core.sketches', 'core.timestamps', 'core.scoring', 'core.decision',
+    'core.evaluation', 'core.drift', 'core.early_exit', 'core.compaction', 'core.binning',
+]
+
+graph = StageGraph(CACHE_DIR, code_modules=CODE_MODULES)
+
+
+def _launch_eda_report(evaluation_path=None):
+    """
+    Jalankan generator report EDA sebagai proses background (prioritas rendah)
+
+    Args:
+        evaluation_path: Artefak evaluasi yang baru disimpan; menambah section
+            confusion matrix & feature importance ke report
+    """
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [repo_dir, os.environ.get('PYTHONPATH')])),
+           'MPLBACKEND': 'Agg'}
+    command = [sys.executable, '-m', 'core.eda_report', '--dataset', DATASET_DIR, '--csv', CSV_PATH,
+               '--out', REPORT_PATH, '--nice', '10']
+    if evaluation_path:
+        command += ['--evaluation', os.path.abspath(evaluation_path)]
+    # Proses anak mewarisi file descriptor log; handle di proses ini cukup ditutup setelah spawn
+    with open(REPORT_PATH.replace('.html', '.log'), 'w') as log_file:
+        process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, env=env)
+    return process.pid
+
+
+def _source_fingerprint():
+    """Content hash dataset ber-partisi, atau sha256 CSV jika dataset belum ada"""
+    from core.dataset import TransactionDataset
+
+    version = TransactionDataset(DATASET_DIR).current_version()
+    if version is not None:
+        return f"dataset:{version['content_hash']}"
+    digest = hashlib.sha256()
+    with open(CSV_PATH, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return f"csv:{digest.hexdigest()}"
+
+
+def _atomic_pickle(obj, path):
+    """Tulis pickle ke file sementara lalu os.replace (app yang hot reload tidak membaca file setengah jadi)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def _record_folds(name, cv_result, train_rows):
+    """Catat waktu fit/score tiap fold CV sebagai span `<name>.fold` (jika profiling aktif)"""
+    profiler = profiling.active()
+    if profiler is None:
+        return
+    for fold, (fit_time, score_time, score) in enumerate(
+            zip(cv_result['fit_time'], cv_result['score_time'], cv_result['test_score'])):
+        profiler.record({
+            'name': f"{name}.fold", 'parent': name, 'fold': fold, 'rows': train_rows,
+            'wall_ms': (fit_time + score_time) * 1000, 'fit_ms': fit_time * 1000,
+            'score_ms': score_time * 1000, 'score': float(score),
+        })
 
-sns.boxplot(data=df, x='is_fraud', y='amt', palette=colors)
 
-plt.title('Amount Distribution (Boxplot)', fontsize=14, fontweight='bold')
-plt.xlabel('Transaction Type', fontsize=12)
-plt.ylabel('Amount ($)', fontsize=12)
-plt.xticks([0, 1], ['Not Fraud', 'Fraud'])
-plt.ylim(0, 1000) # Zoom in ke range 0-1000 dollar
-
-plt.tight_layout()
-plt.show()
-
-"""## Top 10 Categories"""
-
-plt.figure(figsize=(10, 6))
-
-top_categories = df['category'].value_counts().head(10).sort_values(ascending=True)
-top_categories.plot(kind='barh', color='steelblue', edgecolor='black')
-
-plt.title('Top 10 Transaction Categories', fontsize=14, fontweight='bold')
-plt.xlabel('Count', fontsize=12)
-plt.ylabel('Category', fontsize=12)
-
-plt.tight_layout()
-plt.show()
-
-"""## Fraud Rate by Category"""
-
-plt.figure(figsize=(10, 6))
-
-# Menghitung rata-rata fraud per kategori
-fraud_by_category = df.groupby('category')['is_fraud'].mean().sort_values(ascending=True).tail(10)
-
-fraud_by_category.plot(kind='barh', color='coral', edgecolor='black')
-
-plt.title('Top 10 Categories with Highest Fraud Rate', fontsize=14, fontweight='bold')
-plt.xlabel('Fraud Rate (Probability)', fontsize=12)
-plt.ylabel('Category', fontsize=12)
-
-plt.tight_layout()
-plt.show()
-
-"""## Gender Distribution"""
-
-plt.figure(figsize=(8, 6))
-
-gender_fraud = df.groupby(['gender', 'is_fraud']).size().unstack()
-gender_fraud.plot(kind='bar', stacked=False, color=colors, figsize=(8,6), edgecolor='black')
-
-plt.title('Fraud Distribution by Gender', fontsize=14, fontweight='bold')
-plt.xlabel('Gender', fontsize=12)
-plt.ylabel('Count', fontsize=12)
-plt.xticks(rotation=0)
-plt.legend(['Not Fraud', 'Fraud'])
-
-plt.tight_layout()
-plt.show()
-
-"""## State Distribution (Top 10)"""
-
-plt.figure(figsize=(12, 6))
-
-top_states = df['state'].value_counts().head(10)
-top_states.plot(kind='bar', color='teal', edgecolor='black')
+"""# Load Dataset"""
 
-plt.title('Top 10 States by Transaction Count', fontsize=14, fontweight='bold')
-plt.xlabel('State', fontsize=12)
-plt.ylabel('Count', fontsize=12)
-plt.xticks(rotation=0)
+@graph.stage(fingerprint=_source_fingerprint)
+def load():
+    print("📂 Loading dataset...")
+
+    # Pakai dataset ber-partisi (python -m core.dataset ingest ...) jika sudah ada,
+    # jika belum baca CSV statis seperti biasa
+    from core.dataset import TransactionDataset
+
+    dataset = TransactionDataset(DATASET_DIR)
+    dataset_version = dataset.current_version()
+    with span('load.read', source='dataset' if dataset_version else 'csv') as s:
+        if dataset_version is not None:
+            df = dataset.load()
+            print(f"✓ Dataset loaded from '{DATASET_DIR}' (version {dataset_version['version']}, "
+                  f"hash {dataset_version['content_hash'][:12]})")
+        else:
+            # Pastikan file credit_card_transactions2.csv ada di folder yang sama
+            # Atau sesuaikan path-nya
+            df = pd.read_csv(CSV_PATH)
+            print(f"✓ Dataset loaded from '{CSV_PATH}'")
+        s.rows = len(df)
+
+    print(f"Total data: {len(df):,} rows")
+    print(f"Columns: {len(df.columns)} columns")
+
+    # Fingerprint per trans_num (fallback: hash kolom kunci) - lebih murah dari df.duplicated()
+    from core.dedup import deduplicate
+
+    with span('load.dedup', rows=len(df)):
+        df, dedup_stats = deduplicate(df)
+    return {'df': df, 'dataset_version': dataset_version, 'dedup_stats': dedup_stats}
+
+
+"""# EXPLORATORY DATA ANALYSIS (EDA)"""
+
+@graph.stage(deps=['load'])
+def eda(load):
+    df = load['df']
+    dedup_stats = load['dedup_stats']
+
+    print("\n" + "="*70)
+    print("EXPLORATORY DATA ANALYSIS (EDA)")
+    print("="*70)
+
+    """## 1. Dataset Overview"""
+    print("\n DATASET OVERVIEW:")
+    print(f"   Total Rows: {len(df):,}")
+    print(f"   Total Columns: {len(df.columns)}")
+    print(f"   Memory Usage: {df.memory_usage().sum() / 1024**2:.2f} MB")
+    print(f"\nDataset Info:")
+    df.info()
+
+    """## 2. Missing Values Check"""
+    print("\nMISSING VALUES CHECK:")
+    missing = df.isnull().sum()
+    if missing.sum() == 0:
+        print("\nNo missing values detected!")
+    else:
+        print("\nMissing values found:")
+        print(missing[missing > 0])
+
+    """## 3. Duplicate Check"""
+    duplicates = dedup_stats['duplicates_in_batch']
+    print(f"\nDUPLICATE ROWS: {duplicates:,}")
+    if duplicates > 0:
+        print(f"   Removed {duplicates:,} duplicates (fingerprint trans_num)")
+
+    """## 4. Target Distribution"""
+    print("\nTARGET DISTRIBUTION (is_fraud):")
+    fraud_counts = df['is_fraud'].value_counts()
+    print(fraud_counts)
+    print(f"\n   Not Fraud: {fraud_counts[0]:,} ({fraud_counts[0]/len(df)*100:.2f}%)")
+    print(f"   Fraud:     {fraud_counts[1]:,} ({fraud_counts[1]/len(df)*100:.2f}%)")
+    print(f"   Balance Ratio: {fraud_counts[0]/fraud_counts[1]:.2f}:1")
+
+    """## 5. Statistical Summary"""
+    print("\nSTATISTICAL SUMMARY (Numerical Features):")
+    print(df[['amt']].describe())
+    return {'fraud_counts': fraud_counts}
 
-plt.tight_layout()
-plt.show()
 
-"""## Amount Statistics"""
+"""# FEATURE ENGINEERING"""
 
-plt.figure(figsize=(10, 6))
+@graph.stage(deps=['load'])
+def features(load, current_year=datetime.now().year):
+    df = load['df']
 
-amount_stats = df.groupby('is_fraud')['amt'].agg(['mean', 'median', 'max'])
+    print("="*70)
+    print("🔧 FEATURE ENGINEERING")
+    print("="*70)
 
-# Pakai Log Scale biar 'max' yang besar tidak menutupi 'mean' yang kecil
-amount_stats.plot(kind='bar', color=['skyblue', 'orange', 'red'], figsize=(10,6), edgecolor='black')
+    from core.timestamps import (parse_date_days, parse_datetime_epoch, year_from_days,
+                                 hour_from_epoch, weekday_from_epoch)
 
-plt.title('Amount Statistics (Mean, Median, Max)', fontsize=14, fontweight='bold')
-plt.xlabel('Transaction Type', fontsize=12)
-plt.ylabel('Amount ($) - Log Scale', fontsize=12)
-plt.xticks([0, 1], ['Not Fraud', 'Fraud'], rotation=0)
-plt.yscale('log') # Menggunakan skala logaritmik agar visualisasi lebih jelas
-plt.legend(['Mean', 'Median', 'Max'])
+    # Parsing format tetap (tanpa inferensi format) menjadi epoch integer;
+    # fitur waktu diturunkan secara aritmetika dari epoch
+    with span('features.parse_timestamps', rows=len(df)):
+        dob_days = parse_date_days(df['dob'])
+        trans_epoch = parse_datetime_epoch(df['trans_date_trans_time'])
 
-plt.tight_layout()
-plt.show()
+    # Kolom baru ditulis ke frame baru, bukan ke output stage load (cache bersama)
+    df = df.copy()
 
-"""## Correlation Preview"""
+    # Hitung umur dari DOB
+    df['age'] = current_year - year_from_days(dob_days)
+    print(f"✓ Feature 'age' created (range: {df['age'].min()}-{df['age'].max()})")
 
-plt.figure(figsize=(10, 8))
+    # Extract jam dari trans_date_trans_time
+    df['hour'] = hour_from_epoch(trans_epoch)
+    print(f"✓ Feature 'hour' created (range: {df['hour'].min()}-{df['hour'].max()})")
 
-# Pilih kolom numerik saja untuk korelasi
-numeric_df = df.select_dtypes(include=['float64', 'int64'])
-corr_matrix = numeric_df.corr()
+    # Feature tambahan: deteksi pola weekend
+    df['is_weekend'] = (weekday_from_epoch(trans_epoch) >= 5).astype(int)
+    weekend_count = df['is_weekend'].sum()
+    print(f"✓ Feature 'is_weekend' created ({weekend_count:,} weekend transactions)")
 
-# Gambar Heatmap
-sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm', linewidths=0.5)
+    # Feature tambahan: amount per hour ratio
+    df['amt_per_hour_ratio'] = df['amt'] / (df['hour'] + 1)
+    print(f"✓ Feature 'amt_per_hour_ratio' created")
 
-plt.title('Correlation Matrix Heatmap', fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.show()
+    # Drop kolom yang tidak relevan
+    drop_cols = ['Unnamed: 0', 'cc_num', 'first', 'last', 'street', 'trans_num',
+                 'unix_time', 'trans_date_trans_time', 'dob', 'merchant', 'job',
+                 'zip', 'lat', 'long', 'merch_lat', 'merch_long', 'merch_zipcode',
+                 'city_pop', 'city']
 
-print("✅ EDA Visualizations Complete!\n")
+    df = df.drop(columns=drop_cols, errors='ignore')
+    print(f"\n Final features: {df.columns.tolist()}")
+    return df
 
-"""# FEATURE ENGINEERING"""
-
-print("="*70)
-print("🔧 FEATURE ENGINEERING")
-print("="*70)
-
-# Hitung umur dari DOB
-df['dob'] = pd.to_datetime(df['dob'])
-current_year = datetime.now().year
-df['age'] = current_year - df['dob'].dt.year
-print(f"✓ Feature 'age' created (range: {df['age'].min()}-{df['age'].max()})")
-
-# Extract jam dari trans_date_trans_time
-df['trans_date_trans_time'] = pd.to_datetime(df['trans_date_trans_time'])
-df['hour'] = df['trans_date_trans_time'].dt.hour
-print(f"✓ Feature 'hour' created (range: {df['hour'].min()}-{df['hour'].max()})")
-
-# Feature tambahan: deteksi pola weekend
-df['is_weekend'] = df['trans_date_trans_time'].dt.dayofweek.isin([5, 6]).astype(int)
-weekend_count = df['is_weekend'].sum()
-print(f"✓ Feature 'is_weekend' created ({weekend_count:,} weekend transactions)")
-
-# Feature tambahan: amount per hour ratio
-df['amt_per_hour_ratio'] = df['amt'] / (df['hour'] + 1)
-print(f"✓ Feature 'amt_per_hour_ratio' created")
-
-# Drop kolom yang tidak relevan
-drop_cols = ['Unnamed: 0', 'cc_num', 'first', 'last', 'street', 'trans_num',
-             'unix_time', 'trans_date_trans_time', 'dob', 'merchant', 'job',
-             'zip', 'lat', 'long', 'merch_lat', 'merch_long', 'merch_zipcode',
-             'city_pop', 'city']
-
-df = df.drop(columns=drop_cols, errors='ignore')
-print(f"\n Final features: {df.columns.tolist()}")
-
-"""## Feature Correlation Analysis"""
-
-print("\nAnalyzing Feature Correlations...")
-
-# Prepare numerical data for correlation
-temp_df = df.copy()
-categorical_cols = ['category', 'gender', 'state']
-
-# Temporary encoding for correlation
-for col in categorical_cols:
-    if col in temp_df.columns:
-        temp_df[col] = LabelEncoder().fit_transform(temp_df[col].astype(str))
-
-# Correlation matrix
-plt.figure(figsize=(12, 10)) # Increased figsize
-correlation = temp_df.corr()
-sns.heatmap(correlation, annot=True, fmt='.2f', cmap='coolwarm', center=0,
-            square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-plt.title('Feature Correlation Heatmap', fontsize=16, fontweight='bold', pad=20) # Increased font size
-plt.tight_layout()
-plt.show()
-
-# Feature correlation with target
-print("\n🎯 Top Correlations with 'is_fraud':")
-target_corr = correlation['is_fraud'].abs().sort_values(ascending=False)
-print(target_corr.head(10))
 
 """# Preprocessing"""
 
-print("\n" + "="*70)
-print("⚙️ DATA PREPROCESSING")
-print("="*70)
-
-# Pisahkan fitur dan target
-X = df.drop(columns=['is_fraud'])
-y = df['is_fraud']
-
-# Label Encoding untuk kolom kategorikal
-categorical_cols = ['category', 'gender', 'state']
-label_encoders = {}
-
-for col in categorical_cols:
-    if col in X.columns:
-        le = LabelEncoder()
-        X[col] = le.fit_transform(X[col].astype(str))
-        label_encoders[col] = le
-        print(f"✓ Encoded '{col}' → {len(le.classes_)} unique values")
-
-# Scaling untuk numerical features
-numerical_cols = ['amt', 'age', 'hour', 'is_weekend', 'amt_per_hour_ratio']
-scaler = StandardScaler()
-X[numerical_cols] = scaler.fit_transform(X[numerical_cols])
-print(f"\n✓ Scaled {len(numerical_cols)} numerical features")
+@graph.stage(deps=['features'])
+def preprocess(features):
+    print("\n" + "="*70)
+    print("⚙️ DATA PREPROCESSING")
+    print("="*70)
+
+    # Pisahkan fitur dan target
+    X = features.drop(columns=['is_fraud'])
+    y = features['is_fraud']
+
+    # Label Encoding untuk kolom kategorikal
+    categorical_cols = ['category', 'gender', 'state']
+    label_encoders = {}
+
+    with span('preprocess.encode', rows=len(X)):
+        for col in categorical_cols:
+            if col in X.columns:
+                le = LabelEncoder()
+                X[col] = le.fit_transform(X[col].astype(str))
+                label_encoders[col] = le
+                print(f"✓ Encoded '{col}' → {len(le.classes_)} unique values")
+
+    # Scaling untuk numerical features
+    numerical_cols = ['amt', 'age', 'hour', 'is_weekend', 'amt_per_hour_ratio']
+    scaler = StandardScaler()
+    with span('preprocess.scale', rows=len(X)):
+        X[numerical_cols] = scaler.fit_transform(X[numerical_cols])
+    print(f"\n✓ Scaled {len(numerical_cols)} numerical features")
+
+    print(f"\n✅ Total features for training: {X.shape[1]}")
+    print(f"✅ Feature names: {X.columns.tolist()}")
+    return {
+        'X': X,
+        'y': y,
+        'label_encoders': label_encoders,
+        'scaler': scaler,
+        'numerical_cols': numerical_cols,
+        'categorical_cols': categorical_cols,
+    }
 
-print(f"\n✅ Total features for training: {X.shape[1]}")
-print(f"✅ Feature names: {X.columns.tolist()}")
 
 """# Split Data"""
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
+@graph.stage(deps=['preprocess'])
+def split(preprocess, test_size=0.2, val_size=0.2, random_state=42):
+    X, y = preprocess['X'], preprocess['y']
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    # Validation split diambil dari data training: dipakai untuk tuning
+    # (threshold keputusan, seleksi pohon compaction) agar test set tetap
+    # hanya dipakai untuk melaporkan metrik
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train, y_train, test_size=val_size, random_state=random_state, stratify=y_train
+    )
+
+    print("\n📊 Data Split Summary:")
+    print(f"   Training Set:   {len(X_train):,} samples ({len(X_train)/len(X)*100:.1f}%)")
+    print(f"   Validation Set: {len(X_val):,} samples ({len(X_val)/len(X)*100:.1f}%)")
+    print(f"   Testing Set:    {len(X_test):,} samples ({len(X_test)/len(X)*100:.1f}%)")
+    print(f"   Train Fraud:    {y_train.sum():,} ({y_train.sum()/len(y_train)*100:.1f}%)")
+    print(f"   Val Fraud:      {y_val.sum():,} ({y_val.sum()/len(y_val)*100:.1f}%)")
+    print(f"   Test Fraud:     {y_test.sum():,} ({y_test.sum()/len(y_test)*100:.1f}%)")
+    return {'X_train': X_train, 'X_val': X_val, 'X_test': X_test,
+            'y_train': y_train, 'y_val': y_val, 'y_test': y_test}
+
+
+"""# Drift Reference"""
+
+@graph.stage(deps=['features', 'split'])
+def drift_reference(features, split):
+    from core.drift import reference_profile
+
+    # Profil distribusi fitur training (sebelum encoding) untuk monitor drift di app
+    profile = reference_profile(features.loc[split['X_train'].index])
+    summary = ', '.join(f"{name}: {len(spec['counts'])} bins" for name, spec in profile['features'].items())
+    print(f"\n✓ Drift reference profile ({profile['rows']:,} rows) → {summary}")
+    return profile
 
-print("\n📊 Data Split Summary:")
-print(f"   Training Set:   {len(X_train):,} samples ({len(X_train)/len(X)*100:.1f}%)")
-print(f"   Testing Set:    {len(X_test):,} samples ({len(X_test)/len(X)*100:.1f}%)")
-print(f"   Train Fraud:    {y_train.sum():,} ({y_train.sum()/len(y_train)*100:.1f}%)")
-print(f"   Test Fraud:     {y_test.sum():,} ({y_test.sum()/len(y_test)*100:.1f}%)")
 
 """# Training Model (Random Forest)"""
 
-# 1. Import library
-from sklearn.model_selection import cross_val_score
-from sklearn.ensemble import RandomForestClassifier
+@graph.stage(deps=['split'])
+def fit(split, n_estimators=200, max_depth=15, min_samples_split=5, min_samples_leaf=2,
+        random_state=42, cv_folds=5):
+    X_train, y_train = split['X_train'], split['y_train']
+
+    print("\n" + "="*70)
+    print("TRAINING & VALIDATION PROCESS")
+    print("="*70)
+
+    # 1. DEFINISIKAN MODEL DULU (Ini harus paling atas)
+    print("1. Menginisialisasi Model Random Forest...")
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,            # 200 decision trees
+        max_depth=max_depth,                  # Maximum depth of trees
+        min_samples_split=min_samples_split,  # Minimum samples to split
+        min_samples_leaf=min_samples_leaf,    # Minimum samples in leaf
+        random_state=random_state,            # Reproducibility
+        n_jobs=-1,                            # Use all CPU cores
+        verbose=0                             # Matikan verbose biar output CV gak berantakan
+    )
+
+    # 2. LAKUKAN CROSS-VALIDATION (Validasi Model)
+    print(f"2. Melakukan Cross-Validation ({cv_folds}-Fold)...")
+    # Note: Scoring bisa diganti 'f1' atau 'recall' karena kasus Fraud
+    # cross_validate = cross_val_score + waktu fit/score per fold (untuk profiling)
+    with span('fit.cv', rows=len(X_train), folds=cv_folds):
+        cv_result = cross_validate(model, X_train, y_train, cv=cv_folds, scoring='accuracy')
+    cv_scores = cv_result['test_score']
+    _record_folds('fit.cv', cv_result, len(X_train) * (cv_folds - 1) // cv_folds)
+
+    print(f"   ► Hasil per fold: {cv_scores}")
+    print(f"   ► Rata-rata Accuracy CV: {cv_scores.mean():.4f}")
+
+    if cv_scores.mean() > 0.90:
+        print("   ✅ Model Robust & Stabil (Konsisten Tinggi)")
+    else:
+        print("   ⚠️ Model kurang stabil, perlu tuning lagi.")
+
+    print("-" * 50)
+
+    # 3. TRAINING FINAL (Fit ke seluruh data training)
+    print("3. Final Training (Fitting model ke seluruh X_train)...")
+    with span('fit.final', rows=len(X_train)):
+        model.fit(X_train, y_train)
+
+    print("\n✅ Training Complete! Model siap digunakan.")
+    return {'model': model, 'cv_accuracy': cv_scores}
 
-print("\n" + "="*70)
-print("TRAINING & VALIDATION PROCESS")
-print("="*70)
 
-# 2. DEFINISIKAN MODEL DULU (Ini harus paling atas)
-print("1. Menginisialisasi Model Random Forest...")
-model = RandomForestClassifier(
-    n_estimators=200,        # 200 decision trees
-    max_depth=15,            # Maximum depth of trees
-    min_samples_split=5,     # Minimum samples to split
-    min_samples_leaf=2,      # Minimum samples in leaf
-    random_state=42,         # Reproducibility
-    n_jobs=-1,               # Use all CPU cores
-    verbose=0                # Matikan verbose biar output CV gak berantakan
-)
-
-# 3. LAKUKAN CROSS-VALIDATION (Validasi Model)
-print("2. Melakukan Cross-Validation (5-Fold)...")
-# Note: Scoring bisa diganti 'f1' atau 'recall' karena kasus Fraud
-cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='accuracy')
+"""# Model Evaluation"""
 
-print(f"   ► Hasil per fold: {cv_scores}")
-print(f"   ► Rata-rata Accuracy CV: {cv_scores.mean():.4f}")
+@graph.stage(deps=['fit', 'split', 'preprocess', 'features'])
+def evaluate(fit, split, preprocess, features, cv_folds=5, cost_matrix=None):
+    model = fit['model']
+    X, y = preprocess['X'], preprocess['y']
+    X_val, y_val = split['X_val'], split['y_val']
+    X_test, y_test = split['X_test'], split['y_test']
+    label_encoders = preprocess['label_encoders']
+
+    print("\n" + "="*70)
+    print("📈 MODEL EVALUATION")
+    print("="*70)
+
+    # Cross-validation setup
+    print("\n🔄 Performing Cross-Validation...")
+    kfold = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42)
+    with span('evaluate.cv', rows=len(X), folds=cv_folds):
+        cv_result = cross_validate(model, X, y, cv=kfold, scoring='recall', n_jobs=-1)
+    cv_scores = cv_result['test_score']
+    _record_folds('evaluate.cv', cv_result, len(X) * (cv_folds - 1) // cv_folds)
+    print(f"   Cross-validation Recall Scores: {cv_scores}")
+    print(f"   Mean CV Recall: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
+
+    # Satu kali predict_proba; keputusan diambil oleh decision layer
+    y_pred_proba = model.predict_proba(X_test)[:, 1]
+
+    """## Cost-based Decision Threshold"""
+    from core.decision import optimize_threshold, decide, expected_cost
+
+    # Threshold di-tuning pada validation split; test set hanya untuk pelaporan
+    # (override: --set 'evaluate.cost_matrix={"false_alarm_fixed": 10}')
+    print("\n💰 Optimizing decision threshold on validation split (cost matrix)...")
+    y_val_proba = model.predict_proba(X_val)[:, 1]
+    amounts_val = features.loc[X_val.index, 'amt']  # amount asli (belum di-scale)
+    amounts_test = features.loc[X_test.index, 'amt']
+    decision = optimize_threshold(y_val, y_val_proba, amounts_val, cost_matrix)
+    decision_threshold = decision['threshold']
+    decision['holdout_cost'] = expected_cost(y_test, y_pred_proba, amounts_test, decision_threshold,
+                                             decision['cost_matrix'])
+    decision['holdout_default_threshold_cost'] = expected_cost(y_test, y_pred_proba, amounts_test, 0.5,
+                                                               decision['cost_matrix'])
+    print(f"   Cost matrix      : {decision['cost_matrix']}")
+    print(f"   Optimal threshold: {decision_threshold:.4f}")
+    print(f"   Validation cost  : ${decision['expected_cost']:,.2f} (threshold 0.5: ${decision['default_threshold_cost']:,.2f})")
+    print(f"   Holdout cost     : ${decision['holdout_cost']:,.2f} (threshold 0.5: ${decision['holdout_default_threshold_cost']:,.2f})")
+
+    y_pred = decide(y_pred_proba, decision_threshold)
+
+    accuracy = accuracy_score(y_test, y_pred)
+    precision = precision_score(y_test, y_pred)
+    recall = recall_score(y_test, y_pred)
+    f1 = f1_score(y_test, y_pred)
+    roc_auc = roc_auc_score(y_test, y_pred_proba)
+
+    print("\n🎯 PERFORMANCE METRICS:")
+    print("-" * 70)
+    print(f"Accuracy  : {accuracy:.4f} ({accuracy*100:.2f}%)")
+    print(f"Precision : {precision:.4f} ({precision*100:.2f}%) - Dari prediksi fraud, berapa yang benar")
+    print(f"Recall    : {recall:.4f} ({recall*100:.2f}%) - Dari fraud asli, berapa yang terdeteksi")
+    print(f"F1-Score  : {f1:.4f} - Harmonic mean of Precision & Recall")
+    print(f"ROC-AUC   : {roc_auc:.4f} - Area Under ROC Curve")
+    print("-" * 70)
+
+    # Confusion Matrix
+    cm = confusion_matrix(y_test, y_pred)
+    print("\n🔍 CONFUSION MATRIX:")
+    print("-" * 70)
+    print(f"True Negative  (TN): {cm[0][0]:,} → Correctly predicted SAFE")
+    print(f"False Positive (FP): {cm[0][1]:,} → False alarm (predicted FRAUD, actually SAFE)")
+    print(f"False Negative (FN): {cm[1][0]:,} → MISSED FRAUD (predicted SAFE, actually FRAUD) ⚠️")
+    print(f"True Positive  (TP): {cm[1][1]:,} → Correctly predicted FRAUD")
+    print("-" * 70)
+
+    """# Feature Importance Analysis"""
+    print("\n📊 FEATURE IMPORTANCE ANALYSIS")
+    print("-" * 70)
+
+    feature_importance = pd.DataFrame({
+        'feature': X.columns,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+    print("\nTop 10 Most Important Features:")
+    print(feature_importance.head(10).to_string(index=False))
+
+    """# Evaluation Artifacts"""
+    from core.evaluation import build_evaluation_artifacts
+
+    print("\n📦 Building evaluation artifacts (ROC/PR, confusion matrices, per-segment metrics)...")
+
+    evaluation_artifacts = build_evaluation_artifacts(
+        y_test,
+        y_pred_proba,
+        segments={
+            'category': label_encoders['category'].inverse_transform(X_test['category']),
+            'state': label_encoders['state'].inverse_transform(X_test['state']),
+        },
+        feature_importance=feature_importance.reset_index(drop=True),
+        decision_threshold=decision_threshold
+    )
+    print(f"✓ ROC points: {len(evaluation_artifacts['roc_curve'])} | PR points: {len(evaluation_artifacts['pr_curve'])}")
+    print(f"✓ Confusion matrices at thresholds: {list(evaluation_artifacts['confusion_matrices'])}")
+
+    return {
+        'cv_recall': cv_scores,
+        'decision': decision,
+        'performance': {
+            'accuracy': accuracy,
+            'precision': precision,
+            'recall': recall,
+            'f1_score': f1,
+            'roc_auc': roc_auc
+        },
+        'feature_importance': feature_importance,
+        'evaluation_artifacts': evaluation_artifacts,
+    }
 
-if cv_scores.mean() > 0.90:
-    print("   ✅ Model Robust & Stabil (Konsisten Tinggi)")
-else:
-    print("   ⚠️ Model kurang stabil, perlu tuning lagi.")
 
-print("-" * 50)
+"""# Model Compaction (Serving Model)"""
+
+@graph.stage(deps=['fit', 'split', 'evaluate'])
+def compaction(fit, split, evaluate):
+    from core.compaction import compact_forest, compaction_report
+
+    model = fit['model']
+    X_val, y_val = split['X_val'], split['y_val']
+    X_test, y_test = split['X_test'], split['y_test']
+    decision_threshold = evaluate['decision']['threshold']
+
+    print("\n" + "="*70)
+    print(" MODEL COMPACTION")
+    print("="*70)
+
+    # Pohon dipilih di validation split; test set hanya untuk laporan
+    compact_model, compaction_info = compact_forest(model, X_val, y_val, threshold=decision_threshold)
+    report = compaction_report(model, compact_model, X_test, y_test, threshold=decision_threshold)
+
+    print(f"Trees : {compaction_info['n_trees_original']} → {compaction_info['n_trees_compact']}")
+    print(f"Nodes : {compaction_info['nodes_original']:,} → {compaction_info['nodes_compact']:,} "
+          f"({compaction_info['pruned_splits']:,} splits pruned"
+          f"{', pruning dibatalkan' if compaction_info['pruning_reverted'] else ''})")
+    validation = compaction_info['validation']
+    print(f"Validation: ROC-AUC {validation['roc_auc']:.4f} | Recall {validation['recall']:.4f} "
+          f"({'dalam' if compaction_info['within_tolerance'] else 'DI LUAR'} toleransi)")
+    for name in ('original', 'compact'):
+        stats = report[name]
+        print(f"{name.title():9}: {stats['size_mb']:.2f} MB | batch {stats['batch_latency_ms']:.1f} ms | "
+              f"single {stats['single_latency_ms']:.2f} ms | ROC-AUC {stats['roc_auc']:.4f} | Recall {stats['recall']:.4f}")
+    print(f"Size ratio: {report['size_ratio']:.1f}x | Batch speedup: {report['batch_speedup']:.1f}x | "
+          f"Single speedup: {report['single_speedup']:.1f}x")
+    if not report['within_tolerance']:
+        print("⚠️ Metrik holdout model compact di luar toleransi forest asli; jangan dipakai untuk serving.")
+    return {'model': compact_model, 'info': compaction_info, 'report': report}
+
+
+"""# Early-Exit Inference Check"""
+
+@graph.stage(deps=['fit', 'compaction', 'split', 'evaluate'])
+def early_exit_check(fit, compaction, split, evaluate, chunk_size=10, delta=1e-4, max_tightening=3):
+    from core.early_exit import verify_early_exit
+
+    # delta diperketat (x0.01) di validation split sampai tidak ada keputusan
+    # yang berubah; setting tersebut lalu harus lolos holdout apa adanya
+    print("\n⚡ Early-exit inference (chunked trees + Hoeffding bound)...")
+    threshold = evaluate['decision']['threshold']
+    checks = {}
+    for name, model in (('original', fit['model']), ('compact', compaction['model'])):
+        current = delta
+        for attempt in range(max_tightening + 1):
+            tuning = verify_early_exit(model, split['X_val'], threshold, chunk_size, current)
+            if tuning['mismatches'] == 0 or attempt == max_tightening:
+                break
+            current /= 100
+        check = verify_early_exit(model, split['X_test'], threshold, chunk_size, current)
+        print(f"   {name:<8}: delta {current:.0e} | trees used {check['mean_trees_used']:.1f} / {check['n_trees']} | "
+              f"decision changes val {tuning['mismatches']:,} / holdout {check['mismatches']:,} | "
+              f"speedup {check['speedup']:.1f}x")
+        if tuning['mismatches'] or check['mismatches']:
+            raise AssertionError(f"Early exit ({name}) mengubah keputusan pada delta {current:.0e}")
+        checks[name] = {**check, 'chunk_size': chunk_size, 'delta': current}
+    return checks
+
+
+"""# Quantized Binning Check"""
+
+@graph.stage(deps=['fit', 'compaction', 'split', 'evaluate'])
+def binning_check(fit, compaction, split, evaluate):
+    from core.binning import build_binned_forest, verify_binned
+
+    print("\n🔢 Quantized binning (integer-only traversal) vs model asli...")
+    checks = {}
+    for name, source_model in (('original', fit['model']), ('compact', compaction['model'])):
+        check = verify_binned(source_model, build_binned_forest(source_model), split['X_test'],
+                              threshold=evaluate['decision']['threshold'])
+        print(f"   {name:<8}: dtype {check['dtype']} ({check['max_bins']:,} bins max) | "
+              f"leaf mismatches {check['leaf_mismatches']} | "
+              f"decision mismatches {check['decision_mismatches']} | "
+              f"max |Δp| {check['max_abs_diff']:.1e} | "
+              f"matrix {check['matrix_bytes_float64'] / check['matrix_bytes_binned']:.0f}x lebih kecil")
+        if check['leaf_mismatches'] or check['decision_mismatches']:
+            raise AssertionError(f"Binned forest ({name}) tidak identik dengan model asli")
+        checks[name] = check
+    return checks
 
-# 4. TRAINING FINAL (Fit ke seluruh data training)
-print("3. Final Training (Fitting model ke seluruh X_train)...")
-model.fit(X_train, y_train)
 
-print("\n✅ Training Complete! Model siap digunakan.")
+"""# Save Model"""
 
-"""# Model Evaluation"""
+@graph.stage(deps=['load', 'preprocess', 'fit', 'evaluate', 'compaction', 'early_exit_check', 'drift_reference'],
+             cache=False)
+def save(load, preprocess, fit, evaluate, compaction, early_exit_check, drift_reference):
+    from core.evaluation import save_evaluation_artifacts
+
+    print("\n" + "="*70)
+    print(" SAVING MODEL & PREPROCESSORS")
+    print("="*70)
+
+    model_artifacts = {
+        'model': fit['model'],
+        'scaler': preprocess['scaler'],
+        'label_encoders': preprocess['label_encoders'],
+        'feature_columns': preprocess['X'].columns.tolist(),
+        'numerical_cols': preprocess['numerical_cols'],
+        'categorical_cols': preprocess['categorical_cols'],
+        'decision': evaluate['decision'],
+        'dataset': load['dataset_version'],
+        'performance': evaluate['performance'],
+        'drift_reference': drift_reference,
+        # Setting early exit yang lolos verifikasi (default untuk batch/stream scoring)
+        'early_exit': {key: early_exit_check['original'][key] for key in ('chunk_size', 'delta')}
+    }
 
-print("\n" + "="*70)
-print("📈 MODEL EVALUATION")
-print("="*70)
-
-# Cross-validation setup
-print("\n🔄 Performing Cross-Validation...")
-kfold = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-cv_scores = cross_val_score(model, X, y, cv=kfold, scoring='recall', n_jobs=-1)
-print(f"   Cross-validation Recall Scores: {cv_scores}")
-print(f"   Mean CV Recall: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
-
-y_pred = model.predict(X_test)
-y_pred_proba = model.predict_proba(X_test)[:, 1]
-
-accuracy = accuracy_score(y_test, y_pred)
-precision = precision_score(y_test, y_pred)
-recall = recall_score(y_test, y_pred)
-f1 = f1_score(y_test, y_pred)
-roc_auc = roc_auc_score(y_test, y_pred_proba)
-
-print("\n🎯 PERFORMANCE METRICS:")
-print("-" * 70)
-print(f"Accuracy  : {accuracy:.4f} ({accuracy*100:.2f}%)")
-print(f"Precision : {precision:.4f} ({precision*100:.2f}%) - Dari prediksi fraud, berapa yang benar")
-print(f"Recall    : {recall:.4f} ({recall*100:.2f}%) - Dari fraud asli, berapa yang terdeteksi")
-print(f"F1-Score  : {f1:.4f} - Harmonic mean of Precision & Recall")
-print(f"ROC-AUC   : {roc_auc:.4f} - Area Under ROC Curve")
-print("-" * 70)
-
-# Confusion Matrix
-cm = confusion_matrix(y_test, y_pred)
-print("\n🔍 CONFUSION MATRIX:")
-print("-" * 70)
-print(f"True Negative  (TN): {cm[0][0]:,} → Correctly predicted SAFE")
-print(f"False Positive (FP): {cm[0][1]:,} → False alarm (predicted FRAUD, actually SAFE)")
-print(f"False Negative (FN): {cm[1][0]:,} → MISSED FRAUD (predicted SAFE, actually FRAUD) ⚠️")
-print(f"True Positive  (TP): {cm[1][1]:,} → Correctly predicted FRAUD")
-print("-" * 70)
-
-# Visualize Confusion Matrix
-plt.figure(figsize=(10, 8))
-sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-            xticklabels=['Not Fraud', 'Fraud'],
-            yticklabels=['Not Fraud', 'Fraud'],
-            cbar_kws={'label': 'Count'})
-plt.ylabel('Actual Label', fontsize=14, fontweight='bold')
-plt.xlabel('Predicted Label', fontsize=14, fontweight='bold')
-plt.title('Confusion Matrix - Random Forest', fontsize=16, fontweight='bold', pad=20)
-plt.tight_layout()
-plt.show()
-
-"""# Feature Importance Analysis"""
-
-print("\n📊 FEATURE IMPORTANCE ANALYSIS")
-print("-" * 70)
-
-feature_importance = pd.DataFrame({
-    'feature': X.columns,
-    'importance': model.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print("\nTop 10 Most Important Features:")
-print(feature_importance.head(10).to_string(index=False))
-
-# Visualize Feature Importance
-plt.figure(figsize=(12, 8)) # Increased figsize
-top_features = feature_importance.head(10)
-plt.barh(range(len(top_features)), top_features['importance'], color='steelblue')
-plt.yticks(range(len(top_features)), top_features['feature'], fontsize=12) # Increased font size
-plt.xlabel('Importance Score', fontsize=14, fontweight='bold') # Increased font size
-plt.title('Top 10 Feature Importance - Random Forest', fontsize=16, fontweight='bold', pad=20) # Increased font size
-plt.gca().invert_yaxis()
-plt.tight_layout()
-plt.show()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-"""# Save Model"""
+    model_path = os.path.join(OUTPUT_DIR, 'fraud_detection_model.pkl')
 
-print("\n" + "="*70)
-print(" SAVING MODEL & PREPROCESSORS")
-print("="*70)
-
-model_artifacts = {
-    'model': model,
-    'scaler': scaler,
-    'label_encoders': label_encoders,
-    'feature_columns': X.columns.tolist(),
-    'numerical_cols': numerical_cols,
-    'categorical_cols': categorical_cols,
-    'performance': {
-        'accuracy': accuracy,
-        'precision': precision,
-        'recall': recall,
-        'f1_score': f1,
-        'roc_auc': roc_auc
-    }
-}
+    # Artefak evaluasi ditulis lebih dulu: file model adalah sinyal versi baru
+    # bagi app yang sedang berjalan (core.model_registry)
+    evaluation_path = save_evaluation_artifacts(
+        evaluate['evaluation_artifacts'], os.path.join(OUTPUT_DIR, 'evaluation_artifacts.pkl')
+    )
+    print(f"Evaluation artifacts saved to: {os.path.abspath(evaluation_path)}")
 
-import os
+    # Simpan model (atomik)
+    with span('save.model'):
+        _atomic_pickle(model_artifacts, model_path)
 
-output_dir = os.path.join(os.getcwd(), '..', 'models')
-os.makedirs(output_dir, exist_ok=True)
+    print(f"Model successfully saved to: {os.path.abspath(model_path)}")
 
-model_path = os.path.join(output_dir, 'fraud_detection_model.pkl')
+    # Cek ukuran file
+    if os.path.exists(model_path):
+        file_size = os.path.getsize(model_path) / 1024**2
+        print(f"File size: {file_size:.2f} MB")
 
-# 4. Simpan model
-with open(model_path, 'wb') as f:
-    pickle.dump(model_artifacts, f)
+    compact_path = os.path.join(OUTPUT_DIR, 'fraud_detection_model_compact.pkl')
+    with span('save.compact'):
+        _atomic_pickle({
+            **model_artifacts,
+            'model': compaction['model'],
+            'compaction': compaction['info'],
+            'early_exit': {key: early_exit_check['compact'][key] for key in ('chunk_size', 'delta')},
+        }, compact_path)
+    print(f"Compact model saved to: {os.path.abspath(compact_path)}")
+    print("   Serving: FRAUD_MODEL_PATH=models/fraud_detection_model_compact.pkl streamlit run app.py")
+    return {'model_path': model_path, 'compact_path': compact_path, 'evaluation_path': evaluation_path}
 
-print(f"Model successfully saved to: {os.path.abspath(model_path)}")
 
-# 5. Cek ukuran file
-if os.path.exists(model_path):
-    file_size = os.path.getsize(model_path) / 1024**2
-    print(f"File size: {file_size:.2f} MB")
+@graph.stage(deps=['eda', 'save'], cache=False)
+def eda_report(eda, save, background_report=True):
+    # Side effect (proses background) di stage tanpa cache agar tetap jalan saat `eda` di-load dari cache;
+    # dijalankan setelah save supaya report memakai artefak evaluasi model yang baru
+    report_pid = _launch_eda_report(save['evaluation_path']) if background_report else None
+    if report_pid:
+        print(f"\n📄 EDA report dirender di background (pid {report_pid}) → {os.path.abspath(REPORT_PATH)}")
+    return {'report_path': REPORT_PATH, 'pid': report_pid}
 
-print("\n" + "="*70)
-print(" TRAINING PIPELINE COMPLETE!")
-print("="*70)
-print("\n NEXT STEPS:")
-print(f"1.  File '{model_path}' sudah tersimpan")
-print("2.  Jalankan: streamlit run app.py")
-print("3.  Test the fraud detection system!")
-print("="*70)
 
 """# Test Prediction (Manual)"""
 
-print("\n" + "="*70)
-print(" MANUAL PREDICTION TEST")
-print("="*70)
-
-# Test Case 1: Suspicious Transaction
-print("\n TEST CASE 1: Suspicious Transaction")
-print("-" * 70)
-
-test_input_1 = pd.DataFrame({
-    'category': [label_encoders['category'].transform(['gas_transport'])[0]],
-    'amt': [1500.0],
-    'gender': [label_encoders['gender'].transform(['M'])[0]],
-    'state': [label_encoders['state'].transform(['TX'])[0]],
-    'age': [25],
-    'hour': [3],
-    'is_weekend': [1],
-    'amt_per_hour_ratio': [1500.0 / 4]
-})
-
-test_input_1 = test_input_1[X.columns]
-test_input_1[numerical_cols] = scaler.transform(test_input_1[numerical_cols])
-
-pred_1 = model.predict(test_input_1)[0]
-prob_1 = model.predict_proba(test_input_1)[0]
-
-print(f"Input: $1,500 transaction at 3 AM on weekend (Gas/Transport)")
-print(f"Result: {'FRAUD' if pred_1 == 1 else 'SAFE'}")
-print(f"Confidence: {prob_1[pred_1]*100:.2f}%")
-print(f"Probability → Safe: {prob_1[0]*100:.1f}% | Fraud: {prob_1[1]*100:.1f}%")
-
-# Test Case 2: Normal Transaction
-print("\nTEST CASE 2: Normal Transaction")
-print("-" * 70)
-
-test_input_2 = pd.DataFrame({
-    'category': [label_encoders['category'].transform(['grocery_pos'])[0]],
-    'amt': [50.0],
-    'gender': [label_encoders['gender'].transform(['F'])[0]],
-    'state': [label_encoders['state'].transform(['CA'])[0]],
-    'age': [35],
-    'hour': [14],
-    'is_weekend': [0],
-    'amt_per_hour_ratio': [50.0 / 15]
-})
-
-test_input_2 = test_input_2[X.columns]
-test_input_2[numerical_cols] = scaler.transform(test_input_2[numerical_cols])
-
-pred_2 = model.predict(test_input_2)[0]
-prob_2 = model.predict_proba(test_input_2)[0]
-
-print(f"Input: $50 transaction at 2 PM on weekday (Grocery)")
-print(f"Result: {'FRAUD' if pred_2 == 1 else 'SAFE'}")
-print(f"Confidence: {prob_2[pred_2]*100:.2f}%")
-print(f"Probability → Safe: {prob_2[0]*100:.1f}% | Fraud: {prob_2[1]*100:.1f}%")
-
-print("\nManual testing complete!")
-print("="*70)
\ No newline at end of file
+@graph.stage(deps=['preprocess', 'fit', 'evaluate'], cache=False)
+def manual_test(preprocess, fit, evaluate):
+    from core.decision import predict_with_threshold
+
+    model = fit['model']
+    label_encoders = preprocess['label_encoders']
+    scaler = preprocess['scaler']
+    numerical_cols = preprocess['numerical_cols']
+    feature_columns = preprocess['X'].columns
+    decision_threshold = evaluate['decision']['threshold']
+
+    print("\n" + "="*70)
+    print(" MANUAL PREDICTION TEST")
+    print("="*70)
+
+    # Test Case 1: Suspicious Transaction
+    print("\n TEST CASE 1: Suspicious Transaction")
+    print("-" * 70)
+
+    test_input_1 = pd.DataFrame({
+        'category': [label_encoders['category'].transform(['gas_transport'])[0]],
+        'amt': [1500.0],
+        'gender': [label_encoders['gender'].transform(['M'])[0]],
+        'state': [label_encoders['state'].transform(['TX'])[0]],
+        'age': [25],
+        'hour': [3],
+        'is_weekend': [1],
+        'amt_per_hour_ratio': [1500.0 / 4]
+    })
+
+    test_input_1 = test_input_1[feature_columns]
+    test_input_1[numerical_cols] = scaler.transform(test_input_1[numerical_cols])
+
+    pred_1, prob_1 = predict_with_threshold(model, test_input_1, decision_threshold)
+    pred_1, prob_1 = pred_1[0], prob_1[0]
+
+    print(f"Input: $1,500 transaction at 3 AM on weekend (Gas/Transport)")
+    print(f"Result: {'FRAUD' if pred_1 == 1 else 'SAFE'}")
+    print(f"Decision threshold: {decision_threshold*100:.1f}% (fraud jika probabilitas fraud ≥ threshold)")
+    print(f"Probability → Safe: {prob_1[0]*100:.1f}% | Fraud: {prob_1[1]*100:.1f}%")
+
+    # Test Case 2: Normal Transaction
+    print("\nTEST CASE 2: Normal Transaction")
+    print("-" * 70)
+
+    test_input_2 = pd.DataFrame({
+        'category': [label_encoders['category'].transform(['grocery_pos'])[0]],
+        'amt': [50.0],
+        'gender': [label_encoders['gender'].transform(['F'])[0]],
+        'state': [label_encoders['state'].transform(['CA'])[0]],
+        'age': [35],
+        'hour': [14],
+        'is_weekend': [0],
+        'amt_per_hour_ratio': [50.0 / 15]
+    })
+
+    test_input_2 = test_input_2[feature_columns]
+    test_input_2[numerical_cols] = scaler.transform(test_input_2[numerical_cols])
+
+    pred_2, prob_2 = predict_with_threshold(model, test_input_2, decision_threshold)
+    pred_2, prob_2 = pred_2[0], prob_2[0]
+
+    print(f"Input: $50 transaction at 2 PM on weekday (Grocery)")
+    print(f"Result: {'FRAUD' if pred_2 == 1 else 'SAFE'}")
+    print(f"Decision threshold: {decision_threshold*100:.1f}% (fraud jika probabilitas fraud ≥ threshold)")
+    print(f"Probability → Safe: {prob_2[0]*100:.1f}% | Fraud: {prob_2[1]*100:.1f}%")
+
+    print("\nManual testing complete!")
+    print("="*70)
+    return {'suspicious': prob_1, 'normal': prob_2}
+
+
+"""# Run Pipeline"""
+
+def _parse_overrides(items):
+    """'stage.param=value' -> {stage: {param: value}} (value di-parse sebagai JSON jika bisa)"""
+    params = {}
+    for item in items or []:
+        target, _, raw = item.partition('=')
+        stage, _, param = target.partition('.')
+        if not raw or not param:
+            raise ValueError(f"Format override harus stage.param=value: {item}")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        params.setdefault(stage, {})[param] = value
+    return params
+
+
+def _print_profile(profiler, path):
+    """Ringkasan span (wall/CPU/peak memori) setelah pipeline selesai"""
+    summary = profiler.summary()
+    if summary.empty:
+        return
+    print("\n⏱️  PROFILE (span teratas berdasarkan wall time):")
+    columns = [col for col in ('name', 'wall_ms', 'cpu_ms', 'peak_mb', 'rows') if col in summary.columns]
+    top = summary[summary['name'].str.startswith('stage.')].sort_values('wall_ms', ascending=False)
+    print(top[columns].head(12).to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+    print(f"   {len(summary)} span → {os.path.abspath(path)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training model fraud detection (stage graph ber-cache)")
+    parser.add_argument('--stages', nargs='+', help=f"Stage yang dijalankan (default semua): {', '.join(graph.stages)}")
+    parser.add_argument('--force', nargs='+', default=[], help="Jalankan ulang stage ini + turunannya walau ada di cache")
+    parser.add_argument('--set', dest='overrides', action='append', help="Override parameter, mis. fit.n_estimators=300")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Jumlah stage yang boleh berjalan bersamaan (>1: output stage bisa bercampur)")
+    parser.add_argument('--plan', action='store_true', help="Tampilkan rencana (run / cached) tanpa menjalankan")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, metavar='PATH',
+                        help="Tulis span timing (wall/CPU/peak memori/baris) sebagai JSON lines")
+    args = parser.parse_args()
+
+    params = _parse_overrides(args.overrides)
+    graph.max_workers = args.jobs
+
+    actions, _ = graph.plan(args.stages, args.force, params)
+    print("\n🗺️  Pipeline plan:")
+    for name, action in actions.items():
+        print(f"   {name:<20} {'run' if action == 'run' else 'cached'}")
+    if args.plan:
+        return
+
+    profiler = sink = None
+    if args.profile:
+        if os.path.exists(args.profile):
+            os.remove(args.profile)
+        sink = profiling.json_sink(args.profile)
+        profiler = profiling.enable(track_memory=True, sink=sink)
+
+    try:
+        outputs, report = graph.run(args.stages, args.force, params)
+    finally:
+        if sink is not None:
+            profiling.disable()
+            sink.close()
+    executed = sum(1 for item in report if item['action'] == 'run')
+
+    print("\n" + "="*70)
+    print(" TRAINING PIPELINE COMPLETE!")
+    print("="*70)
+    print(f"Stages: {executed} run | {len(report) - executed} from cache ({os.path.abspath(CACHE_DIR)})")
+    if 'save' in outputs:
+        print("\n NEXT STEPS:")
+        print(f"1.  File '{outputs['save']['model_path']}' sudah tersimpan")
+        print("2.  Jalankan: streamlit run app.py")
+        print("3.  Test the fraud detection system!")
+    if profiler is not None:
+        _print_profile(profiler, args.profile)
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,45 +1,192 @@
 """
 Data Insights Tab - Visualisasi eksplorasi data historis dengan EDA lengkap
 """
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
 
+from core.metrics import DASHBOARD_RENDERS, observe_step
+from core.profiling import sections
+from core.analytics import (
+    AGE_BINS, AGE_LABELS, DUCKDB_AVAILABLE, PandasAggregator, SqlAggregator, build_dashboard_frame,
+    memory_footprint
+)
+from core.dataset import FILTER_COLUMNS, frame_filter_options
+from core.timestamps import DOB_DAYS_COLUMN, TRANS_EPOCH_COLUMN
+
+
+# Kolom yang benar-benar dipakai dashboard (projection pushdown)
+DASHBOARD_COLUMNS = ['trans_date_trans_time', 'category', 'amt', 'gender', 'state', 'dob', 'is_fraud']
+# Sama, tetapi waktu diambil dari kolom epoch yang sudah di-parse di data service
+CACHED_DASHBOARD_COLUMNS = [TRANS_EPOCH_COLUMN, 'category', 'amt', 'gender', 'state', DOB_DAYS_COLUMN, 'is_fraud']
+# Backend SQL: chart distribusi (box plot, histogram, korelasi) memakai sampel ini
+SQL_SAMPLE_ROWS = 50_000
+
+# Satu thread background untuk menghitung nilai exact (full scan) tanpa memblokir UI
+_EXACT_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def render_filters(options):
+    """
+    Widget filter dashboard (rentang tanggal, state, kategori, fraud saja)
+
+    Args:
+        options: Dict min_date, max_date, states, categories (lihat `core.dataset.frame_filter_options`)
+
+    Returns:
+        Dict filter untuk diteruskan ke load_data_func
+    """
+    min_date = pd.Timestamp(options['min_date']).date()
+    max_date = pd.Timestamp(options['max_date']).date()
+
+    with st.expander("Filter Data", expanded=False):
+        f_col1, f_col2, f_col3, f_col4 = st.columns([2, 2, 2, 1])
+        with f_col1:
+            date_range = st.date_input(
+                "Rentang Tanggal",
+                value=(min_date, max_date),
+                min_value=min_date,
+                max_value=max_date,
+                key="dash_dates"
+            )
+        with f_col2:
+            states = st.multiselect("State", options['states'], key="dash_states")
+        with f_col3:
+            categories = st.multiselect("Kategori", options['categories'], key="dash_categories")
+        with f_col4:
+            fraud_only = st.checkbox("Fraud saja", key="dash_fraud_only")
+
+    # date_input mengembalikan 1 tanggal selama user baru memilih awal rentang
+    if not isinstance(date_range, (tuple, list)):
+        date_range = (date_range,)
+    start = date_range[0] if len(date_range) > 0 else min_date
+    end = date_range[1] if len(date_range) > 1 else max_date
+
+    return {
+        'start': start.isoformat() if start > min_date else None,
+        'end': end.isoformat() if end < max_date else None,
+        'states': states or None,
+        'categories': categories or None,
+        'fraud_only': fraud_only,
+    }
+
+
+def render_quick_summary(sketch_func):
+    """
+    Ringkasan seluruh dataset dari sketch (instan), dengan opsi hitung exact di background
+
+    Args:
+        sketch_func: Function(exact=False) -> dict ringkasan (lihat core.sketches)
 
-def render(load_data_func):
+    Returns:
+        Tuple (summary dict, is_exact)
+    """
+    st.markdown("#### Ringkasan Cepat (Seluruh Dataset)")
+    summary = sketch_func()
+    is_exact = False
+
+    exact_mode = st.toggle("Hitung nilai exact di background", key="dash_exact")
+    if exact_mode:
+        future = st.session_state.get('dash_exact_future')
+        if future is None:
+            future = _EXACT_EXECUTOR.submit(sketch_func, exact=True)
+            st.session_state['dash_exact_future'] = future
+        if future.done():
+            summary, is_exact = future.result(), True
+        else:
+            st.caption("⏳ Nilai exact sedang dihitung; sementara menampilkan aproksimasi sketch.")
+            st.button("Perbarui", key="dash_exact_refresh")
+    else:
+        st.session_state.pop('dash_exact_future', None)
+
+    prefix = "" if is_exact else "≈ "
+    q_col1, q_col2, q_col3, q_col4 = st.columns(4)
+    with q_col1:
+        st.metric("Kartu Unik", f"{prefix}{summary['distinct_cards']:,}")
+    with q_col2:
+        st.metric("Merchant Unik", f"{prefix}{summary['distinct_merchants']:,}")
+    with q_col3:
+        st.metric("Median Amount", f"{prefix}${summary['amt']['median']:,.2f}")
+    with q_col4:
+        st.metric("Median Usia", f"{prefix}{summary['age']['median']:.0f} tahun")
+
+    with st.expander("Top Merchant berdasarkan Jumlah Fraud"):
+        top = summary['top_merchant_fraud'].copy()
+        top['merchant'] = top['merchant'].str.replace('fraud_', '', regex=False)
+        st.dataframe(top, width='stretch', hide_index=True)
+        st.caption("Exact (full scan)" if is_exact else
+                   "Aproksimasi: HyperLogLog (distinct), KLL (quantile), count-min (fraud per merchant)")
+    return summary, is_exact
+
+
+def render(load_data_func, sql_source_func=None, sketch_func=None, filter_options_func=None):
     """
     Render tab Data Insights dengan EDA lengkap
     
     Args:
-        load_data_func: Function to load dataset
+        load_data_func: Function to load dataset (mendukung argumen columns + filter)
+        sql_source_func: Function(start, end) -> sumber file untuk backend DuckDB (opsional)
+        sketch_func: Function(exact=False) -> ringkasan sketch seluruh dataset (opsional)
+        filter_options_func: Function() -> opsi filter dari manifest (opsional; default
+            dihitung dari projection tanggal/state/kategori)
     """
     st.title("Data Insights Dashboard")
     st.markdown("### Eksplorasi Data Historis & Analisis Mendalam")
     st.markdown("---")
     
+    timeline = sections('dashboard', observer=observe_step)
+    aggregator = None
     try:
-        df_raw = load_data_func()
-        
-        # --- FEATURE ENGINEERING untuk visualisasi ---
-        df = df_raw.copy()
-        df['trans_date_trans_time'] = pd.to_datetime(df['trans_date_trans_time'])
-        df['hour'] = df['trans_date_trans_time'].dt.hour
-        df['dob'] = pd.to_datetime(df['dob'])
-        today = pd.Timestamp.today()
-        df['age'] = ((today - df['dob']).dt.days / 365.25).astype(int)
-        df['day_of_week'] = df['trans_date_trans_time'].dt.dayofweek
-        df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+        timeline.start('filters')
+        if filter_options_func is not None:
+            options = filter_options_func()
+        else:
+            options = frame_filter_options(load_data_func(columns=FILTER_COLUMNS))
+        filters = render_filters(options)
+
+        use_sql = False
+        if sql_source_func is not None and DUCKDB_AVAILABLE:
+            use_sql = st.toggle(
+                "Agregasi via DuckDB (SQL langsung di file, untuk dataset besar)",
+                key="dash_sql"
+            )
+
+        timeline.start('load')
+        if use_sql:
+            aggregator = SqlAggregator(**sql_source_func(filters['start'], filters['end']), **filters)
+            df_raw = aggregator.sample(SQL_SAMPLE_ROWS, DASHBOARD_COLUMNS)
+        else:
+            df_raw = load_data_func(columns=CACHED_DASHBOARD_COLUMNS, **filters)
+        if df_raw.empty:
+            st.info("Tidak ada transaksi yang cocok dengan filter.")
+            return
+        
+        # --- FEATURE ENGINEERING untuk visualisasi (frame ramping, dtype di-downcast) ---
+        timeline.start('frame', rows=len(df_raw))
+        raw_bytes = int(df_raw.memory_usage(deep=True, index=False).sum())
+        df = build_dashboard_frame(df_raw)
+        del df_raw
+        if not use_sql:
+            aggregator = PandasAggregator(df)
+        DASHBOARD_RENDERS.inc(backend='sql' if use_sql else 'pandas')
+        overview = aggregator.overview()
+        if use_sql and len(df) < overview['total_trx']:
+            st.caption(f"Agregasi dihitung DuckDB atas {overview['total_trx']:,} transaksi; "
+                       f"chart distribusi memakai sampel {len(df):,} baris.")
         
         # ==============================================
         # SECTION 1: OVERVIEW METRICS
         # ==============================================
+        timeline.start('overview', rows=len(df))
         st.markdown("## 1️. Overview Dataset")
         
-        total_trx = len(df)
-        total_fraud = df['is_fraud'].sum()
+        total_trx = overview['total_trx']
+        total_fraud = overview['total_fraud']
         fraud_rate = (total_fraud / total_trx) * 100
-        avg_amount = df['amt'].mean()
+        avg_amount = overview['avg_amount']
         
         m_col1, m_col2, m_col3, m_col4, m_col5 = st.columns(5)
         with m_col1:
@@ -53,16 +200,31 @@ def render(load_data_func):
         with m_col5:
             st.metric("Jumlah Fitur", f"{len(df.columns)}")
         
+        # Quartile dari sketch hanya berlaku untuk seluruh dataset (tanpa filter)
+        sketch_summary = None
+        if sketch_func is not None:
+            sketch_summary, _ = render_quick_summary(sketch_func)
+            if any(filters.values()):
+                sketch_summary = None
+        
         # Sample Data
         st.markdown("#### Sample Data (5 Baris Pertama)")
         display_cols = ['trans_date_trans_time', 'category', 'amt', 'gender', 'state', 'age', 'hour', 'is_fraud']
         st.dataframe(df[display_cols].head(), width='stretch')
+
+        footprint = memory_footprint(df)
+        slim_bytes = int(footprint['bytes'].sum())
+        with st.expander(f"Memory Footprint: {slim_bytes / 1024**2:.2f} MB "
+                         f"(data mentah {raw_bytes / 1024**2:.2f} MB, {raw_bytes / max(slim_bytes, 1):.1f}x lebih hemat)"):
+            footprint['KB'] = (footprint.pop('bytes') / 1024).round(1)
+            st.dataframe(footprint, width='stretch', hide_index=True)
         
         st.markdown("---")
         
         # ==============================================
         # SECTION 2: DATA QUALITY & MISSING VALUES
         # ==============================================
+        timeline.start('quality', rows=len(df))
         st.markdown("## 2. Pemeriksaan Kualitas Data")
         
         col1, col2 = st.columns(2)
@@ -104,6 +266,7 @@ def render(load_data_func):
         # ==============================================
         # SECTION 3: OUTLIER DETECTION
         # ==============================================
+        timeline.start('outliers', rows=len(df))
         st.markdown("## 3. Deteksi Outlier")
         st.markdown("Menggunakan metode **IQR (Interquartile Range)** untuk mendeteksi outlier pada fitur numerik.")
         
@@ -114,19 +277,22 @@ def render(load_data_func):
         
         with col1:
             st.markdown("#### Box Plot - Amount (Sebelum Penanganan)")
-            box_amt = alt.Chart(df).mark_boxplot(extent=1.5).encode(
+            box_amt = alt.Chart(df[['amt']]).mark_boxplot(extent=1.5).encode(
                 y=alt.Y('amt:Q', title='Amount (USD)'),
                 color=alt.value('#3498db')
             ).properties(height=300, title='Distribusi Amount dengan Outliers')
             st.altair_chart(box_amt, width='stretch')
             
             # Calculate outliers
-            Q1_amt = df['amt'].quantile(0.25)
-            Q3_amt = df['amt'].quantile(0.75)
+            if sketch_summary is not None:
+                Q1_amt, Q3_amt = sketch_summary['amt']['q1'], sketch_summary['amt']['q3']
+            else:
+                Q1_amt = df['amt'].quantile(0.25)
+                Q3_amt = df['amt'].quantile(0.75)
             IQR_amt = Q3_amt - Q1_amt
             lower_amt = Q1_amt - 1.5 * IQR_amt
             upper_amt = Q3_amt + 1.5 * IQR_amt
-            outliers_amt = df[(df['amt'] < lower_amt) | (df['amt'] > upper_amt)]
+            n_outliers_amt = int(((df['amt'] < lower_amt) | (df['amt'] > upper_amt)).sum())
             
             st.info(f"""
             **Statistik Amount:**
@@ -135,24 +301,27 @@ def render(load_data_func):
             - IQR: ${IQR_amt:,.2f}
             - Batas Bawah: ${lower_amt:,.2f}
             - Batas Atas: ${upper_amt:,.2f}
-            - **Total Outlier: {len(outliers_amt):,} ({len(outliers_amt)/len(df)*100:.2f}%)**
+            - **Total Outlier: {n_outliers_amt:,} ({n_outliers_amt/len(df)*100:.2f}%)**
             """)
         
         with col2:
             st.markdown("#### Box Plot - Age")
-            box_age = alt.Chart(df).mark_boxplot(extent=1.5).encode(
+            box_age = alt.Chart(df[['age']]).mark_boxplot(extent=1.5).encode(
                 y=alt.Y('age:Q', title='Age (Years)'),
                 color=alt.value('#e74c3c')
             ).properties(height=300, title='Distribusi Usia')
             st.altair_chart(box_age, width='stretch')
             
             # Calculate outliers for age
-            Q1_age = df['age'].quantile(0.25)
-            Q3_age = df['age'].quantile(0.75)
+            if sketch_summary is not None:
+                Q1_age, Q3_age = sketch_summary['age']['q1'], sketch_summary['age']['q3']
+            else:
+                Q1_age = df['age'].quantile(0.25)
+                Q3_age = df['age'].quantile(0.75)
             IQR_age = Q3_age - Q1_age
             lower_age = Q1_age - 1.5 * IQR_age
             upper_age = Q3_age + 1.5 * IQR_age
-            outliers_age = df[(df['age'] < lower_age) | (df['age'] > upper_age)]
+            n_outliers_age = int(((df['age'] < lower_age) | (df['age'] > upper_age)).sum())
             
             st.info(f"""
             **Statistik Usia:**
@@ -161,7 +330,7 @@ def render(load_data_func):
             - IQR: {IQR_age:.0f} tahun
             - Batas Bawah: {lower_age:.0f} tahun
             - Batas Atas: {upper_age:.0f} tahun
-            - **Total Outlier: {len(outliers_age):,} ({len(outliers_age)/len(df)*100:.2f}%)**
+            - **Total Outlier: {n_outliers_age:,} ({n_outliers_age/len(df)*100:.2f}%)**
             """)
         
         st.markdown("---")
@@ -169,6 +338,7 @@ def render(load_data_func):
         # ==============================================
         # SECTION 4: NORMALISASI DATA
         # ==============================================
+        timeline.start('normalization', rows=len(df))
         st.markdown("## 4. Normalisasi Data")
         st.markdown("Perbandingan distribusi data **sebelum** dan **sesudah** normalisasi menggunakan **StandardScaler**.")
         
@@ -180,7 +350,7 @@ def render(load_data_func):
             st.markdown("#### Sebelum Normalisasi")
             
             # Amount Distribution Before
-            hist_before = alt.Chart(df).mark_bar(opacity=0.7).encode(
+            hist_before = alt.Chart(df[['amt']]).mark_bar(opacity=0.7).encode(
                 x=alt.X('amt:Q', bin=alt.Bin(maxbins=30), title='Amount (USD)'),
                 y=alt.Y('count()', title='Frekuensi'),
                 tooltip=[alt.Tooltip('count()', title='Jumlah')]
@@ -201,8 +371,10 @@ def render(load_data_func):
             
             # Normalize amount
             scaler = StandardScaler()
-            df_normalized = df.copy()
-            df_normalized['amt_normalized'] = scaler.fit_transform(df[['amt']])
+            # Hanya satu kolom baru; tidak menyalin seluruh frame
+            df_normalized = pd.DataFrame({
+                'amt_normalized': scaler.fit_transform(df[['amt']]).ravel().astype('float32')
+            })
             
             # Amount Distribution After
             hist_after = alt.Chart(df_normalized).mark_bar(opacity=0.7, color='#2ecc71').encode(
@@ -226,6 +398,7 @@ def render(load_data_func):
         # ==============================================
         # SECTION 5: EDA - DISTRIBUSI KATEGORIKAL
         # ==============================================
+        timeline.start('categorical', rows=len(df))
         st.markdown("## 5. Exploratory Data Analysis (EDA)")
         
         # Row 1: Gender and Category
@@ -235,8 +408,7 @@ def render(load_data_func):
         
         with c_col1:
             st.markdown("##### Distribusi Gender")
-            gender_counts = df['gender'].value_counts().reset_index()
-            gender_counts.columns = ['gender', 'count']
+            gender_counts = aggregator.value_counts('gender')
             gender_counts['gender'] = gender_counts['gender'].map({'M': 'Male', 'F': 'Female'})
             
             pie_chart = alt.Chart(gender_counts).mark_arc(innerRadius=50).encode(
@@ -251,8 +423,7 @@ def render(load_data_func):
             
         with c_col2:
             st.markdown("##### Top 10 Kategori Transaksi")
-            cat_counts = df['category'].value_counts().head(10).reset_index()
-            cat_counts.columns = ['category', 'count']
+            cat_counts = aggregator.value_counts('category').head(10)
             cat_counts['category'] = cat_counts['category'].apply(lambda x: x.replace('_', ' ').title())
             
             bar_chart = alt.Chart(cat_counts).mark_bar().encode(
@@ -270,8 +441,7 @@ def render(load_data_func):
         
         with c_col3:
             st.markdown("##### Transaksi per Jam")
-            trx_hour_counts = df['hour'].value_counts().sort_index().reset_index()
-            trx_hour_counts.columns = ['hour', 'count']
+            trx_hour_counts = aggregator.hour_counts()[['hour', 'count']]
             
             line_chart = alt.Chart(trx_hour_counts).mark_area(
                 interpolate='monotone',
@@ -286,8 +456,7 @@ def render(load_data_func):
             
         with c_col4:
             st.markdown("##### 📅 Weekday vs Weekend")
-            weekend_counts = df['is_weekend'].value_counts().reset_index()
-            weekend_counts.columns = ['is_weekend', 'count']
+            weekend_counts = aggregator.value_counts('is_weekend')
             weekend_counts['label'] = weekend_counts['is_weekend'].map({0: 'Weekday', 1: 'Weekend'})
             
             weekend_chart = alt.Chart(weekend_counts).mark_arc(innerRadius=50).encode(
@@ -305,13 +474,14 @@ def render(load_data_func):
         # ==============================================
         # SECTION 6: EDA - DISTRIBUSI NUMERIK
         # ==============================================
+        timeline.start('numerical', rows=len(df))
         st.markdown("### Distribusi Variabel Numerik")
         
         c_col5, c_col6 = st.columns(2)
         
         with c_col5:
             st.markdown("##### Distribusi Usia Pemegang Kartu")
-            hist_age = alt.Chart(df).mark_bar(opacity=0.8).encode(
+            hist_age = alt.Chart(df[['age']]).mark_bar(opacity=0.8).encode(
                 x=alt.X('age:Q', bin=alt.Bin(maxbins=20), title='Usia'),
                 y=alt.Y('count()', title='Frekuensi'),
                 color=alt.value('#9b59b6'),
@@ -322,7 +492,7 @@ def render(load_data_func):
         with c_col6:
             st.markdown("##### Distribusi Jumlah Transaksi")
             # Filter for better visualization (remove extreme outliers)
-            df_filtered = df[df['amt'] < df['amt'].quantile(0.99)]
+            df_filtered = df.loc[df['amt'] < df['amt'].quantile(0.99), ['amt']]
             
             hist_amt = alt.Chart(df_filtered).mark_bar(opacity=0.8).encode(
                 x=alt.X('amt:Q', bin=alt.Bin(maxbins=30), title='Amount (USD)'),
@@ -337,14 +507,14 @@ def render(load_data_func):
         # ==============================================
         # SECTION 7: FRAUD ANALYSIS
         # ==============================================
+        timeline.start('fraud_patterns', rows=len(df))
         st.markdown("## 6. Analisis Pola Fraud")
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("##### Fraud per Kategori")
-            fraud_by_cat = df.groupby('category')['is_fraud'].sum().sort_values(ascending=False).head(10).reset_index()
-            fraud_by_cat.columns = ['category', 'fraud_count']
+            fraud_by_cat = aggregator.fraud_by_category(limit=10)
             fraud_by_cat['category'] = fraud_by_cat['category'].apply(lambda x: x.replace('_', ' ').title())
             
             fraud_cat_chart = alt.Chart(fraud_by_cat).mark_bar().encode(
@@ -357,8 +527,7 @@ def render(load_data_func):
         
         with col2:
             st.markdown("##### Fraud per Jam")
-            fraud_by_hour = df.groupby('hour')['is_fraud'].sum().reset_index()
-            fraud_by_hour.columns = ['hour', 'fraud_count']
+            fraud_by_hour = aggregator.hour_counts()[['hour', 'fraud_count']]
             
             fraud_hour_chart = alt.Chart(fraud_by_hour).mark_line(point=True, color='#e74c3c').encode(
                 x=alt.X('hour:O', title='Jam'),
@@ -367,22 +536,32 @@ def render(load_data_func):
             ).properties(height=300)
             st.altair_chart(fraud_hour_chart, width='stretch')
         
+        # Fraud rate per kelompok usia (agregasi backend, bukan sampel)
+        st.markdown("##### Fraud Rate per Kelompok Usia")
+        fraud_by_age = aggregator.fraud_by_age_group()
+        fraud_age_chart = alt.Chart(fraud_by_age).mark_bar(color='#e67e22').encode(
+            x=alt.X('age_group:N', title='Age Group', sort=AGE_LABELS),
+            y=alt.Y('fraud_rate:Q', title='Fraud Rate', axis=alt.Axis(format='%')),
+            tooltip=['age_group', 'count', 'fraud_count', alt.Tooltip('fraud_rate:Q', format='.2%')]
+        ).properties(height=250)
+        st.altair_chart(fraud_age_chart, width='stretch')
+        
         # Box Plot: Amount by Age Group (Fraud vs Normal)
         st.markdown("##### Distribusi Amount per Kelompok Usia (Fraud vs Normal)")
         
-        # Create age groups
-        df['age_group'] = pd.cut(df['age'], bins=[0, 25, 40, 60, 100], 
-                                  labels=['Young (18-25)', 'Adult (26-40)', 'Middle (41-60)', 'Senior (60+)'])
-        df['fraud_label'] = df['is_fraud'].map({0: 'Normal', 1: 'Fraud'})
-        
-        # Filter extreme outliers for better visualization
-        df_box = df[df['amt'] < df['amt'].quantile(0.95)]
+        # Filter extreme outliers for better visualization; hanya kolom yang di-plot
+        in_range = df['amt'] < df['amt'].quantile(0.95)
+        df_box = pd.DataFrame({
+            'age_group': pd.cut(df.loc[in_range, 'age'], bins=AGE_BINS, labels=AGE_LABELS),
+            'amt': df.loc[in_range, 'amt'],
+            'is_fraud': df.loc[in_range, 'is_fraud'],
+        })
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Normal transactions box plot
-            df_normal = df_box[df_box['fraud_label'] == 'Normal']
+            df_normal = df_box.loc[df_box['is_fraud'] == 0, ['age_group', 'amt']]
             box_normal = alt.Chart(df_normal).mark_boxplot(extent=1.5, color='#3498db').encode(
                 x=alt.X('age_group:N', title='Age Group', sort=['Young (18-25)', 'Adult (26-40)', 'Middle (41-60)', 'Senior (60+)']),
                 y=alt.Y('amt:Q', title='Amount (USD)'),
@@ -392,7 +571,7 @@ def render(load_data_func):
         
         with col2:
             # Fraud transactions box plot
-            df_fraud = df_box[df_box['fraud_label'] == 'Fraud']
+            df_fraud = df_box.loc[df_box['is_fraud'] == 1, ['age_group', 'amt']]
             box_fraud = alt.Chart(df_fraud).mark_boxplot(extent=1.5, color='#e74c3c').encode(
                 x=alt.X('age_group:N', title='Age Group', sort=['Young (18-25)', 'Adult (26-40)', 'Middle (41-60)', 'Senior (60+)']),
                 y=alt.Y('amt:Q', title='Amount (USD)'),
@@ -412,6 +591,7 @@ def render(load_data_func):
         # ==============================================
         # SECTION 8: CORRELATION HEATMAP
         # ==============================================
+        timeline.start('correlation', rows=len(df))
         st.markdown("## 7. Analisis Korelasi")
         st.markdown("Heatmap korelasi antar fitur numerik menggunakan **Pearson Correlation**.")
         
@@ -480,3 +660,8 @@ def render(load_data_func):
         st.warning("⚠️ Dataset file `data/credit_card_transactions2.csv` not found.")
     except Exception as e:
         st.error(f"An error occurred while loading data: {e}")
+    finally:
+        timeline.close()
+        # Koneksi DuckDB dibuat ulang tiap rerun; tutup agar tidak menumpuk
+        if isinstance(aggregator, SqlAggregator):
+            aggregator.close()
@@ -1,13 +1,21 @@
 """
 Fraud Detection Tab - Input form and fraud prediction
 """
+import time
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+from core.decision import DEFAULT_THRESHOLD, predict_with_threshold
+from core.metrics import PREDICTIONS, step
+from core.scoring import engineer_features, encode_features
+
 
-def render(model, scaler, label_encoders, feature_columns, numerical_cols):
+def render(model, scaler, label_encoders, feature_columns, numerical_cols,
+           decision_threshold=DEFAULT_THRESHOLD, history_store=None, shadow=None,
+           drift=None):
     """
     Render tab Fraud Detection
     
@@ -17,6 +25,10 @@ def render(model, scaler, label_encoders, feature_columns, numerical_cols):
         label_encoders: Dict of label encoders
         feature_columns: List of feature column names
         numerical_cols: List of numerical column names
+        decision_threshold: Threshold probabilitas fraud dari decision layer
+        history_store: PredictionHistoryStore untuk menyimpan riwayat prediksi
+        shadow: ShadowScorer challenger (opsional); dipanggil setelah keputusan champion
+        drift: DriftMonitor (opsional); fitur transaksi ditambahkan ke histogram drift
     """
     st.title("Fraud Detection System")
     st.markdown("### Sistem Peringatan Dini untuk Deteksi Transaksi Mencurigakan")
@@ -121,37 +133,36 @@ def render(model, scaler, label_encoders, feature_columns, numerical_cols):
     
     if analyze_clicked:
         
-        # Prepare input data
-        amt_per_hour_ratio = amt / (hour + 1)
-        
-        # Encode categorical variables
-        category_encoded = label_encoders['category'].transform([category])[0]
-        gender_encoded = label_encoders['gender'].transform([gender])[0]
-        state_encoded = label_encoders['state'].transform([state])[0]
-        
-        # Create dataframe
-        input_data = pd.DataFrame({
-            'category': [category_encoded],
+        # Prepare input data (transformasi yang sama dengan jalur batch/streaming)
+        scoring_start = time.perf_counter()
+        raw_input = pd.DataFrame({
+            'category': [category],
             'amt': [amt],
-            'gender': [gender_encoded],
-            'state': [state_encoded],
+            'gender': [gender],
+            'state': [state],
             'age': [age],
             'hour': [hour],
-            'is_weekend': [int(is_weekend)],
-            'amt_per_hour_ratio': [amt_per_hour_ratio]
+            'is_weekend': [int(is_weekend)]
         })
-        
-        # Reorder
-        input_data = input_data[feature_columns]
-        
-        # Scaling
-        input_data[numerical_cols] = scaler.transform(input_data[numerical_cols])
-        
-        # Prediction
-        prediction = model.predict(input_data)[0]
-        prediction_proba = model.predict_proba(input_data)[0]
-        
-        confidence = prediction_proba[prediction] * 100
+        with step('predict.features', rows=1):
+            features = engineer_features(raw_input)
+        
+        # Encode, reorder & scaling
+        with step('predict.encode', rows=1):
+            input_data, _ = encode_features(features, label_encoders, scaler, feature_columns, numerical_cols)
+        
+        # Prediction (satu traversal forest, keputusan pakai threshold optimal)
+        with step('predict.model', rows=1):
+            prediction, prediction_proba = predict_with_threshold(model, input_data, decision_threshold)
+        prediction, prediction_proba = prediction[0], prediction_proba[0]
+        PREDICTIONS.inc(source='ui', decision='fraud' if prediction == 1 else 'safe')
+        
+        # Challenger menskor transaksi yang sama di background (tidak menunggu hasilnya)
+        if shadow is not None:
+            shadow.submit(raw_input, {'prob_fraud': [prediction_proba[1]], 'prediction': [prediction]},
+                          source='ui', champion_seconds=time.perf_counter() - scoring_start)
+        if drift is not None:
+            drift.update(features)
         
         # Save to history
         prediction_record = {
@@ -161,11 +172,11 @@ def render(model, scaler, label_encoders, feature_columns, numerical_cols):
             'state': state,
             'hour': hour,
             'prediction': 'FRAUD' if prediction == 1 else 'SAFE',
-            'confidence': confidence,
             'prob_safe': prediction_proba[0] * 100,
             'prob_fraud': prediction_proba[1] * 100
         }
-        st.session_state.prediction_history.append(prediction_record)
+        if history_store is not None:
+            history_store.append(prediction_record, source='ui')
         
         # ========================================
         # DISPLAY RESULTS
@@ -291,12 +302,14 @@ def render(model, scaler, label_encoders, feature_columns, numerical_cols):
         # Prediction output
         if prediction == 0:
             st.success("### ✅ TRANSAKSI AMAN")
-            st.markdown(f"**Tingkat Keyakinan:** {confidence:.2f}%")
+            st.markdown(f"**Probabilitas Fraud:** {prediction_proba[1] * 100:.2f}%")
+            st.caption(f"Threshold keputusan: {decision_threshold * 100:.1f}% (FRAUD jika probabilitas fraud ≥ threshold)")
             st.info("Transaksi ini tidak menunjukkan pola mencurigakan. Dapat diproses dengan normal.")
             
         else:
             st.error("### POTENSI FRAUD TERDETEKSI!")
-            st.markdown(f"**Tingkat Keyakinan:** {confidence:.2f}%")
+            st.markdown(f"**Probabilitas Fraud:** {prediction_proba[1] * 100:.2f}%")
+            st.caption(f"Threshold keputusan: {decision_threshold * 100:.1f}% (FRAUD jika probabilitas fraud ≥ threshold)")
             st.warning("**TINDAKAN YANG DISARANKAN:**")
             st.markdown("""
             - Lakukan verifikasi tambahan dengan pemegang kartu
@@ -330,10 +343,10 @@ def render(model, scaler, label_encoders, feature_columns, numerical_cols):
         
         with viz_col2:
             st.markdown("#### Detail Probabilitas")
-            st.metric("Probabilitas Aman", f"{prediction_proba[0]*100:.2f}%", 
-                     delta=f"{prediction_proba[0]*100 - 50:.1f}%" if prediction_proba[0] > 0.5 else None)
+            st.metric("Probabilitas Aman", f"{prediction_proba[0]*100:.2f}%")
+            # Delta relatif terhadap threshold keputusan (positif = di atas threshold, FRAUD)
             st.metric("Probabilitas Fraud", f"{prediction_proba[1]*100:.2f}%",
-                     delta=f"{prediction_proba[1]*100 - 50:.1f}%" if prediction_proba[1] > 0.5 else None,
+                     delta=f"{(prediction_proba[1] - decision_threshold)*100:+.1f} pp vs threshold",
                      delta_color="inverse")
             
             # Progress bar
@@ -434,8 +447,10 @@ def render(model, scaler, label_encoders, feature_columns, numerical_cols):
         st.markdown("---")
         
         # Show prediction history if exists
-        if st.session_state.prediction_history:
-            st.markdown("### Prediksi Terakhir")
-            history_df = pd.DataFrame(st.session_state.prediction_history[-5:])  # Last 5
-            st.dataframe(history_df, width='stretch')
+        if history_store is not None:
+            history_df = history_store.latest(5)  # Last 5
+            if not history_df.empty:
+                st.markdown("### Prediksi Terakhir")
+                st.caption("Riwayat dibagi bersama semua pengguna app, termasuk prediksi dari session lain.")
+                st.dataframe(history_df, width='stretch')
 
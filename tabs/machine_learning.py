@@ -88,7 +88,7 @@ def render(model, feature_columns, load_data_func):
         
         # Class Distribution Visualization
         try:
-            df_temp = load_data_func()
+            df_temp = load_data_func(columns=['is_fraud'])
             class_counts = df_temp['is_fraud'].value_counts().reset_index()
             class_counts.columns = ['Class', 'Count']
             class_counts['Class'] = class_counts['Class'].map({0: 'Normal', 1: 'Fraud'})
@@ -1,13 +1,15 @@
 """
 Model Performance Tab - Dashboard evaluasi performa model
 """
+import os
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import altair as alt
 from datetime import datetime
 
 
-def render(model, model_info, performance, feature_columns):
+def render(model, model_info, performance, feature_columns, evaluation=None, history_store=None, shadow=None,
+           drift=None):
     """
     Render tab Model Performance
     
@@ -16,6 +18,10 @@ def render(model, model_info, performance, feature_columns):
         model_info: Dict containing model information
         performance: Dict containing performance metrics
         feature_columns: List of feature column names
+        evaluation: Dict evaluation artifacts dari training (opsional)
+        history_store: PredictionHistoryStore berisi riwayat prediksi
+        shadow: ShadowScorer champion/challenger (opsional)
+        drift: DriftMonitor histogram fitur produksi (None jika model belum punya profil referensi)
     """
     st.title("Model Performance Dashboard")
     st.markdown("### Evaluasi Performa Model Random Forest")
@@ -57,23 +63,36 @@ def render(model, model_info, performance, feature_columns):
     
     st.markdown("---")
     
+    # Evaluation Artifacts (ROC/PR, Confusion Matrix, Segment Metrics)
+    if evaluation:
+        render_evaluation(evaluation)
+    else:
+        st.info("Artefak evaluasi belum tersedia. Jalankan ulang `fraud_detection_rf.py` untuk membuat `models/evaluation_artifacts.pkl`.")
+    
+    st.markdown("---")
+    
     # Feature Importance
     st.markdown("### Feature Importance")
     
-    if hasattr(model, 'feature_importances_'):
+    # Pakai importance yang tersimpan saat training agar tidak dihitung ulang dari 200 trees
+    feature_imp_df = None
+    if evaluation and evaluation.get('feature_importance') is not None:
+        feature_imp_df = evaluation['feature_importance'].rename(
+            columns={'feature': 'Feature', 'importance': 'Importance'}
+        )
+    elif hasattr(model, 'feature_importances_'):
         feature_imp_df = pd.DataFrame({
             'Feature': feature_columns,
             'Importance': model.feature_importances_
         }).sort_values('Importance', ascending=False)
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.barh(feature_imp_df['Feature'], feature_imp_df['Importance'], color='steelblue')
-        ax.set_xlabel('Skor Importance', fontsize=12, fontweight='bold')
-        ax.set_title('Feature Importance - Random Forest', fontsize=14, fontweight='bold')
-        ax.invert_yaxis()
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+    
+    if feature_imp_df is not None:
+        importance_chart = alt.Chart(feature_imp_df).mark_bar(color='steelblue').encode(
+            x=alt.X('Importance:Q', title='Skor Importance'),
+            y=alt.Y('Feature:N', sort='-x', title=None),
+            tooltip=['Feature', alt.Tooltip('Importance:Q', format='.4f')]
+        ).properties(height=300, title='Feature Importance - Random Forest')
+        st.altair_chart(importance_chart, width='stretch')
         
         # Show table
         st.markdown("#### Tabel Feature Importance")
@@ -81,19 +100,261 @@ def render(model, model_info, performance, feature_columns):
     
     st.markdown("---")
     
+    # Champion vs Challenger (shadow scoring)
+    if shadow is not None:
+        render_shadow(shadow)
+        st.markdown("---")
+    
+    # Data Drift
+    if drift is not None:
+        render_drift(drift)
+    else:
+        st.info("Model ini belum menyimpan profil distribusi training. Training ulang model untuk mengaktifkan monitor drift.")
+    st.markdown("---")
+    
     # Prediction History
-    if st.session_state.prediction_history:
-        st.markdown("### Riwayat Prediksi")
-        history_df = pd.DataFrame(st.session_state.prediction_history)
-        st.dataframe(history_df, width='stretch')
-        
-        # Download history
-        csv_history = history_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Unduh Semua Prediksi (CSV)",
-            data=csv_history,
-            file_name=f'fraud_prediction_history_{datetime.now().strftime("%Y%m%d")}.csv',
-            mime='text/csv'
-        )
+    if history_store is not None and history_store.count() > 0:
+        render_history(history_store)
     else:
         st.info("Belum ada riwayat prediksi. Lakukan prediksi di tab 'Fraud Detection' terlebih dahulu.")
+
+def render_evaluation(evaluation):
+    """
+    Render kurva ROC/PR, confusion matrix dan metrik per segmen dari artefak evaluasi
+    
+    Args:
+        evaluation: Dict hasil core.evaluation.build_evaluation_artifacts
+    """
+    st.markdown("### Evaluasi Holdout")
+    st.caption(
+        f"Test set: {evaluation['n_samples']:,} transaksi ({evaluation['n_fraud']:,} fraud) | "
+        f"Dibuat: {evaluation['created_at']}"
+    )
+    
+    # ROC & PR Curves
+    curve_col1, curve_col2 = st.columns(2)
+    
+    with curve_col1:
+        st.markdown(f"#### ROC Curve (AUC = {evaluation['roc_auc']:.4f})")
+        roc_chart = alt.Chart(evaluation['roc_curve']).mark_line(color='#3498db').encode(
+            x=alt.X('fpr:Q', title='False Positive Rate', scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y('tpr:Q', title='True Positive Rate', scale=alt.Scale(domain=[0, 1])),
+            tooltip=[alt.Tooltip('fpr:Q', format='.3f'), alt.Tooltip('tpr:Q', format='.3f'),
+                     alt.Tooltip('threshold:Q', format='.3f')]
+        )
+        diagonal = alt.Chart(pd.DataFrame({'fpr': [0, 1], 'tpr': [0, 1]})).mark_line(
+            color='gray', strokeDash=[4, 4]
+        ).encode(x='fpr:Q', y='tpr:Q')
+        st.altair_chart((roc_chart + diagonal).properties(height=300), width='stretch')
+    
+    with curve_col2:
+        st.markdown("#### Precision-Recall Curve")
+        pr_chart = alt.Chart(evaluation['pr_curve']).mark_line(color='#e74c3c').encode(
+            x=alt.X('recall:Q', title='Recall', scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y('precision:Q', title='Precision', scale=alt.Scale(domain=[0, 1])),
+            tooltip=[alt.Tooltip('recall:Q', format='.3f'), alt.Tooltip('precision:Q', format='.3f'),
+                     alt.Tooltip('threshold:Q', format='.3f')]
+        ).properties(height=300)
+        st.altair_chart(pr_chart, width='stretch')
+    
+    # Confusion Matrix per Threshold
+    st.markdown("#### Confusion Matrix")
+    confusion = evaluation['confusion_matrices']
+    thresholds = list(confusion)
+    default_thr = evaluation.get('decision_threshold', 0.5)
+    selected_thr = st.selectbox(
+        "Threshold",
+        options=thresholds,
+        index=thresholds.index(default_thr) if default_thr in thresholds else 0,
+        format_func=lambda t: f"{t:.3f}",
+        key="eval_threshold"
+    )
+    cm = confusion[selected_thr]
+    
+    cm_col1, cm_col2 = st.columns([1, 1])
+    
+    with cm_col1:
+        cm_df = pd.DataFrame({
+            'Actual': ['Not Fraud', 'Not Fraud', 'Fraud', 'Fraud'],
+            'Predicted': ['Not Fraud', 'Fraud', 'Not Fraud', 'Fraud'],
+            'Count': [cm['tn'], cm['fp'], cm['fn'], cm['tp']]
+        })
+        base = alt.Chart(cm_df).encode(
+            x=alt.X('Predicted:N', title='Predicted Label', sort=['Not Fraud', 'Fraud']),
+            y=alt.Y('Actual:N', title='Actual Label', sort=['Not Fraud', 'Fraud'])
+        )
+        heatmap = base.mark_rect().encode(
+            color=alt.Color('Count:Q', scale=alt.Scale(scheme='blues'), legend=None)
+        )
+        labels = base.mark_text(fontSize=16, fontWeight='bold').encode(text='Count:Q')
+        st.altair_chart((heatmap + labels).properties(height=250), width='stretch')
+    
+    with cm_col2:
+        st.metric("Accuracy", f"{cm['accuracy']*100:.2f}%")
+        st.metric("Precision", f"{cm['precision']*100:.2f}%")
+        st.metric("Recall", f"{cm['recall']*100:.2f}%")
+        st.metric("F1-Score", f"{cm['f1_score']*100:.2f}%")
+    
+    # Per-Segment Metrics
+    segments = evaluation.get('segments', {})
+    if segments:
+        st.markdown(f"#### Metrik per Segmen (threshold {evaluation.get('decision_threshold', 0.5):.3f})")
+        segment_name = st.radio(
+            "Segmen",
+            options=list(segments),
+            format_func=lambda name: name.title(),
+            horizontal=True,
+            key="eval_segment"
+        )
+        st.dataframe(
+            segments[segment_name].style.format({
+                'accuracy': '{:.2%}', 'precision': '{:.2%}', 'recall': '{:.2%}', 'f1_score': '{:.2%}'
+            }),
+            width='stretch'
+        )
+
+
+def render_shadow(shadow):
+    """
+    Render perbandingan champion vs challenger dari shadow scoring
+    
+    Args:
+        shadow: ShadowScorer
+    """
+    st.markdown("### Champion vs Challenger (Shadow)")
+    summary = shadow.summary()
+    st.caption(f"Challenger: `{summary['challenger']}` · diskor di background, keputusan tetap dari champion")
+    
+    if not summary['rows']:
+        st.info("Belum ada transaksi yang diskor challenger.")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Disagreement Rate", f"{summary['disagreement_rate']:.2%}",
+                  help=f"{summary['disagreements']:,} dari {summary['rows']:,} transaksi")
+    with col2:
+        st.metric("Fraud Rate (Champion → Challenger)",
+                  f"{summary['challenger_fraud_rate']:.2%}",
+                  delta=f"{(summary['challenger_fraud_rate'] - summary['champion_fraud_rate']) * 100:+.2f} pp",
+                  delta_color="off")
+    with col3:
+        st.metric("Rata-rata |Δ Probabilitas|", f"{summary['mean_abs_prob_diff']:.4f}")
+    with col4:
+        st.metric("Overhead Submit", f"{summary['submit_overhead_ms']:.3f} ms",
+                  help="Waktu tambahan di jalur request champion per batch")
+    
+    latency = pd.DataFrame([
+        {'Model': 'Champion', 'ms/transaksi': summary['champion_ms_per_row']},
+        {'Model': 'Challenger', 'ms/transaksi': summary['challenger_ms_per_row']},
+    ])
+    st.dataframe(latency, width='stretch', hide_index=True)
+    if summary['dropped'] or summary['errors']:
+        st.warning(f"{summary['dropped']:,} batch di-drop (queue penuh), {summary['errors']:,} batch gagal diskor challenger")
+        if summary['last_error']:
+            st.caption(f"Error terakhir challenger: {summary['last_error']}")
+    
+    if shadow.recent:
+        with st.expander(f"Transaksi dengan keputusan berbeda (terakhir {len(shadow.recent)})"):
+            st.dataframe(pd.DataFrame(list(shadow.recent)), width='stretch', hide_index=True)
+
+
+def render_drift(drift):
+    """
+    Render drift distribusi fitur produksi vs training dari histogram incremental
+    
+    Args:
+        drift: DriftMonitor
+    """
+    st.markdown("### Data Drift")
+    st.caption(f"Referensi: {drift.reference['rows']:,} transaksi training · "
+               f"histogram produksi sejak {drift.started_at} · PSI < 0.1 stabil, 0.1-0.25 bergeser, > 0.25 drift")
+    
+    if drift.rows == 0:
+        st.info("Belum ada transaksi yang diskor sejak model ini aktif.")
+        return
+    
+    report = drift.report()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Transaksi Dipantau", f"{drift.rows:,}")
+    with col2:
+        st.metric("PSI Tertinggi", f"{report['psi'].max():.3f}", help=report.loc[report['psi'].idxmax(), 'feature'])
+    with col3:
+        st.metric("Fitur Drift", int((report['status'] == 'drift').sum()))
+    
+    st.dataframe(
+        report.rename(columns={'feature': 'Fitur', 'kind': 'Tipe', 'rows': 'Transaksi',
+                               'psi': 'PSI', 'ks': 'KS', 'status': 'Status'}),
+        width='stretch', hide_index=True,
+        column_config={'PSI': st.column_config.NumberColumn(format="%.4f"),
+                       'KS': st.column_config.NumberColumn(format="%.4f")}
+    )
+    
+    feature = st.selectbox("Distribusi fitur", report['feature'].tolist(), key='drift_feature')
+    distribution = drift.distribution(feature).melt(id_vars='bin', var_name='Sumber', value_name='Proporsi')
+    chart = alt.Chart(distribution).mark_bar().encode(
+        x=alt.X('bin:N', title=feature, sort=None),
+        xOffset='Sumber:N',
+        y=alt.Y('Proporsi:Q', axis=alt.Axis(format='%')),
+        color=alt.Color('Sumber:N', scale=alt.Scale(domain=['reference', 'production'],
+                                                    range=['#95a5a6', '#e67e22'])),
+        tooltip=['bin:N', 'Sumber:N', alt.Tooltip('Proporsi:Q', format='.2%')]
+    ).properties(height=300)
+    st.altair_chart(chart, width='stretch')
+    
+    if st.button("Reset histogram drift", key='drift_reset'):
+        drift.reset()
+        st.rerun()
+
+
+def render_history(history_store, page_size=50):
+    """
+    Render riwayat prediksi per halaman dengan filter yang di-push ke SQLite
+    
+    Args:
+        history_store: PredictionHistoryStore
+        page_size: Jumlah baris per halaman
+    """
+    st.markdown("### Riwayat Prediksi")
+    st.caption("Riwayat ini dibagi bersama: berisi prediksi dari semua pengguna/session app ini "
+               "serta job batch dan streaming (kolom `source`), bukan hanya session Anda.")
+    
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    
+    with filter_col1:
+        prediction_filter = st.selectbox("Prediksi", options=['Semua', 'FRAUD', 'SAFE'], key="history_prediction")
+    with filter_col2:
+        category_filter = st.selectbox("Kategori", options=['Semua'] + history_store.categories(),
+                                       key="history_category")
+    with filter_col3:
+        date_filter = st.date_input("Sejak Tanggal", value=None, key="history_since")
+    
+    filters = {
+        'prediction': None if prediction_filter == 'Semua' else prediction_filter,
+        'category': None if category_filter == 'Semua' else category_filter,
+        'since': date_filter.strftime("%Y-%m-%d") if date_filter else None,
+    }
+    total = history_store.count(**filters)
+    n_pages = max(1, -(-total // page_size))
+    
+    page = st.number_input(f"Halaman (1-{n_pages})", min_value=1, max_value=n_pages, value=1,
+                           step=1, key="history_page")
+    history_df = history_store.query(page=page - 1, page_size=page_size, **filters)
+    st.caption(f"Menampilkan {len(history_df):,} dari {total:,} prediksi")
+    st.dataframe(history_df, width='stretch')
+    
+    # Export inkremental: hanya baris baru yang ditambahkan ke file CSV
+    export_path = os.path.join(os.path.dirname(history_store.path), 'prediction_history.csv')
+    if st.button("Siapkan CSV Riwayat", key="history_export"):
+        new_rows = history_store.export_csv(export_path)
+        st.success(f"{new_rows:,} prediksi baru ditambahkan ke file ekspor")
+    
+    if os.path.exists(export_path):
+        with open(export_path, 'rb') as f:
+            st.download_button(
+                label="Unduh Semua Prediksi (CSV)",
+                data=f,
+                file_name=f'fraud_prediction_history_{datetime.now().strftime("%Y%m%d")}.csv',
+                mime='text/csv'
+            )
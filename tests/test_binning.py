@@ -0,0 +1,71 @@
+"""
+Test BinnedForest: leaf dan probabilitas harus identik dengan sklearn
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from core.binning import BinnedForest, bin_dtype, binned_model, build_binned_forest
+from core.compaction import _floor_float32
+
+
+@pytest.fixture(scope='module')
+def forest_and_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5)).astype(np.float32)
+    X[:, 3] = rng.integers(0, 4, size=600)  # Fitur diskrit: banyak nilai tepat di sekitar threshold
+    y = ((X[:, 0] + X[:, 1] * X[:, 2] + 0.5 * X[:, 3] + rng.normal(scale=0.5, size=600)) > 1).astype(int)
+    model = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X, y)
+    return model, X
+
+
+def _threshold_rows(model, X):
+    """Baris dengan satu fitur tepat di threshold split (float32) dan tetangga terdekatnya"""
+    rows = []
+    base = X[:40]
+    for estimator in model.estimators_[:5]:
+        tree = estimator.tree_
+        for node in np.flatnonzero(tree.children_left >= 0):
+            feature = tree.feature[node]
+            at = _floor_float32(np.array([tree.threshold[node]]))[0]
+            for value in (at, np.nextafter(at, np.float32(np.inf)), np.nextafter(at, np.float32(-np.inf))):
+                row = base[node % len(base)].copy()
+                row[feature] = value
+                rows.append(row)
+    return np.vstack(rows).astype(np.float32)
+
+
+def test_leaves_match_sklearn(forest_and_data):
+    model, X = forest_and_data
+    binned = build_binned_forest(model)
+    X_test = np.vstack([X, _threshold_rows(model, X)])
+
+    leaves = binned.apply_binned(binned.transform(X_test))
+
+    np.testing.assert_array_equal(binned.source_node[leaves], model.apply(X_test))
+
+
+def test_predict_proba_matches_sklearn(forest_and_data):
+    model, X = forest_and_data
+    binned = build_binned_forest(model)
+    X_test = np.vstack([X, _threshold_rows(model, X)])
+
+    np.testing.assert_allclose(binned.predict_proba(X_test), model.predict_proba(X_test), atol=1e-6)
+
+
+def test_binned_model_is_cached(forest_and_data):
+    model, _ = forest_and_data
+    binned = binned_model(model)
+    assert isinstance(binned, BinnedForest)
+    assert binned_model(model) is binned
+    assert binned_model(binned) is binned
+
+
+@pytest.mark.parametrize('n_edges, dtype', [
+    (255, np.uint8),
+    (256, np.uint16),
+    (65535, np.uint16),
+    (65536, np.uint32),
+])
+def test_bin_dtype_holds_every_bin(n_edges, dtype):
+    assert bin_dtype([np.zeros(n_edges, dtype=np.float32)]) == dtype
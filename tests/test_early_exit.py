@@ -0,0 +1,55 @@
+"""
+Test early-exit inference: keputusan harus sama dengan evaluasi semua pohon
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from core.binning import build_binned_forest
+from core.early_exit import early_exit_predict_proba, resolve_settings, verify_early_exit
+
+
+@pytest.fixture(scope='module')
+def forest_and_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 6)).astype(np.float32)
+    y = ((X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.7, size=2000)) > 1.2).astype(int)
+    model = RandomForestClassifier(n_estimators=60, max_depth=8, random_state=0).fit(X[:1500], y[:1500])
+    return model, X[1500:]
+
+
+@pytest.mark.parametrize('threshold', [0.2, 0.35, 0.5, 0.7])
+def test_no_decision_changes(forest_and_data, threshold):
+    model, X = forest_and_data
+
+    check = verify_early_exit(model, X, threshold=threshold)
+
+    assert check['mismatches'] == 0
+    assert check['mean_trees_used'] < check['n_trees']
+
+
+def test_tree_proba_sum_path(forest_and_data):
+    model, X = forest_and_data
+    binned = build_binned_forest(model)
+
+    check = verify_early_exit(binned, X, threshold=0.35)
+
+    assert check['mismatches'] == 0
+
+
+def test_zero_delta_evaluates_every_tree(forest_and_data):
+    model, X = forest_and_data
+
+    prob_fraud, trees_used = early_exit_predict_proba(model, X, threshold=0.5, delta=0)
+
+    assert (trees_used == model.n_estimators).all()
+    np.testing.assert_allclose(prob_fraud, model.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+
+
+def test_resolve_settings_prefers_override_then_artifact():
+    artifacts = {'early_exit': {'chunk_size': 20, 'delta': 1e-6}}
+
+    assert resolve_settings(artifacts, None) is None
+    assert resolve_settings(artifacts, True) == {'chunk_size': 20, 'delta': 1e-6}
+    assert resolve_settings(artifacts, {'chunk_size': None, 'delta': 1e-8}) == {'chunk_size': 20, 'delta': 1e-8}
+    assert resolve_settings({}, True)['delta'] > 0
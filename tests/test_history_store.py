@@ -0,0 +1,103 @@
+"""
+Test PredictionHistoryStore: retensi, paging terfilter dan ekspor CSV inkremental
+"""
+import pandas as pd
+import pytest
+
+from core.history_store import COLUMNS, PredictionHistoryStore
+
+
+def make_record(i, prediction='SAFE', category='grocery_pos'):
+    return {
+        'timestamp': f"2026-01-01 00:{i // 60:02d}:{i % 60:02d}",
+        'amount': float(i),
+        'category': category,
+        'state': 'TX',
+        'hour': i % 24,
+        'prediction': prediction,
+        'prob_safe': 90.0,
+        'prob_fraud': 10.0,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PredictionHistoryStore(str(tmp_path / 'history.db'), max_rows=None)
+    yield store
+    store.close()
+
+
+def test_max_rows_keeps_newest(tmp_path):
+    store = PredictionHistoryStore(str(tmp_path / 'history.db'), max_rows=5)
+    store.append_many([make_record(i) for i in range(8)])
+    store.append(make_record(8))
+
+    assert store.count() == 5
+    assert store.query(page_size=10)['amount'].tolist() == [8.0, 7.0, 6.0, 5.0, 4.0]
+    store.close()
+
+
+def test_filtered_paging(store):
+    store.append_many([
+        make_record(i, prediction='FRAUD' if i % 3 == 0 else 'SAFE',
+                    category='shopping_net' if i % 2 else 'grocery_pos')
+        for i in range(30)
+    ])
+    filters = {'prediction': 'FRAUD', 'category': 'grocery_pos'}
+    expected = [float(i) for i in reversed(range(30)) if i % 3 == 0 and i % 2 == 0]
+
+    pages = [store.query(page=page, page_size=2, **filters) for page in range(3)]
+
+    assert store.count(**filters) == len(expected) == 5
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert pd.concat(pages)['amount'].tolist() == expected
+    assert store.count(since='2026-01-01 00:00:20') == 10
+    assert store.categories() == ['grocery_pos', 'shopping_net']
+
+
+def test_export_appends_only_new_rows(store, tmp_path):
+    path = tmp_path / 'export' / 'history.csv'
+    store.append_many([make_record(i) for i in range(3)])
+
+    assert store.export_csv(str(path)) == 3
+    assert store.export_csv(str(path)) == 0
+    store.append_many([make_record(i) for i in range(3, 5)])
+    assert store.export_csv(str(path), chunk_size=1) == 2
+
+    exported = pd.read_csv(path)
+    assert exported.columns.tolist() == COLUMNS
+    assert exported['amount'].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_failed_export_truncates_back(store, tmp_path, monkeypatch):
+    path = tmp_path / 'history.csv'
+    store.append_many([make_record(i) for i in range(3)])
+    store.export_csv(str(path))
+    size_before = path.stat().st_size
+    store.append_many([make_record(i) for i in range(3, 6)])
+
+    original_to_csv = pd.DataFrame.to_csv
+
+    def failing_to_csv(frame, f, **kwargs):
+        original_to_csv(frame.iloc[:1], f, **kwargs)  # sebagian baris sudah tertulis
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', failing_to_csv)
+    with pytest.raises(OSError):
+        store.export_csv(str(path))
+    monkeypatch.undo()
+
+    assert path.stat().st_size == size_before
+    assert store.export_csv(str(path)) == 3
+    assert pd.read_csv(path)['amount'].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_export_rewrites_file_with_old_header(store, tmp_path):
+    path = tmp_path / 'history.csv'
+    store.append_many([make_record(i) for i in range(2)])
+    store.export_csv(str(path))
+    path.write_text("timestamp,confidence\n2026-01-01 00:00:00,90.0\n")
+    store.append(make_record(2))
+
+    assert store.export_csv(str(path)) == 3
+    assert pd.read_csv(path).columns.tolist() == COLUMNS
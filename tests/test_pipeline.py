@@ -0,0 +1,111 @@
+"""
+Test StageGraph: invalidasi cache per parameter, dependensi, source modul dan --force
+"""
+import pytest
+
+from core.pipeline import StageGraph
+
+
+def build_graph(cache_dir, calls, code_modules=()):
+    """Graph dua stage: `source` -> `double`; `calls` mencatat stage yang benar-benar dijalankan"""
+    graph = StageGraph(str(cache_dir), code_modules=code_modules)
+
+    @graph.stage()
+    def source(n=3):
+        calls.append('source')
+        return list(range(n))
+
+    @graph.stage(deps=['source'])
+    def double(source, factor=2):
+        calls.append('double')
+        return [value * factor for value in source]
+
+    return graph
+
+
+@pytest.fixture
+def helper_module(tmp_path, monkeypatch):
+    """Modul bersama palsu yang source-nya ikut menentukan key cache"""
+    module_dir = tmp_path / 'modules'
+    module_dir.mkdir()
+    path = module_dir / 'pipeline_helper.py'
+    path.write_text("SCALE = 1\n")
+    monkeypatch.syspath_prepend(str(module_dir))
+    return path
+
+
+def test_second_run_is_served_from_cache(tmp_path):
+    calls = []
+    graph = build_graph(tmp_path / 'cache', calls)
+
+    first, _ = graph.run(log=None)
+    calls.clear()
+    second, report = graph.run(log=None)
+
+    assert calls == []
+    assert second == first == {'source': [0, 1, 2], 'double': [0, 2, 4]}
+    assert {item['action'] for item in report} == {'load'}
+
+
+def test_param_change_invalidates_stage_and_downstream(tmp_path):
+    calls = []
+    graph = build_graph(tmp_path / 'cache', calls)
+    graph.run(log=None)
+
+    calls.clear()
+    outputs, _ = graph.run(params={'double': {'factor': 10}}, log=None)
+    assert calls == ['double']
+    assert outputs['double'] == [0, 10, 20]
+
+    calls.clear()
+    outputs, _ = graph.run(params={'source': {'n': 2}}, log=None)
+    assert sorted(calls) == ['double', 'source']
+    assert outputs['double'] == [0, 2]
+
+
+def test_dependency_key_is_part_of_downstream_key(tmp_path):
+    graph = build_graph(tmp_path / 'cache', [])
+
+    base = graph.keys()
+    changed = graph.keys({'source': {'n': 5}})
+
+    assert changed['source'] != base['source']
+    assert changed['double'] != base['double']
+    assert graph.keys({'double': {'factor': 3}})['source'] == base['source']
+
+
+def test_code_module_change_invalidates_cache(tmp_path, helper_module):
+    calls = []
+    graph = build_graph(tmp_path / 'cache', calls, code_modules=['pipeline_helper'])
+    graph.run(log=None)
+    before = graph.keys()
+
+    helper_module.write_text("SCALE = 2\n")
+    calls.clear()
+    graph.run(log=None)
+
+    assert sorted(calls) == ['double', 'source']
+    assert graph.keys()['source'] != before['source']
+
+
+def test_force_reruns_stage_and_downstream_only(tmp_path):
+    calls = []
+    graph = build_graph(tmp_path / 'cache', calls)
+    graph.run(log=None)
+
+    calls.clear()
+    graph.run(force=['double'], log=None)
+    assert calls == ['double']
+
+    calls.clear()
+    actions, _ = graph.plan(force=['source'])
+    graph.run(force=['source'], log=None)
+    assert actions == {'source': 'run', 'double': 'run'}
+    assert sorted(calls) == ['double', 'source']
+
+
+def test_unknown_param_is_rejected(tmp_path):
+    graph = build_graph(tmp_path / 'cache', [])
+
+    with pytest.raises(ValueError):
+        graph.run(params={'double': {'unknown': 1}}, log=None)
@@ -0,0 +1,31 @@
+"""
+Test parsing tanggal format tetap: tanggal yang tidak ada harus ditolak
+"""
+import calendar
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.timestamps import days_in_month, parse_date_days, parse_datetime_epoch
+
+
+def test_days_in_month_matches_calendar():
+    years = np.arange(1896, 2105).repeat(12)
+    months = np.tile(np.arange(1, 13), len(years) // 12)
+    expected = [calendar.monthrange(y, m)[1] for y, m in zip(years, months)]
+    np.testing.assert_array_equal(days_in_month(years, months), expected)
+
+
+def test_leap_days_parse_like_pandas():
+    values = pd.Series(['2000-02-29 23:59:59', '2020-02-29 00:00:00', '2019-12-31 12:30:00'])
+    expected = pd.to_datetime(values).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    np.testing.assert_array_equal(parse_datetime_epoch(values), expected)
+
+
+@pytest.mark.parametrize('bad', ['2019-02-29', '1900-02-29', '2019-04-31', '2019-06-31'])
+def test_impossible_dates_raise(bad):
+    with pytest.raises(ValueError):
+        parse_date_days(pd.Series(['2019-01-01', bad]))
+    with pytest.raises(ValueError):
+        parse_datetime_epoch(pd.Series(['2019-01-01 00:00:00', f'{bad} 10:00:00']))